@@ -21,10 +21,12 @@ from config.settings import Config
 # Import Flask application factory
 from src.app_factory import create_app
 
-# Create Flask application
-app = create_app()
-
 if __name__ == '__main__':
+    # Created here, not at import: worker processes that re-import this script
+    # (multiprocessing spawn) must not build their own app and train a model.
+    # WSGI servers import wsgi:app instead
+    app = create_app()
+
     # Development server settings
     app.run(
         debug=Config.DEBUG,
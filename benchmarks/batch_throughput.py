@@ -0,0 +1,112 @@
+"""
+Batch Recognition Throughput Benchmark
+
+Compares frames/sec of one-frame-per-request /recognize against
+/recognize_batch (multipart and packed binary bodies), in-process through
+the Flask test client so only server-side cost is measured.
+
+Usage:
+    python benchmarks/batch_throughput.py [--frames 64] [--batch-size 16]
+"""
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from flask import Flask
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.api.routes import api_bp, BATCH_LENGTH_PREFIX
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.people_manager import PeopleManager
+
+
+def load_frames(count: int, size=(640, 480)):
+    """Encode `count` webcam-sized JPEG frames from the dataset"""
+    frames = []
+    for root, _, files in sorted(os.walk(DATA_DIR)):
+        for filename in sorted(files):
+            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+                image = cv2.imdecode(np.fromfile(os.path.join(root, filename), np.uint8), cv2.IMREAD_COLOR)
+                if image is not None:
+                    _, buffer = cv2.imencode('.jpg', cv2.resize(image, size))
+                    frames.append(buffer.tobytes())
+    if not frames:
+        raise SystemExit(f"No images found in {DATA_DIR}")
+    return [frames[i % len(frames)] for i in range(count)]
+
+
+def build_client():
+    """Flask test client around a trained model"""
+    model = FaceRecognitionModel(FaceRecognitionConfig())
+    if not model.is_trained:
+        raise SystemExit("Model is not trained; add images to the dataset first")
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    app.face_model = model
+    app.people_manager = PeopleManager()
+    return app.test_client()
+
+
+def run_single(client, frames):
+    for data in frames:
+        payload = 'data:image/jpeg;base64,' + base64.b64encode(data).decode()
+        assert client.post('/recognize', json={'image': payload}).get_json()['success']
+
+
+def run_multipart(client, frames, batch_size):
+    for start in range(0, len(frames), batch_size):
+        batch = frames[start:start + batch_size]
+        files = [(io.BytesIO(data), f'{i}.jpg') for i, data in enumerate(batch)]
+        assert client.post('/recognize_batch', data={'images': files}).get_json()['success']
+
+
+def run_packed(client, frames, batch_size):
+    for start in range(0, len(frames), batch_size):
+        body = b''.join(
+            BATCH_LENGTH_PREFIX.pack(len(data)) + data
+            for data in frames[start:start + batch_size]
+        )
+        response = client.post('/recognize_batch', data=body, content_type='application/octet-stream')
+        assert response.get_json()['success']
+
+
+def measure(name, func, frames, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    fps = len(frames) / best
+    print(f"{name:<28} {fps:8.1f} frames/sec  ({best * 1000 / len(frames):6.2f} ms/frame)")
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    client = build_client()
+    frames = load_frames(args.frames)
+    print(f"{len(frames)} frames, batch size {args.batch_size}, best of {args.repeats}, {os.cpu_count()} CPU(s)")
+
+    single = measure('/recognize (base64 JSON)', lambda: run_single(client, frames), frames, args.repeats)
+    multipart = measure('/recognize_batch multipart', lambda: run_multipart(client, frames, args.batch_size), frames, args.repeats)
+    packed = measure('/recognize_batch packed', lambda: run_packed(client, frames, args.batch_size), frames, args.repeats)
+
+    print(f"speedup: multipart {multipart / single:.2f}x, packed {packed / single:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Detection Resolution Benchmark
+
+Measures face detection latency and recall at several DETECTION_MAX_SIDE
+values on the bundled dataset. Recall is relative to full-resolution
+detection: a reference face counts as found when a downscaled detection
+overlaps it with IoU >= 0.5.
+
+Usage:
+    python benchmarks/detection_scale.py [--sides 0 1280 960 640 480 320] [--min-face 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.utils.image_processor import ImageProcessor
+
+
+def iou(a, b):
+    ax2, ay2, bx2, by2 = a[0] + a[2], a[1] + a[3], b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def image_paths():
+    for root, _, files in sorted(os.walk(DATA_DIR)):
+        for filename in sorted(files):
+            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
+                yield os.path.join(root, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sides', type=int, nargs='+', default=[0, 1280, 960, 640, 480, 320])
+    parser.add_argument('--min-face', type=int, default=FaceRecognitionConfig.MIN_FACE_SIZE[0])
+    args = parser.parse_args()
+
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + FaceRecognitionConfig.FACE_CASCADE_FILE)
+    processors = {}
+    for side in args.sides:
+        config = FaceRecognitionConfig()
+        config.DETECTION_MAX_SIDE = side
+        processors[side] = ImageProcessor(config=config)
+    min_size = (args.min_face, args.min_face)
+
+    # Full resolution is always the reference
+    reference = ImageProcessor(config=FaceRecognitionConfig())
+    reference.config.DETECTION_MAX_SIDE = 0
+
+    latency = {side: [] for side in args.sides}
+    found = {side: 0 for side in args.sides}
+    largest_found = {side: 0 for side in args.sides}
+    reference_faces = 0
+    images_with_face = 0
+    images = 0
+
+    for path in image_paths():
+        gray = cv2.imdecode(np.fromfile(path, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        images += 1
+
+        start = time.perf_counter()
+        ref_boxes = reference.detect_faces(cascade, gray, min_size)
+        ref_time = time.perf_counter() - start
+        reference_faces += len(ref_boxes)
+        ref_largest = max(ref_boxes, key=lambda b: b[2] * b[3]) if ref_boxes else None
+        images_with_face += ref_largest is not None
+
+        for side, processor in processors.items():
+            if side == 0:
+                boxes = ref_boxes
+                latency[side].append(ref_time)
+            else:
+                start = time.perf_counter()
+                boxes = processor.detect_faces(cascade, gray, min_size)
+                latency[side].append(time.perf_counter() - start)
+
+            found[side] += sum(1 for ref in ref_boxes if any(iou(ref, box) >= 0.5 for box in boxes))
+            if ref_largest is not None and any(iou(ref_largest, box) >= 0.5 for box in boxes):
+                largest_found[side] += 1
+
+        print(f"\r{images} images", end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    print(f"{images} images, {reference_faces} faces at full resolution, min face {args.min_face}px")
+    print(f"{'max side':>9} {'mean ms':>9} {'p95 ms':>9} {'recall':>8} {'main face':>10}")
+    for side in args.sides:
+        times = np.array(latency[side]) * 1000
+        recall = found[side] / reference_faces if reference_faces else 0.0
+        label = 'full' if side == 0 else str(side)
+        # Training uses the largest face per image, so its recall matters most there
+        main_face = largest_found[side] / images_with_face if images_with_face else 0.0
+        print(f"{label:>9} {times.mean():9.1f} {np.percentile(times, 95):9.1f} {recall:8.1%} {main_face:10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Gallery Index Benchmark
+
+Measures NumpyLBPHRecognizer predict latency with and without the gallery
+index as the gallery grows, and the index's recall@1 against the
+exhaustive scan (share of probes where both return the same label).
+
+Identities are synthetic: a real face from the dataset, smoothly warped
+and blended with a per-identity texture, enrolled with the same
+augmentation as training. Probes are fresh augmentations of random
+enrolled identities.
+
+Usage:
+    python benchmarks/gallery_index.py [--identities 100 1000] [--images 2] [--shortlist 8 32 128]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+from src.utils.augmentation import DataAugmentation
+
+
+def dataset_faces():
+    """Original (not augmented) training faces of the bundled dataset"""
+    config = FaceRecognitionConfig()
+    config.AUTO_TRAIN_ON_INIT = False
+    config.PERSIST_MODEL = False
+    config.USE_AUGMENTATION = False
+    model = FaceRecognitionModel(config)
+    faces, _, _ = model.load_dataset(str(DATA_DIR), known_face_names=[])
+    return faces
+
+
+def synthetic_identities(count, rng):
+    """One 100x100 grayscale face per identity"""
+    base_faces = dataset_faces()
+    grid_x, grid_y = np.meshgrid(np.arange(100, dtype=np.float32), np.arange(100, dtype=np.float32))
+
+    identities = []
+    for _ in range(count):
+        base = base_faces[rng.integers(len(base_faces))].astype(np.float32)
+        shift_x, shift_y = (
+            cv2.GaussianBlur(rng.standard_normal((100, 100), dtype=np.float32), (0, 0), 10) for _ in range(2)
+        )
+        warped = cv2.remap(
+            base, grid_x + shift_x * 6 / np.abs(shift_x).max(), grid_y + shift_y * 6 / np.abs(shift_y).max(),
+            cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT
+        )
+        texture = cv2.GaussianBlur(rng.integers(0, 256, (100, 100)).astype(np.float32), (0, 0), 2)
+        texture = cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)
+        identities.append((0.75 * warped + 0.25 * texture).astype(np.uint8))
+    return identities
+
+
+def timed_predict(recognizer, probes):
+    start = time.perf_counter()
+    labels, _ = recognizer.predict_batch(probes)
+    return labels, (time.perf_counter() - start) * 1000 / len(probes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--identities', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--images', type=int, default=2, help='enrolled images per identity')
+    parser.add_argument('--shortlist', type=int, nargs='+', default=[8, 32, 128], help='index_shortlist values')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = np.random.default_rng(0)
+    augmentation = DataAugmentation(config=FaceRecognitionConfig())
+    identities = synthetic_identities(max(args.identities), rng)
+
+    print(f"{'identities':>10} {'faces':>7} {'shortlist':>9} {'ms/face':>8} {'recall@1':>9} {'accuracy':>9} {'train s':>8}")
+    for count in args.identities:
+        faces, labels = [], []
+        for label, face in enumerate(identities[:count]):
+            for _ in range(args.images):
+                samples = augmentation.augment_face(face, FaceRecognitionConfig.AUGMENTATION_FACTOR)
+                faces += samples
+                labels += [label] * len(samples)
+        truth = rng.integers(0, count, args.queries)
+        queries = [augmentation.augment_face(identities[label], 1)[1] for label in truth]
+
+        exhaustive = NumpyLBPHRecognizer()
+        start = time.perf_counter()
+        exhaustive.train(faces, labels)
+        build_s = time.perf_counter() - start
+        expected, exhaustive_ms = timed_predict(exhaustive, queries)
+        print(f"{count:>10} {len(faces):>7} {'all':>9} {exhaustive_ms:8.2f} {1.0:9.1%} "
+              f"{np.mean(expected == truth):9.1%} {build_s:8.1f}")
+
+        for shortlist in args.shortlist:
+            indexed = NumpyLBPHRecognizer(index_min_size=1, index_shortlist=shortlist)
+            start = time.perf_counter()
+            indexed.train(faces, labels)
+            build_s = time.perf_counter() - start
+            predicted, indexed_ms = timed_predict(indexed, queries)
+            print(f"{count:>10} {len(faces):>7} {shortlist:>9} {indexed_ms:8.2f} "
+                  f"{np.mean(predicted == expected):9.1%} {np.mean(predicted == truth):9.1%} {build_s:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
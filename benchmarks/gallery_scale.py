@@ -0,0 +1,141 @@
+"""
+Gallery Scale Benchmark
+
+Trains on growing prefixes of a synthetic dataset (see
+synthetic_dataset.py) and reports, per gallery size: dataset loading and
+training time, peak and retained process memory, predict latency and
+top-1 accuracy on one held-out photo per person. Every size runs in a
+fresh process so memory figures do not carry over.
+
+The dataset is generated into --dataset-dir first when it is missing or
+smaller than the largest size. Rows are printed and, with --output,
+written as CSV for plotting against gallery size.
+
+Usage:
+    python benchmarks/gallery_scale.py [--identities 100 1000 10000] [--images 3]
+                                       [--backend numpy_lbph] [--output scale.csv]
+"""
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import tempfile
+import time
+
+import psutil
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, CACHE_DIR
+from src.models.face_recognition_model import FaceRecognitionModel
+from synthetic_dataset import MANIFEST_FILE, generate_dataset
+
+COLUMNS = ['identities', 'faces', 'train_s', 'peak_rss_mb', 'model_rss_mb', 'predict_ms', 'accuracy']
+
+
+def ensure_dataset(dataset_dir, identities, images):
+    """Generate the synthetic dataset unless a large enough one exists"""
+    manifest_path = os.path.join(dataset_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['identities'] >= identities and manifest['images_per_person'] == images:
+            return
+    print(f"Generating {identities} identities x {images} photos in {dataset_dir}")
+    generate_dataset(dataset_dir, identities, images)
+
+
+def measure_size(dataset_dir, identities, backend, results):
+    """Child process: train on the first `identities` people and report one row"""
+    logging.disable(logging.WARNING)
+    people = sorted(name for name in os.listdir(dataset_dir) if name.startswith('person_'))[:identities]
+
+    # Train on all photos but the last of every person, which are the probes
+    with tempfile.TemporaryDirectory() as train_dir:
+        probes = []
+        for person in people:
+            photos = sorted(os.listdir(os.path.join(dataset_dir, person)))
+            os.makedirs(os.path.join(train_dir, person))
+            for photo in photos[:-1]:
+                os.symlink(os.path.join(dataset_dir, person, photo), os.path.join(train_dir, person, photo))
+            probes.append((person.replace('_', ' ').title(), os.path.join(dataset_dir, person, photos[-1])))
+
+        config = FaceRecognitionConfig()
+        config.AUTO_TRAIN_ON_INIT = False
+        config.PERSIST_MODEL = False
+        config.USE_FACE_CACHE = False
+        config.PREDICTION_CACHE_SIZE = 0
+        config.RECOGNIZER_BACKEND = backend
+        model = FaceRecognitionModel(config)
+
+        rss_before = psutil.Process().memory_info().rss
+        start = time.perf_counter()
+        result = model.train(train_dir)
+        train_s = time.perf_counter() - start
+    if not result['success']:
+        raise SystemExit(result['error'])
+    model_rss = psutil.Process().memory_info().rss - rss_before
+
+    rois = [(name, model.extract_face_from_image(path)) for name, path in probes]
+    rois = [(name, roi) for name, roi in rois if roi is not None]
+    start = time.perf_counter()
+    predictions = [model.face_recognizer.predict(roi) for _, roi in rois]
+    predict_ms = (time.perf_counter() - start) * 1000 / len(rois)
+    correct = sum(model.known_face_names[label] == name for (name, _), (label, _) in zip(rois, predictions))
+
+    results.put({
+        'identities': identities,
+        'faces': result['stats']['total_faces'],
+        'train_s': round(train_s, 2),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'model_rss_mb': round(model_rss / 2 ** 20, 1),
+        'predict_ms': round(predict_ms, 3),
+        'accuracy': round(correct / len(rois), 4)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--identities', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--images', type=int, default=3, help='photos per person, the last one is held out')
+    parser.add_argument('--backend', default=FaceRecognitionConfig.RECOGNIZER_BACKEND)
+    parser.add_argument('--dataset-dir', default=str(CACHE_DIR / 'synthetic_dataset'))
+    parser.add_argument('--output', help='write the rows as CSV here')
+    args = parser.parse_args()
+
+    ensure_dataset(args.dataset_dir, max(args.identities), args.images)
+
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    print(' '.join(f"{column:>12}" for column in COLUMNS))
+    for identities in sorted(args.identities):
+        results = context.Queue()
+        process = context.Process(target=measure_size, args=(args.dataset_dir, identities, args.backend, results))
+        process.start()
+        row = None
+        while row is None:
+            try:
+                row = results.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    raise SystemExit(f"Measuring {identities} identities failed (exit code {process.exitcode})")
+        process.join()
+        rows.append(row)
+        print(' '.join(f"{row[column]:>12}" for column in COLUMNS))
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
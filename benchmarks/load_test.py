@@ -0,0 +1,319 @@
+"""
+Load Test
+
+Replays frames against /recognize or /upload_test from concurrent clients
+and reports latency percentiles, throughput, error rate and server CPU per
+concurrency level, to size worker counts and check performance changes end
+to end.
+
+Frames are every image under --frames (the dataset by default, or any
+directory of recorded frames), resized to --width x --height and
+re-encoded as JPEG, sent round-robin. Each client keeps one connection
+open and sends its next request when the previous one returns. With
+--rate, requests are instead started on a fixed schedule shared by all
+clients, and latency is measured from the scheduled start, so time spent
+waiting for a free client counts (no coordinated omission).
+
+Without --url the app is created in this process (src.app_factory, the
+model trained or loaded like the server does) and driven through the
+Flask test client; server CPU then includes the client threads. Against a
+running instance, pass --server-pid (the gunicorn master; its workers are
+included) to report server CPU.
+
+Usage:
+    python benchmarks/load_test.py [--url http://localhost:5000] [--server-pid PID]
+                                   [--endpoint recognize|upload_test] [--format raw|multipart|json]
+                                   [--concurrency 1 2 4 8] [--rate 0] [--duration 20] [--warmup 2]
+                                   [--frames DIR] [--width 640 --height 480] [--output results.json]
+"""
+import argparse
+import base64
+import http.client
+import itertools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+import psutil
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from src.utils.image_processor import ImageProcessor
+
+ENDPOINTS = {'recognize': '/recognize', 'upload_test': '/upload_test'}
+PAYLOAD_FORMATS = ('raw', 'multipart', 'json')
+
+
+def load_frames(frames_dir, size, quality, limit):
+    """JPEG bytes of up to ``limit`` images under frames_dir, resized to size (0 keeps the original)"""
+    image_processor = ImageProcessor()
+    frames = []
+    for root, _, files in sorted(os.walk(frames_dir)):
+        for filename in sorted(files):
+            if not image_processor.is_image_file(filename):
+                continue
+            image = cv2.imdecode(np.fromfile(os.path.join(root, filename), np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            if size[0] and size[1]:
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+            _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            frames.append(buffer.tobytes())
+            if len(frames) == limit:
+                return frames
+    if not frames:
+        raise SystemExit(f"No images found in {frames_dir}")
+    return frames
+
+
+def build_payload(frame, endpoint, payload_format):
+    """(body, content type) of one request; /upload_test only takes multipart"""
+    if endpoint == 'upload_test' or payload_format == 'multipart':
+        field = 'file' if endpoint == 'upload_test' else 'image'
+        boundary = uuid.uuid4().hex
+        body = b''.join([
+            f'--{boundary}\r\n'.encode(),
+            f'Content-Disposition: form-data; name="{field}"; filename="frame.jpg"\r\n'.encode(),
+            b'Content-Type: image/jpeg\r\n\r\n',
+            frame,
+            f'\r\n--{boundary}--\r\n'.encode(),
+        ])
+        return body, f'multipart/form-data; boundary={boundary}'
+    if payload_format == 'json':
+        data_url = 'data:image/jpeg;base64,' + base64.b64encode(frame).decode('ascii')
+        return json.dumps({'image': data_url}).encode(), 'application/json'
+    return frame, 'image/jpeg'
+
+
+class HttpTransport:
+    """One keep-alive HTTP connection to a running instance"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.prefix = parts.path.rstrip('/')
+        self._connect = lambda: connection_class(parts.hostname, parts.port, timeout=60)
+        self.connection = self._connect()
+
+    def post(self, path, body, content_type):
+        try:
+            self.connection.request('POST', self.prefix + path, body=body, headers={'Content-Type': content_type})
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect for the next request; this one counts as an error
+            self.connection.close()
+            self.connection = self._connect()
+            raise
+
+    def close(self):
+        self.connection.close()
+
+
+class InProcessTransport:
+    """The Flask test client of an app in this process"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, body, content_type):
+        response = self.client.post(path, data=body, content_type=content_type)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+def server_cpu_seconds(processes):
+    """User plus system CPU time of the processes and their children"""
+    total = 0.0
+    for process in processes:
+        for member in [process] + process.children(recursive=True):
+            try:
+                times = member.cpu_times()
+                total += times.user + times.system
+            except psutil.NoSuchProcess:
+                pass
+    return total
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_level(make_transport, payloads, path, concurrency, rate, duration, warmup, processes):
+    """Run one concurrency level; latencies of requests started during warmup are dropped"""
+    start = time.perf_counter() + 0.1
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    sequence = itertools.count()
+    results = []
+    results_lock = threading.Lock()
+
+    def client():
+        transport = make_transport()
+        samples = []
+        try:
+            while True:
+                index = next(sequence)
+                if rate > 0:
+                    scheduled = start + index / rate
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    scheduled = time.perf_counter()
+                if scheduled >= stop_at:
+                    break
+
+                body, content_type = payloads[index % len(payloads)]
+                try:
+                    status, response = transport.post(path, body, content_type)
+                    ok = status == 200 and json.loads(response).get('success', False)
+                    error = None if ok else f'HTTP {status}' if status != 200 else 'success: false'
+                except Exception as e:
+                    error = type(e).__name__
+                finished = time.perf_counter()
+                if scheduled >= measure_from:
+                    samples.append((finished - scheduled, finished, error))
+        finally:
+            transport.close()
+            with results_lock:
+                results.extend(samples)
+
+    threads = [threading.Thread(target=client, name=f'load-client-{n}', daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(max(0.0, measure_from - time.perf_counter()))
+    cpu_before = server_cpu_seconds(processes)
+    wall_before = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    # The window ends with the last response started in it
+    wall = max([finished for _, finished, _ in results], default=stop_at) - wall_before
+    cpu = server_cpu_seconds(processes) - cpu_before
+
+    latencies = sorted(latency for latency, _, error in results if error is None)
+    errors = {}
+    for _, _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+
+    ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        'concurrency': concurrency,
+        'rate': rate or None,
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': round(sum(errors.values()) / len(results), 4) if results else 0.0,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall > 0 else 0.0,
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 0.50)),
+            'p90': ms(percentile(latencies, 0.90)),
+            'p99': ms(percentile(latencies, 0.99)),
+            'max': ms(latencies[-1] if latencies else None),
+        },
+        'server_cpu_percent': round(cpu / wall * 100, 1) if processes and wall > 0 else None,
+        'server_cpu_ms_per_request': round(cpu * 1000 / len(results), 2) if processes and results else None,
+    }
+
+
+def create_local_app():
+    """The app as the server creates it, with warnings-only logging to stderr"""
+    from src.app_factory import create_app
+    from src.utils.async_logging import setup_logging
+
+    setup_logging(level='WARNING', log_file=None)
+    # Trains the model on the dataset, or loads its snapshot, before returning
+    return create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Base URL of a running instance (default: in-process test client)')
+    parser.add_argument('--server-pid', type=int, action='append', default=[],
+                        help='Server process to measure CPU of, with its children (repeatable)')
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='recognize')
+    parser.add_argument('--format', choices=PAYLOAD_FORMATS, default='raw',
+                        help='/recognize body: raw image/jpeg, multipart file or JSON base64')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Concurrent clients; one run per value')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Requests/sec across all clients (0: each client sends back to back)')
+    parser.add_argument('--duration', type=float, default=20.0, help='Measured seconds per level')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each level')
+    parser.add_argument('--frames', default=str(DATA_DIR), help='Directory of images to replay')
+    parser.add_argument('--max-frames', type=int, default=200)
+    parser.add_argument('--width', type=int, default=640, help='Frame width (0 keeps the image size)')
+    parser.add_argument('--height', type=int, default=480, help='Frame height (0 keeps the image size)')
+    parser.add_argument('--quality', type=int, default=80, help='JPEG quality')
+    parser.add_argument('--output', help='Write the results as JSON')
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, (args.width, args.height), args.quality, args.max_frames)
+    payloads = [build_payload(frame, args.endpoint, args.format) for frame in frames]
+    path = ENDPOINTS[args.endpoint]
+
+    if args.url:
+        make_transport = lambda: HttpTransport(args.url)
+        processes = [psutil.Process(pid) for pid in args.server_pid]
+    else:
+        app = create_local_app()
+        make_transport = lambda: InProcessTransport(app)
+        processes = [psutil.Process()]
+
+    payload_format = 'multipart' if args.endpoint == 'upload_test' else args.format
+    average_kb = sum(len(body) for body, _ in payloads) / len(payloads) / 1024
+    print(f"{args.url or 'in-process'} {path} ({payload_format}), {len(frames)} frames "
+          f"at {args.width or 'original'}x{args.height or 'original'} ({average_kb:.0f} KB), "
+          f"{args.duration:g}s per level, {os.cpu_count()} CPU(s)")
+    print(f"{'clients':>7} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'errors':>7} {'cpu %':>6} {'cpu ms/req':>10}")
+
+    levels = []
+    for concurrency in args.concurrency:
+        level = run_level(make_transport, payloads, path, concurrency, args.rate,
+                          args.duration, args.warmup, processes)
+        levels.append(level)
+        latency = level['latency_ms']
+        cell = lambda value, width: f"{value:>{width}}" if value is not None else f"{'-':>{width}}"
+        print(f"{concurrency:>7} {level['requests']:>8} {level['throughput_rps']:>8.1f} "
+              f"{cell(latency['p50'], 8)} {cell(latency['p90'], 8)} {cell(latency['p99'], 8)} "
+              f"{cell(latency['max'], 8)} {level['error_rate']:>7.1%} "
+              f"{cell(level['server_cpu_percent'], 6)} {cell(level['server_cpu_ms_per_request'], 10)}")
+        for error, count in sorted(level['errors'].items()):
+            print(f"{'':>7} {count} x {error}")
+
+    saturation = max(levels, key=lambda level: level['throughput_rps'])
+    print(f"peak throughput {saturation['throughput_rps']:.1f} req/s at {saturation['concurrency']} clients")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'target': args.url or 'in-process',
+                'endpoint': path,
+                'format': payload_format,
+                'frames': len(frames),
+                'frame_size': [args.width, args.height],
+                'rate': args.rate or None,
+                'duration': args.duration,
+                'environment': {'python': platform.python_version(), 'cpus': os.cpu_count()},
+                'levels': levels,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
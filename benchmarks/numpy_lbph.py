@@ -0,0 +1,94 @@
+"""
+NumPy LBPH Benchmark
+
+Trains OpenCV's LBPH recognizer and the vectorized NumpyLBPHRecognizer on
+the faces of the bundled dataset, then predicts noisy copies of those faces
+in "frames" of several faces each. Reports how often both recognizers agree
+on the label, the largest distance difference, and faces/second per frame size.
+
+Usage:
+    python benchmarks/numpy_lbph.py [--faces-per-frame 1 4 16] [--noise 10] [--repeat 3]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+
+
+def load_faces():
+    config = FaceRecognitionConfig()
+    config.AUTO_TRAIN_ON_INIT = False
+    config.PERSIST_MODEL = False
+    model = FaceRecognitionModel(config)
+    faces, labels, _ = model.load_dataset(str(DATA_DIR), known_face_names=[])
+    return faces, np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--faces-per-frame', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--noise', type=int, default=10, help='max +/- pixel noise added to probes')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    faces, labels = load_faces()
+    rng = np.random.default_rng(0)
+    probes = [
+        np.clip(face.astype(np.int16) + rng.integers(-args.noise, args.noise + 1, face.shape), 0, 255).astype(np.uint8)
+        for face in faces
+    ]
+
+    start = time.perf_counter()
+    opencv = cv2.face.LBPHFaceRecognizer_create()
+    opencv.train(faces, labels)
+    opencv_train = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = NumpyLBPHRecognizer()
+    vectorized.train(faces, labels)
+    numpy_train = time.perf_counter() - start
+
+    expected = [opencv.predict(probe) for probe in probes]
+    predicted_labels, predicted_distances = vectorized.predict_batch(probes)
+    agreement = np.mean([label == e[0] for label, e in zip(predicted_labels, expected)])
+    max_diff = max(abs(distance - e[1]) for distance, e in zip(predicted_distances, expected))
+
+    print(f"{len(faces)} gallery faces, {len(probes)} probes")
+    print(f"train: opencv {opencv_train * 1000:.0f} ms, numpy {numpy_train * 1000:.0f} ms")
+    print(f"label agreement {agreement:.1%}, max distance difference {max_diff:.2e}")
+    print(f"{'faces/frame':>11} {'opencv f/s':>11} {'numpy f/s':>10} {'speedup':>8}")
+
+    for size in args.faces_per_frame:
+        frames = [probes[i:i + size] for i in range(0, len(probes) - size + 1, size)]
+        count = sum(len(frame) for frame in frames) * args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for frame in frames:
+                for probe in frame:
+                    opencv.predict(probe)
+        opencv_rate = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for frame in frames:
+                vectorized.predict_batch(frame)
+        numpy_rate = count / (time.perf_counter() - start)
+
+        print(f"{size:>11} {opencv_rate:11.1f} {numpy_rate:10.1f} {numpy_rate / opencv_rate:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Recognizer Backend Benchmark
+
+Compares the RECOGNIZER_BACKEND implementations on the bundled dataset.
+Every person's images are split into train and test (every --test-every'th
+image is held out), the train faces are augmented like a normal training
+run, and each backend is trained on them and asked to name the test faces.
+
+Reported per backend:
+    train ms       time to train on the train faces
+    predict ms     mean latency of one predict() call
+    batch ms/face  per-face latency of predict_batch() over all test faces
+                   (same as predict for backends without batching)
+    model KB       size of the serialized model (write())
+    accuracy       share of test faces given the right label
+    accepted       share of test faces given the right label AND a distance
+                   under the backend's threshold (see RECOGNIZER_THRESHOLDS)
+    false accept   share of test faces accepted as someone when their own
+                   person was left out of training (should be "Unknown")
+    p95 dist       95th percentile distance of correct predictions
+    p5 impostor    5th percentile distance of left-out faces; a threshold
+                   between the two separates known from unknown people
+
+Usage:
+    python benchmarks/recognizer_backends.py [--backends lbph numpy_lbph ...] [--test-every 3]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.recognizers import RECOGNIZER_BACKENDS, create_recognizer, distance_threshold, file_extension
+
+
+def split_dataset(model, test_every):
+    """Train faces (augmented) and test faces with their labels"""
+    train_faces, train_labels, test_faces, test_labels = [], [], [], []
+    people = sorted(
+        entry for entry in os.listdir(DATA_DIR)
+        if os.path.isdir(os.path.join(DATA_DIR, entry))
+    )
+    for label, person in enumerate(people):
+        folder = os.path.join(DATA_DIR, person)
+        paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp'))
+        )
+        for index, path in enumerate(paths):
+            face = model.extract_face_from_image(path)
+            if face is None:
+                continue
+            if index % test_every == test_every - 1:
+                test_faces.append(face)
+                test_labels.append(label)
+                continue
+            faces = [face]
+            if model.augmentation is not None:
+                faces = model.augmentation.augment_face(face, num_augmentations=model.config.AUGMENTATION_FACTOR)
+            train_faces += faces
+            train_labels += [label] * len(faces)
+    return train_faces, np.array(train_labels), test_faces, np.array(test_labels)
+
+
+def impostor_distances(name, config, train_faces, train_labels, test_faces, test_labels):
+    """Distances of each person's test faces to a model trained without that person"""
+    distances = []
+    for person in np.unique(test_labels):
+        keep = train_labels != person
+        recognizer = create_recognizer(name, config)
+        recognizer.train([face for face, kept in zip(train_faces, keep) if kept], train_labels[keep])
+        distances += [recognizer.predict(face)[1] for face, label in zip(test_faces, test_labels) if label == person]
+    return np.array(distances)
+
+
+def model_size(recognizer):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model' + file_extension(recognizer))
+        recognizer.write(path)
+        return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs='+', default=list(RECOGNIZER_BACKENDS))
+    parser.add_argument('--test-every', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    config = FaceRecognitionConfig()
+    config.AUTO_TRAIN_ON_INIT = False
+    config.PERSIST_MODEL = False
+    model = FaceRecognitionModel(config)
+    train_faces, train_labels, test_faces, test_labels = split_dataset(model, args.test_every)
+    print(f"{len(train_faces)} train faces, {len(test_faces)} test faces, {len(set(train_labels))} people")
+    print(f"{'backend':>11} {'train ms':>9} {'predict ms':>11} {'batch ms/face':>14} {'model KB':>9} "
+          f"{'accuracy':>9} {'accepted':>9} {'false accept':>13} {'p95 dist':>9} {'p5 impostor':>12}")
+
+    for name in args.backends:
+        threshold = distance_threshold(config, name)
+        recognizer = create_recognizer(name, config)
+
+        start = time.perf_counter()
+        recognizer.train(train_faces, train_labels)
+        train_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        predictions = [recognizer.predict(face) for face in test_faces]
+        predict_ms = (time.perf_counter() - start) * 1000 / len(test_faces)
+
+        if hasattr(recognizer, 'predict_batch'):
+            start = time.perf_counter()
+            recognizer.predict_batch(test_faces)
+            batch_ms = (time.perf_counter() - start) * 1000 / len(test_faces)
+        else:
+            batch_ms = predict_ms
+
+        labels = np.array([label for label, _ in predictions])
+        distances = np.array([distance for _, distance in predictions])
+        correct = labels == test_labels
+        accepted = correct & (distances < threshold)
+        p95 = np.percentile(distances[correct], 95) if correct.any() else float('nan')
+        impostors = impostor_distances(name, config, train_faces, train_labels, test_faces, test_labels)
+        false_accept = (impostors < threshold).mean()
+
+        print(f"{name:>11} {train_ms:9.0f} {predict_ms:11.2f} {batch_ms:14.2f} {model_size(recognizer) / 1024:9.0f} "
+              f"{correct.mean():9.1%} {accepted.mean():9.1%} {false_accept:13.1%} {p95:9.1f} "
+              f"{np.percentile(impostors, 5):12.1f}")
+
+
+if __name__ == '__main__':
+    main()
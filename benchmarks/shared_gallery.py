@@ -0,0 +1,96 @@
+"""
+Shared Gallery Benchmark
+
+Measures the memory every worker process spends on the gallery when each
+one loads a private copy (what every gunicorn worker did before) versus
+when all of them memory-map the same gallery file.
+
+For every gallery size, a NumPy LBPH gallery of random faces is written to
+a file and WORKERS fresh processes read it and serve predictions. USS is
+the memory only that process holds (what an extra worker costs), PSS
+splits shared pages between the processes mapping them.
+
+Usage:
+    python benchmarks/shared_gallery.py [--faces 1000 5000] [--workers 4]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+import psutil
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+
+CHUNK_SIZE = 500
+
+
+def write_gallery(path, faces, rng):
+    """Train a gallery of random faces chunk by chunk and write it"""
+    recognizer = NumpyLBPHRecognizer()
+    histograms = np.concatenate([
+        recognizer.compute_histograms(list(rng.integers(0, 256, (min(CHUNK_SIZE, faces - start), 100, 100),
+                                                         dtype=np.uint8)))
+        for start in range(0, faces, CHUNK_SIZE)
+    ])
+    recognizer._set_gallery(histograms, np.arange(faces) % 100)
+    recognizer.write(path)
+
+
+def worker(path, private, probes, ready, done):
+    """Serve predictions from the gallery, then report memory and wait"""
+    logging.disable(logging.INFO)
+    baseline = psutil.Process().memory_full_info().uss
+    recognizer = NumpyLBPHRecognizer()
+    recognizer.read(path)
+    if private:
+        recognizer._set_gallery(np.array(recognizer._gallery_histograms()), recognizer._labels)
+    recognizer.predict_batch(probes)
+
+    info = psutil.Process().memory_full_info()
+    ready.put((info.uss - baseline, info.pss))
+    done.wait()
+
+
+def measure(path, private, workers, probes):
+    """Average (USS growth, PSS) over workers that run at the same time"""
+    context = multiprocessing.get_context('spawn')
+    ready, done = context.Queue(), context.Event()
+    processes = [context.Process(target=worker, args=(path, private, probes, ready, done)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    results = [ready.get() for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return np.mean(results, axis=0) / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--faces', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    probes = list(rng.integers(0, 256, (16, 100, 100), dtype=np.uint8))
+
+    print(f"{'faces':>7} {'file MB':>8} {'mode':>8} {'USS MB/worker':>14} {'PSS MB/worker':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for faces in args.faces:
+            path = os.path.join(tmp_dir, f'gallery-{faces}.bin')
+            write_gallery(path, faces, rng)
+            size = os.path.getsize(path) / 2 ** 20
+            for private in (True, False):
+                uss, pss = measure(path, private, args.workers, probes)
+                print(f"{faces:>7} {size:8.1f} {'private' if private else 'mapped':>8} {uss:14.1f} {pss:14.1f}")
+
+
+if __name__ == '__main__':
+    main()
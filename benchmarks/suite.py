@@ -0,0 +1,261 @@
+"""
+Hot Path Benchmark Suite
+
+Times every stage of training and recognition on its own, so a slowdown
+can be traced to the stage that caused it:
+
+    image.load_image            ImageProcessor.load_image of a dataset photo
+    face.extract                cascade detection + crop (extract_face_from_image)
+    augment.augment_face        DataAugmentation.augment_face, AUGMENTATION_FACTOR copies
+    train.<N>images             FaceRecognitionModel.train on N dataset photos
+    recognize.<W>x<H>.<N>faces  recognize_faces on a frame tiled with N photos
+    api.recognize               POST /recognize (raw JPEG) through the Flask test client
+
+Every case runs until it has at least --min-repeats samples and
+--min-time seconds. The median, minimum and 90th percentile per case are
+written as JSON (--output); with --baseline, medians are compared against
+a stored results file and the run fails (exit status 1) when any case is
+more than --threshold slower. Timings only compare on the same machine,
+so regenerate the baseline there with --update-baseline.
+
+--dataset trains the recognition gallery on another dataset, e.g. one
+made by synthetic_dataset.py, to time recognition at a larger gallery.
+
+Usage:
+    python benchmarks/suite.py [--filter recognize] [--output results.json]
+                               [--baseline benchmarks/baseline.json] [--threshold 0.25]
+                               [--update-baseline] [--dataset DIR]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from flask import Flask
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.api.routes import api_bp
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.augmentation import DataAugmentation
+from src.utils.image_processor import ImageProcessor
+from src.utils.people_manager import PeopleManager
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SAMPLE_IMAGE = DATA_DIR / 'thanh' / 'thanh1.jpg'
+
+FRAME_SIZES = [(320, 240), (640, 480), (1280, 720)]
+FACE_COUNTS = [1, 4]
+# Training set: the first images of the first people of the dataset
+TRAIN_PEOPLE = 3
+TRAIN_IMAGES_PER_PERSON = 2
+
+
+def bench_config():
+    """Config without caches, persistence or parallelism, so every run does the same work"""
+    config = FaceRecognitionConfig()
+    config.AUTO_TRAIN_ON_INIT = False
+    config.PERSIST_MODEL = False
+    config.USE_FACE_CACHE = False
+    config.PREDICTION_CACHE_SIZE = 0
+    config.TRAINING_WORKERS = 1
+    config.BATCH_WORKERS = 1
+    return config
+
+
+def tiled_frame(size, faces):
+    """A BGR frame of the given size made of a grid of `faces` copies of the sample photo"""
+    per_side = int(np.ceil(np.sqrt(faces)))
+    width, height = size
+    image = cv2.imread(str(SAMPLE_IMAGE))
+    tile = cv2.resize(image, (width // per_side, height // per_side))
+    frame = np.full((height, width, 3), 127, dtype=np.uint8)
+    for index in range(faces):
+        row, column = divmod(index, per_side)
+        frame[row * tile.shape[0]:(row + 1) * tile.shape[0], column * tile.shape[1]:(column + 1) * tile.shape[1]] = tile
+    return frame
+
+
+def training_subset(work_dir):
+    """Copy a small fixed part of the dataset into work_dir; returns the number of images"""
+    processor = ImageProcessor()
+    count = 0
+    people = [item for item in sorted(os.listdir(DATA_DIR)) if (DATA_DIR / item).is_dir()]
+    for person in people[:TRAIN_PEOPLE]:
+        images = [name for name in sorted(os.listdir(DATA_DIR / person)) if processor.is_image_file(name)]
+        os.makedirs(os.path.join(work_dir, person))
+        for name in images[:TRAIN_IMAGES_PER_PERSON]:
+            shutil.copy(DATA_DIR / person / name, os.path.join(work_dir, person, name))
+            count += 1
+    return count
+
+
+def build_cases(model, work_dir):
+    """(name, callable) of every benchmark case; the model must be trained"""
+    processor = ImageProcessor(config=model.config)
+    augmentation = DataAugmentation(config=model.config)
+    face_roi = model.extract_face_from_image(str(SAMPLE_IMAGE))
+    train_model = FaceRecognitionModel(bench_config())
+    train_images = training_subset(work_dir)
+
+    cases = [
+        ('image.load_image', lambda: processor.load_image(str(SAMPLE_IMAGE))),
+        ('face.extract', lambda: model.extract_face_from_image(str(SAMPLE_IMAGE))),
+        ('augment.augment_face', lambda: augmentation.augment_face(face_roi, model.config.AUGMENTATION_FACTOR)),
+        (f'train.{train_images}images', lambda: train_model.train(work_dir)),
+    ]
+
+    for size in FRAME_SIZES:
+        for faces in FACE_COUNTS:
+            frame = tiled_frame(size, faces)
+            cases.append((f'recognize.{size[0]}x{size[1]}.{faces}faces',
+                          lambda frame=frame: model.recognize_faces(frame)))
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    app.face_model = model
+    app.people_manager = PeopleManager()
+    client = app.test_client()
+    _, buffer = cv2.imencode('.jpg', tiled_frame((640, 480), 1))
+    body = buffer.tobytes()
+
+    def post_recognize():
+        response = client.post('/recognize', data=body, content_type='image/jpeg')
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    cases.append(('api.recognize', post_recognize))
+    return cases
+
+
+def time_case(func, min_repeats, min_time):
+    """Call func (after one warm-up call) until both limits are reached; returns samples in ms"""
+    func()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_repeats or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.array(samples)
+
+
+def environment(gallery_faces):
+    """What the timings depend on besides the code"""
+    return {
+        'gallery_faces': gallery_faces,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'recognizer_backend': FaceRecognitionConfig.RECOGNIZER_BACKEND,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare case medians against a baseline
+
+    Returns:
+        Names of cases more than threshold slower than the baseline
+    """
+    regressions = []
+    print(f"\n{'case':<28} {'baseline ms':>12} {'now ms':>10} {'change':>8}")
+    for name, result in results['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"{name:<28} {'-':>12} {result['median_ms']:10.3f} {'new':>8}")
+            continue
+        change = result['median_ms'] / reference['median_ms'] - 1.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<28} {reference['median_ms']:12.3f} {result['median_ms']:10.3f} {change:+8.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    if baseline.get('environment') != results['environment']:
+        print("note: baseline was recorded in a different environment, timings may not be comparable")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown of the median (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='write the results to --baseline')
+    parser.add_argument('--min-repeats', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds per case')
+    parser.add_argument('--dataset', default=str(DATA_DIR), help='dataset to train the recognition gallery on')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        # The recognition cases use the whole dataset as gallery; extracting it is setup, so use the ROI cache
+        config = bench_config()
+        config.USE_FACE_CACHE = True
+        model = FaceRecognitionModel(config)
+        trained = model.train(args.dataset)
+        if not trained['success']:
+            raise SystemExit(f"Could not train on {args.dataset}")
+
+        results = {
+            'format_version': RESULTS_FORMAT_VERSION,
+            'created_at': time.time(),
+            'environment': environment(trained['stats']['total_faces']),
+            'results': {}
+        }
+        print(f"{'case':<28} {'median ms':>10} {'min ms':>10} {'p90 ms':>10} {'runs':>6}")
+        for name, func in build_cases(model, work_dir):
+            if args.filter not in name:
+                continue
+            samples = time_case(func, args.min_repeats, args.min_time)
+            results['results'][name] = {
+                'median_ms': round(float(np.median(samples)), 4),
+                'min_ms': round(float(samples.min()), 4),
+                'p90_ms': round(float(np.percentile(samples, 90)), 4),
+                'runs': len(samples)
+            }
+            stats = results['results'][name]
+            print(f"{name:<28} {stats['median_ms']:10.3f} {stats['min_ms']:10.3f} {stats['p90_ms']:10.3f} {len(samples):6d}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; record one with --update-baseline")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
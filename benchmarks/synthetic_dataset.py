@@ -0,0 +1,250 @@
+"""
+Synthetic Dataset Generator
+
+Builds a large dataset in the folder-per-person layout ``load_dataset``
+reads, for measuring training and recognition at thousands of identities.
+
+Every identity starts from a face-centred crop of a bundled dataset photo
+that is smoothly warped, tinted and blended with its own texture, so
+identities differ in the LBP features recognition uses. Each of its
+photos is a variant of that portrait made by the training augmentation
+transforms (DataAugmentation: rotation, brightness, contrast, flip, noise,
+shift), placed on a background of the requested resolution. With more
+than one face per image the others are smaller faces of other identities,
+so the person's own face stays the largest, the one training uses.
+
+The output depends only on the arguments and the bundled dataset: the
+same --seed produces the same files.
+
+Usage:
+    python benchmarks/synthetic_dataset.py OUTPUT_DIR [--identities 1000] [--images 3]
+                                           [--resolution 640x480] [--faces 1] [--seed 0]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.utils.augmentation import DataAugmentation
+from src.utils.face_cache import FaceROICache, content_digest
+from src.utils.image_processor import ImageProcessor
+
+MANIFEST_FILE = 'synthetic.json'
+PORTRAIT_SIZE = 224
+# Portrait side relative to the detected face box
+PORTRAIT_MARGIN = 1.8
+# Identity warp: control points per side of the displacement field, amplitude as a fraction of the side
+WARP_GRID = 6
+WARP_AMPLITUDE = 0.03
+TEXTURE_WEIGHT = 0.2
+# imdecode flags by downscale factor
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+
+def square_crop(image, box):
+    """Square region of PORTRAIT_MARGIN times the box size around its centre, mirrored at the edges"""
+    x, y, w, h = box
+    side = int(max(w, h) * PORTRAIT_MARGIN)
+    left, top = x + w // 2 - side // 2, y + h // 2 - side // 2
+    height, width = image.shape[:2]
+    crop = image[max(top, 0):min(top + side, height), max(left, 0):min(left + side, width)]
+    return cv2.copyMakeBorder(
+        crop, max(-top, 0), max(top + side - height, 0), max(-left, 0), max(left + side - width, 0),
+        cv2.BORDER_REFLECT
+    )
+
+
+def source_portraits(dataset_dir=DATA_DIR, size=PORTRAIT_SIZE):
+    """Square, face-centred BGR crops of every dataset photo with a detectable face"""
+    config = FaceRecognitionConfig()
+    processor = ImageProcessor(config=config)
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + config.FACE_CASCADE_FILE)
+    # Training already found the faces of the bundled photos
+    face_cache = FaceROICache(config.FACE_CACHE_FILE, config=config) if config.USE_FACE_CACHE else None
+
+    portraits = []
+    for root, _, files in sorted(os.walk(dataset_dir)):
+        for filename in sorted(files):
+            if not processor.is_image_file(filename):
+                continue
+            image_bytes = processor.read_image_bytes(os.path.join(root, filename))
+            if image_bytes is None:
+                continue
+
+            digest = content_digest(image_bytes)
+            cached = face_cache.get(digest) if face_cache is not None else None
+            if cached is not None:
+                box = cached[2]
+                if box is None:
+                    continue
+                # Known box: decode only at the resolution the portrait needs (JPEG DCT scaling)
+                scale = max([factor for factor in REDUCED_DECODE_FLAGS
+                             if max(box[2:]) * PORTRAIT_MARGIN / factor >= size], default=1)
+                image = cv2.imdecode(image_bytes, REDUCED_DECODE_FLAGS[scale])
+                box = tuple(value // scale for value in box)
+            else:
+                image = processor.decode_image(image_bytes)
+                if image is None:
+                    continue
+                face_roi, box = processor.extract_largest_face(cascade, image)
+                if face_cache is not None:
+                    face_cache.put(digest, face_roi, box)
+            if image is None or box is None:
+                continue
+
+            portraits.append(cv2.resize(square_crop(image, box), (size, size), interpolation=cv2.INTER_AREA))
+
+    if face_cache is not None:
+        face_cache.flush()
+    if not portraits:
+        raise SystemExit(f"No faces found in {dataset_dir}")
+    return portraits
+
+
+def make_identity(portrait, rng):
+    """A new identity: the portrait warped, tinted and blended with a random texture"""
+    size = portrait.shape[0]
+    grid_x, grid_y = np.meshgrid(np.arange(size, dtype=np.float32), np.arange(size, dtype=np.float32))
+    # Random displacements on a coarse grid, interpolated to a smooth field
+    shift_x, shift_y = (
+        cv2.resize(rng.standard_normal((WARP_GRID, WARP_GRID), dtype=np.float32), (size, size),
+                   interpolation=cv2.INTER_CUBIC)
+        for _ in range(2)
+    )
+    amplitude = WARP_AMPLITUDE * size
+    warped = cv2.remap(
+        portrait, grid_x + shift_x * amplitude / np.abs(shift_x).max(),
+        grid_y + shift_y * amplitude / np.abs(shift_y).max(),
+        cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT
+    ).astype(np.float32)
+
+    texture = cv2.GaussianBlur(rng.integers(0, 256, (size, size)).astype(np.float32), (0, 0), 2)
+    texture = cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)[:, :, None]
+    tint = rng.uniform(0.85, 1.15, 3).astype(np.float32)
+    identity = (1 - TEXTURE_WEIGHT) * warped * tint + TEXTURE_WEIGHT * texture
+    return np.clip(identity, 0, 255).astype(np.uint8)
+
+
+def make_background(portrait, resolution):
+    """A dim, blurred photo of the given (width, height) to place faces on"""
+    width, height = resolution
+    image = cv2.resize(portrait, (width, height))
+    return cv2.GaussianBlur(image, (0, 0), max(width, height) / 100) // 2 + 40
+
+
+def compose_image(faces, background, rng):
+    """
+    Place faces on a copy of the background
+
+    The first face gets the largest slot of a grid, the others are smaller.
+    """
+    image = background.copy()
+    height, width = image.shape[:2]
+
+    per_side = int(np.ceil(np.sqrt(len(faces))))
+    cell_w, cell_h = width // per_side, height // per_side
+    for index, face in enumerate(faces):
+        row, column = divmod(index, per_side)
+        scale = rng.uniform(0.85, 0.95) if index == 0 else rng.uniform(0.5, 0.7)
+        side = int(min(cell_w, cell_h) * scale)
+        x = column * cell_w + int(rng.integers(0, cell_w - side + 1))
+        y = row * cell_h + int(rng.integers(0, cell_h - side + 1))
+        image[y:y + side, x:x + side] = cv2.resize(face, (side, side), interpolation=cv2.INTER_AREA)
+    return image
+
+
+def generate_dataset(output_dir, identities, images_per_person, resolution=(640, 480),
+                     faces_per_image=1, seed=0, progress_callback=None):
+    """
+    Write a synthetic dataset to output_dir
+
+    Args:
+        output_dir: Dataset root, one ``person_NNNNN`` folder per identity
+        identities: Number of people
+        images_per_person: Photos per person
+        resolution: (width, height) of every photo
+        faces_per_image: Faces per photo (the person's plus smaller others)
+        seed: Random seed
+        progress_callback: Called with (written, total) photo counts
+
+    Returns:
+        Manifest of the generated dataset (also saved as synthetic.json)
+    """
+    rng = np.random.default_rng(seed)
+    # DataAugmentation draws from NumPy's global generator
+    np.random.seed(seed)
+    augmentation = DataAugmentation(config=FaceRecognitionConfig())
+    portraits = source_portraits()
+    identity_portraits = [make_identity(portraits[rng.integers(len(portraits))], rng) for _ in range(identities)]
+    backgrounds = [make_background(portrait, resolution) for portrait in portraits]
+
+    os.makedirs(output_dir, exist_ok=True)
+    total = identities * images_per_person
+    digits = max(5, len(str(identities - 1)))
+    for person, portrait in enumerate(identity_portraits):
+        person_dir = os.path.join(output_dir, f"person_{person:0{digits}d}")
+        os.makedirs(person_dir, exist_ok=True)
+        for image_index in range(images_per_person):
+            faces = [augmentation.augment_face(portrait, 1)[1]]
+            for _ in range(faces_per_image - 1):
+                other = (person + 1 + int(rng.integers(identities - 1))) % identities if identities > 1 else person
+                faces.append(augmentation.augment_face(identity_portraits[other], 1)[1])
+            image = compose_image(faces, backgrounds[rng.integers(len(backgrounds))], rng)
+            cv2.imwrite(os.path.join(person_dir, f"img_{image_index:03d}.jpg"), image,
+                        [cv2.IMWRITE_JPEG_QUALITY, 90])
+            if progress_callback:
+                progress_callback(person * images_per_person + image_index + 1, total)
+
+    manifest = {
+        "identities": identities,
+        "images_per_person": images_per_person,
+        "resolution": list(resolution),
+        "faces_per_image": faces_per_image,
+        "seed": seed,
+        "source_portraits": len(portraits),
+        "created_at": time.time()
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output_dir')
+    parser.add_argument('--identities', type=int, default=1000)
+    parser.add_argument('--images', type=int, default=3, help='photos per person')
+    parser.add_argument('--resolution', type=parse_resolution, default=(640, 480), help='WIDTHxHEIGHT')
+    parser.add_argument('--faces', type=int, default=1, help='faces per photo')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    def progress(written, total):
+        if written % 500 == 0 or written == total:
+            print(f"\r{written}/{total} photos", end='', flush=True)
+
+    start = time.perf_counter()
+    generate_dataset(args.output_dir, args.identities, args.images, args.resolution,
+                     args.faces, args.seed, progress)
+    print(f"\nWrote {args.identities} people to {args.output_dir} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
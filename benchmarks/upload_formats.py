@@ -0,0 +1,92 @@
+"""
+/recognize Upload Format Benchmark
+
+Measures bytes on the wire and server time per frame for the three ways a
+frame can be posted to /recognize: JSON base64 data URL, raw image/jpeg body
+and multipart file. The model is left untrained so recognition returns right
+after decoding and only the ingestion cost is timed.
+
+Usage:
+    python benchmarks/upload_formats.py [--requests 200] [--width 640 --height 480]
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from flask import Flask
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from src.api.routes import api_bp
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.people_manager import PeopleManager
+
+
+def load_frame(size):
+    """A webcam-sized JPEG frame from the dataset"""
+    for root, _, files in sorted(os.walk(DATA_DIR)):
+        for filename in sorted(files):
+            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+                image = cv2.imdecode(np.fromfile(os.path.join(root, filename), np.uint8), cv2.IMREAD_COLOR)
+                if image is not None:
+                    _, buffer = cv2.imencode('.jpg', cv2.resize(image, size), [cv2.IMWRITE_JPEG_QUALITY, 80])
+                    return buffer.tobytes()
+    raise SystemExit(f"No images found in {DATA_DIR}")
+
+
+def build_client():
+    """Flask test client around an untrained model"""
+    config = FaceRecognitionConfig()
+    config.AUTO_TRAIN_ON_INIT = False
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    app.face_model = FaceRecognitionModel(config)
+    app.people_manager = PeopleManager()
+    return app.test_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    client = build_client()
+    frame = load_frame((args.width, args.height))
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(frame).decode()
+    json_body = json.dumps({'image': data_url}).encode()
+
+    formats = {
+        'json base64': lambda: client.post('/recognize', data=json_body, content_type='application/json'),
+        'raw image/jpeg': lambda: client.post('/recognize', data=frame, content_type='image/jpeg'),
+        'multipart': lambda: client.post('/recognize', data={'image': (io.BytesIO(frame), 'frame.jpg')}),
+    }
+    wire_bytes = {
+        'json base64': len(json_body),
+        'raw image/jpeg': len(frame),
+        # Boundary and part headers add a fixed ~200 bytes
+        'multipart': len(frame) + 200,
+    }
+
+    print(f"{args.width}x{args.height} JPEG frame, {len(frame)} bytes, {args.requests} requests per format")
+    for name, post in formats.items():
+        assert post().get_json()['success']
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            post()
+        per_frame = (time.perf_counter() - start) * 1000 / args.requests
+        print(f"{name:<16} {wire_bytes[name]:>8} bytes/frame  {per_frame:6.2f} ms/frame")
+
+
+if __name__ == '__main__':
+    main()
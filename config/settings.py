@@ -12,15 +12,47 @@ CAPTURES_DIR = PROJECT_ROOT / "captures"
 CONFIG_DIR = PROJECT_ROOT / "config"
 TEMPLATES_DIR = PROJECT_ROOT / "templates"
 STATIC_DIR = PROJECT_ROOT / "static"
+CACHE_DIR = PROJECT_ROOT / "cache"
 
 # Face Recognition Settings
 class FaceRecognitionConfig:
     # Model settings
     CONFIDENCE_THRESHOLD = 100
-    MIN_FACE_SIZE = (50, 50)
+    MIN_FACE_SIZE = (50, 50)  # training images
+    RECOGNITION_MIN_FACE_SIZE = (30, 30)  # live frames
     FACE_CASCADE_FILE = "haarcascade_frontalface_default.xml"
     FACE_SIZE_NORMALIZED = (100, 100)
     
+    # Recognizer implementation (see src/models/recognizers.py):
+    #   "lbph"        OpenCV LBPH
+    #   "numpy_lbph"  vectorized NumPy port of LBPH, same predictions, batched scoring
+    #   "knn_lbph"    k-nearest-neighbour over LBP histograms (Hellinger distance)
+    #   "eigen"       OpenCV Eigenfaces
+    #   "fisher"      OpenCV Fisherfaces (needs at least two people)
+    RECOGNIZER_BACKEND = os.environ.get('RECOGNIZER_BACKEND', 'lbph')
+    KNN_NEIGHBORS = 3
+    
+    # numpy_lbph: from this many gallery faces, shortlist GALLERY_INDEX_SHORTLIST faces by
+    # their GALLERY_INDEX_DIM-long PCA codes and re-rank only those exactly (0 = always
+    # scan everything). A longer shortlist raises recall@1 against the full scan
+    # (see benchmarks/gallery_index.py)
+    GALLERY_INDEX_MIN_SIZE = int(os.environ.get('GALLERY_INDEX_MIN_SIZE', 2000))
+    GALLERY_INDEX_DIM = 128
+    GALLERY_INDEX_SHORTLIST = 64
+    
+    # CONFIDENCE_THRESHOLD is on the LBPH distance scale; backends with other distance
+    # scales use their own threshold (calibrated with benchmarks/recognizer_backends.py)
+    RECOGNIZER_THRESHOLDS = {
+        "knn_lbph": 5.8,
+        "eigen": 2000.0,
+        "fisher": 300.0,
+    }
+    
+    # Face detection runs on a copy downscaled to this longest side (0 = full resolution);
+    # boxes are mapped back and ROIs are cut from the full-resolution image. Off by default:
+    # downscaling loses small faces (see benchmarks/detection_scale.py before enabling it)
+    DETECTION_MAX_SIDE = int(os.environ.get('DETECTION_MAX_SIDE', 0))
+    
     # Data augmentation
     USE_AUGMENTATION = True
     AUGMENTATION_FACTOR = 2
@@ -33,12 +65,52 @@ class FaceRecognitionConfig:
     NOISE_STD = 5
     TRANSLATION_RANGE = (-5, 5)  # pixels
     
+    # Keep only this many representative samples (k-medoids) per person after
+    # augmentation (0 = keep every sample). Skipped when held-out accuracy would
+    # drop by more than GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS
+    GALLERY_PROTOTYPES = int(os.environ.get('GALLERY_PROTOTYPES', 0))
+    GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS = 0.02
+    
     # Training quality thresholds
     QUALITY_THRESHOLDS = {
         "excellent": 3,  # 3+ images = ⭐⭐⭐
         "good": 2,       # 2 images = ⭐⭐
         "basic": 1       # 1 image = ⭐
     }
+    
+    # Train (or load the snapshot) from ./dataset when the model is created
+    AUTO_TRAIN_ON_INIT = True
+    
+    # Model persistence (snapshot is reused when the dataset fingerprint matches)
+    PERSIST_MODEL = True
+    MODEL_SNAPSHOT_DIR = CACHE_DIR / "model"
+    # Seconds between checks for a model another worker process saved (0 = never switch)
+    SHARED_MODEL_SYNC_INTERVAL = float(os.environ.get('SHARED_MODEL_SYNC_INTERVAL', 2.0))
+    
+    # Extracted face ROI cache for training (single memory-mapped file)
+    USE_FACE_CACHE = True
+    FACE_CACHE_FILE = CACHE_DIR / "face_rois.bin"
+    
+    # Parallel face extraction during training (0 = one worker per CPU core, 1 = serial)
+    TRAINING_WORKERS = int(os.environ.get('TRAINING_WORKERS', 0))
+    TRAINING_CHUNK_SIZE = 4  # images per worker task
+    
+    # Batch recognition (0 = one detection thread per CPU core, 1 = serial)
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 0))
+    MAX_BATCH_SIZE = 32  # images per /recognize_batch request
+    
+    # Face tracking in streaming sessions (skips re-predicting faces that stay in view)
+    TRACKER_IOU_THRESHOLD = 0.3  # match a detection to a track by overlap...
+    TRACKER_MAX_CENTER_SHIFT = 0.5  # ...or by center distance, relative to the face size
+    TRACKER_REPREDICT_INTERVAL = 10  # frames between identity refreshes
+    TRACKER_REPREDICT_IOU = 0.5  # re-predict when the box overlaps its last predicted box less than this
+    TRACKER_MAX_MISSES = 3  # frames a face may go undetected before its track is dropped
+    TRACKER_VOTE_WINDOW = 5  # recent predictions the identity is voted over
+    
+    # Cache of recent predictions keyed by perceptual hash of the face ROI (0 = disabled)
+    PREDICTION_CACHE_SIZE = 512
+    PREDICTION_CACHE_TTL = 5.0  # seconds
+    PREDICTION_CACHE_MAX_DISTANCE = 4  # Hamming distance (bits of 64) still counted as the same ROI
 
 # Flask App Settings
 class AppConfig:
@@ -50,12 +122,26 @@ class AppConfig:
     # File upload settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    
+    # Admin endpoints (profiling) are only registered when a token is set; send it as
+    # "Authorization: Bearer <token>" or in the X-Admin-Token header
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    PROFILE_DIR = PROJECT_ROOT / "logs" / "profiles"
+    PROFILE_MAX_REQUESTS = 100  # requests one capture may profile
+    
+    # WebSocket streaming (flask-sock / simple-websocket server options)
+    SOCK_SERVER_OPTIONS = {
+        'ping_interval': 25,  # seconds, keeps idle connections alive through proxies
+        'max_message_size': MAX_CONTENT_LENGTH
+    }
 
 # Database/Storage Settings
 class StorageConfig:
     PEOPLE_INFO_FILE = PROJECT_ROOT / "config" / "people_info.json"
     DATASET_PATH = DATA_DIR
     CAPTURES_PATH = CAPTURES_DIR
+    # Training job status shared by all worker processes, next to the model snapshot
+    TRAINING_JOBS_FILE = FaceRecognitionConfig.MODEL_SNAPSHOT_DIR / "training_jobs.json"
     
     # Ensure directories exist
     @classmethod
@@ -75,7 +161,16 @@ class StorageConfig:
 class LogConfig:
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    LOG_FILE = PROJECT_ROOT / "logs" / "face_recognition.log"
+    LOG_FILE = Path(os.environ.get('LOG_FILE', PROJECT_ROOT / "logs" / "face_recognition.log"))
+    LOG_QUEUE_SIZE = 10000  # records waiting for the writer thread before new ones are dropped
+    LOG_SUMMARY_INTERVAL = 60.0  # seconds between summaries of per-face and per-image events
+    
+    # Per-request tracing: share of requests traced (0 = off, 1 = all). Traced
+    # requests get a Server-Timing header and are appended to TRACE_FILE in batches
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.0))
+    TRACE_FILE = Path(os.environ.get('TRACE_FILE', PROJECT_ROOT / "logs" / "traces.jsonl"))
+    TRACE_BATCH_SIZE = 20  # traces per file append
+    TRACE_FLUSH_INTERVAL = 5.0  # seconds a trace may wait in the buffer
 
 # Main Configuration Class
 class Config:
@@ -92,6 +187,10 @@ class Config:
     DEBUG = AppConfig.DEBUG
     HOST = AppConfig.HOST
     PORT = AppConfig.PORT
+    SOCK_SERVER_OPTIONS = AppConfig.SOCK_SERVER_OPTIONS
+    ADMIN_TOKEN = AppConfig.ADMIN_TOKEN
+    PROFILE_DIR = AppConfig.PROFILE_DIR
+    PROFILE_MAX_REQUESTS = AppConfig.PROFILE_MAX_REQUESTS
     
     CONFIDENCE_THRESHOLD = FaceRecognitionConfig.CONFIDENCE_THRESHOLD
     USE_AUGMENTATION = FaceRecognitionConfig.USE_AUGMENTATION
@@ -99,6 +198,11 @@ class Config:
     DATASET_PATH = StorageConfig.DATASET_PATH
     PEOPLE_INFO_FILE = StorageConfig.PEOPLE_INFO_FILE
     
+    TRACE_SAMPLE_RATE = LogConfig.TRACE_SAMPLE_RATE
+    TRACE_FILE = LogConfig.TRACE_FILE
+    TRACE_BATCH_SIZE = LogConfig.TRACE_BATCH_SIZE
+    TRACE_FLUSH_INTERVAL = LogConfig.TRACE_FLUSH_INTERVAL
+    
     @classmethod
     def init_app(cls):
         """Initialize application directories and logging"""
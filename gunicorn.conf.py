@@ -0,0 +1,43 @@
+"""
+Gunicorn configuration for production
+
+    gunicorn -c gunicorn.conf.py
+
+The app, and with it the face model, is created once in the master before
+any worker is forked: the model is trained (or loaded from its snapshot) a
+single time, and every worker, including respawned ones, starts with the
+master's trained model shared copy-on-write instead of training its own.
+State that must not cross a fork is re-created in each worker by post_fork.
+"""
+import gc
+import logging
+import os
+import time
+
+bind = os.environ.get('GUNICORN_BIND', f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}")
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+# Threads per worker; WebSocket streaming (flask-sock) holds a thread per open stream
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 60
+
+wsgi_app = 'src.app_factory:create_app()'
+preload_app = True
+
+logger = logging.getLogger('gunicorn.error')
+
+
+def pre_fork(server, worker):
+    # Everything allocated so far lives as long as the master; moving it out of the
+    # collector's reach stops gc passes in the workers from copying those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    start = time.perf_counter()
+    app = server.app.wsgi()
+    app.face_model.reinit_after_fork()
+    logger.info(
+        f"Worker {worker.pid} ready in {(time.perf_counter() - start) * 1000:.0f}ms "
+        f"with model version {app.face_model.model_version}"
+    )
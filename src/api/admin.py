@@ -0,0 +1,164 @@
+"""
+Admin API Routes
+Token-protected operational endpoints (profiling, memory accounting)
+
+The profiling routes are only registered when ADMIN_TOKEN is configured,
+so a deployment without a token has neither those endpoints nor their
+request hook. ``/debug/memory`` is always registered and answers 403
+without a token. Every request must send the token as ``Authorization:
+Bearer <token>`` or in the ``X-Admin-Token`` header.
+"""
+import hmac
+import os
+from functools import wraps
+import logging
+
+from flask import Blueprint, current_app, g, jsonify, request, send_from_directory
+
+from src.utils.memory import REQUEST_BUFFERS, process_memory, top_allocators
+from src.utils.profiling import PROFILE_EXTENSIONS, Profiler
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+debug_bp = Blueprint('debug', __name__)
+
+
+def _request_token() -> str:
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        return authorization[len('Bearer '):]
+    return request.headers.get('X-Admin-Token', '')
+
+
+def require_admin(view):
+    """Reject requests without the admin token (403)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get('ADMIN_TOKEN')
+        if not token or not hmac.compare_digest(_request_token().encode(), token.encode()):
+            return jsonify({'success': False, 'error': 'Admin token required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/admin/profiles', methods=['POST'])
+@require_admin
+def start_profile():
+    """
+    Arm a profile capture
+
+    JSON body: ``target`` ("requests" or "training"), ``mode`` ("cprofile"
+    or "sampling"), ``requests`` (how many requests, for the requests
+    target) and ``interval_ms`` (sampling interval).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        capture = current_app.profiler.arm(
+            target=data.get('target', 'requests'),
+            mode=data.get('mode', 'cprofile'),
+            requests=int(data.get('requests', 1)),
+            interval=float(data.get('interval_ms', 5)) / 1000
+        )
+        return jsonify({'success': True, 'capture': capture.to_dict()}), 202
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    except Exception as e:
+        logger.error(f"Start profile error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@admin_bp.route('/admin/profiles', methods=['DELETE'])
+@require_admin
+def cancel_profile():
+    """Cancel the armed capture if it has not started"""
+    capture = current_app.profiler.cancel()
+    if capture is None:
+        return jsonify({'success': False, 'error': 'No capture waiting to start'}), 409
+    return jsonify({'success': True, 'capture': capture.to_dict()})
+
+
+@admin_bp.route('/admin/profiles')
+@require_admin
+def list_profiles():
+    """Saved profiles, newest first, with the active and the last capture"""
+    try:
+        profiler = current_app.profiler
+        active, last = profiler.capture, profiler.last_capture
+        return jsonify({
+            'success': True,
+            'active': active.to_dict() if active is not None else None,
+            'last': last.to_dict() if last is not None else None,
+            'profiles': profiler.list_profiles()
+        })
+
+    except Exception as e:
+        logger.error(f"List profiles error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@admin_bp.route('/admin/profiles/<filename>')
+@require_admin
+def download_profile(filename):
+    """Download a saved pstats or collapsed-stack file"""
+    if os.path.splitext(filename)[1] not in PROFILE_EXTENSIONS.values():
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    # send_from_directory rejects paths outside the directory
+    return send_from_directory(os.path.abspath(current_app.profiler.output_dir), filename, as_attachment=True)
+
+
+@debug_bp.route('/debug/memory')
+@require_admin
+def debug_memory():
+    """
+    Memory of this worker process, broken down by component
+
+    Query parameter ``top`` limits the tracemalloc allocators listed
+    (only available when the server runs with PYTHONTRACEMALLOC set).
+    """
+    try:
+        face_model = current_app.face_model
+        training_memory = face_model.training_stats.get('memory')
+        return jsonify({
+            'success': True,
+            'pid': os.getpid(),
+            'process': process_memory(detailed=True),
+            'components': face_model.memory_usage(),
+            'request_buffers': REQUEST_BUFFERS.get_stats(),
+            'last_training': {
+                key: value for key, value in training_memory.items() if key != 'top_allocators'
+            } if training_memory else None,
+            'top_allocators': top_allocators(request.args.get('top', 10, type=int))
+        })
+
+    except Exception as e:
+        logger.error(f"Memory report error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+def register_admin_routes(app):
+    """Register the admin endpoints, and the profiling hooks when ADMIN_TOKEN is set"""
+    app.profiler = None
+    app.register_blueprint(debug_bp)
+    if not app.config.get('ADMIN_TOKEN'):
+        return
+
+    profiler = app.profiler = Profiler(app.config['PROFILE_DIR'], app.config.get('PROFILE_MAX_REQUESTS', 100))
+    if getattr(app, 'training_jobs', None) is not None:
+        app.training_jobs.profiler = profiler
+
+    @app.before_request
+    def start_request_profile():
+        # A plain attribute check while no capture is armed; admin requests (polling) never count
+        if profiler.capture is not None and request.blueprint not in (admin_bp.name, debug_bp.name):
+            g.profile_capture = profiler.begin_request()
+
+    @app.teardown_request
+    def end_request_profile(error=None):
+        capture = g.pop('profile_capture', None)
+        if capture is not None:
+            profiler.end_request(capture)
+
+    app.register_blueprint(admin_bp)
@@ -0,0 +1,75 @@
+"""
+Metrics Endpoint
+Request timing hooks and the Prometheus ``/metrics`` endpoint
+
+Every request is counted and timed by the URL rule it matched, so the
+label values stay bounded whatever paths clients send. Recognition stages
+are timed where they run (see src/utils/metrics.py). Request bodies count
+as in-flight request buffers until their request is torn down.
+"""
+import time
+import logging
+
+from flask import Response, current_app, g, request
+
+from src.utils.memory import REQUEST_BUFFERS, process_memory
+from src.utils.metrics import (
+    CONTENT_TYPE, GALLERY_FACES, KNOWN_PEOPLE, MEMORY, MODEL_VERSION, PROCESS_MEMORY, REGISTRY,
+    REQUEST_LATENCY, REQUESTS
+)
+
+logger = logging.getLogger(__name__)
+
+METRICS_ROUTE = '/metrics'
+
+
+def _endpoint_label() -> str:
+    """Route pattern of the current request, e.g. ``/training_jobs/<job_id>``"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+    # Bodies are read into memory by the handlers, so count them until the request is torn down
+    g.request_buffer_bytes = request.content_length or 0
+    REQUEST_BUFFERS.acquire(g.request_buffer_bytes)
+
+
+def _release_request_buffer(error=None):
+    size = g.pop('request_buffer_bytes', None)
+    if size is not None:
+        REQUEST_BUFFERS.release(size)
+
+
+def _record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        endpoint = _endpoint_label()
+        REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint, request.method)
+        REQUESTS.inc(endpoint, request.method, response.status_code)
+    return response
+
+
+def metrics():
+    """Prometheus text exposition of this process's metrics"""
+    face_model = current_app.face_model
+    try:
+        GALLERY_FACES.set(face_model.gallery_size)
+        KNOWN_PEOPLE.set(len(face_model.known_face_names))
+        MODEL_VERSION.set(face_model.model_version)
+        for component, size in face_model.memory_usage().items():
+            MEMORY.set(size, component)
+        MEMORY.set(REQUEST_BUFFERS.inflight_bytes, 'request_buffers')
+        PROCESS_MEMORY.set(process_memory()['rss_bytes'])
+    except Exception as e:
+        logger.error(f"Metrics model state error: {str(e)}")
+
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+def register_metrics_routes(app):
+    """Time every request of the app, track its body size and serve /metrics"""
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.teardown_request(_release_request_buffer)
+    app.add_url_rule(METRICS_ROUTE, 'metrics', metrics)
@@ -5,47 +5,31 @@ import os
 import cv2
 import numpy as np
 import base64
+import struct
 import time
 from io import BytesIO
 from PIL import Image
 from flask import Blueprint, request, jsonify, current_app
 import logging
 
+from src.utils.metrics import FACES
+from src.utils.tracing import stage
+
 logger = logging.getLogger(__name__)
 
 # Create Blueprint
 api_bp = Blueprint('api', __name__)
 
-@api_bp.route('/recognize', methods=['POST'])
-def recognize():
-    """Face recognition from camera stream"""
-    try:
-        data = request.get_json()
-        if not data or 'image' not in data:
-            return jsonify({'success': False, 'error': 'No image data provided'})
-        
-        # Get models from app context
-        face_model = current_app.face_model
-        people_manager = current_app.people_manager
-        
-        # Decode base64 image
-        image_data = data['image'].split(',')[1]  # Remove data:image/jpeg;base64, prefix
-        image_bytes = base64.b64decode(image_data)
-        
-        # Convert to numpy array
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if frame is None:
-            return jsonify({'success': False, 'error': 'Invalid image data'})
-        
-        # Perform face recognition
-        face_locations, face_names = face_model.recognize_faces(frame)
-        
-        # Prepare response data
-        faces = []
-        detected_people = []
-        
+# Packed batch body: repeated [4-byte big-endian length][encoded image]
+BATCH_LENGTH_PREFIX = struct.Struct('>I')
+
+
+def _format_recognition(face_locations, face_names, people_manager):
+    """Build the faces / detected_people response lists for one frame"""
+    faces = []
+    detected_people = []
+    
+    with stage('people_lookup'):
         for (top, right, bottom, left), name in zip(face_locations, face_names):
             faces.append({
                 'name': name,
@@ -63,8 +47,99 @@ def recognize():
                     'name': name,
                     'info': person_info
                 })
+    
+    if detected_people:
+        FACES.inc('recognized', amount=len(detected_people))
+    if len(faces) > len(detected_people):
+        FACES.inc('unknown', amount=len(faces) - len(detected_people))
+    
+    return faces, detected_people
+
+
+def _decode_frame(nparr: np.ndarray):
+    """Decode an encoded image buffer to a BGR frame (None if invalid)"""
+    with stage('decode'):
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+
+def _serialize(payload):
+    """jsonify, timed as the serialize stage"""
+    with stage('serialize'):
+        return jsonify(payload)
+
+
+def _read_request_image():
+    """
+    Get the encoded image of a /recognize request as a uint8 buffer
+    
+    Raw ``image/*`` (or octet-stream) bodies and multipart ``image`` files are
+    wrapped without copying; JSON data URLs are still accepted for older clients.
+    """
+    if request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+        body = request.get_data(cache=False)
+        return np.frombuffer(body, np.uint8) if body else None
+    
+    if 'image' in request.files:
+        return np.frombuffer(request.files['image'].read(), np.uint8)
+    
+    data = request.get_json(silent=True)
+    if not data or 'image' not in data:
+        return None
+    
+    # Drop the data:image/jpeg;base64, prefix
+    with stage('base64_decode'):
+        image_data = data['image']
+        return np.frombuffer(base64.b64decode(image_data[image_data.find(',') + 1:]), np.uint8)
+
+
+def _unpack_batch_body(body: bytes):
+    """Split a packed batch body into encoded image buffers (views, no copies)"""
+    buffers = []
+    view = memoryview(body)
+    offset = 0
+    
+    while offset < len(view):
+        if offset + BATCH_LENGTH_PREFIX.size > len(view):
+            raise ValueError('Truncated length prefix in batch body')
+        (length,) = BATCH_LENGTH_PREFIX.unpack_from(view, offset)
+        offset += BATCH_LENGTH_PREFIX.size
+        if offset + length > len(view):
+            raise ValueError('Truncated image in batch body')
+        buffers.append(np.frombuffer(view[offset:offset + length], np.uint8))
+        offset += length
+    
+    return buffers
+
+@api_bp.route('/recognize', methods=['POST'])
+def recognize():
+    """
+    Face recognition from camera stream
+    
+    The frame can be sent as a raw image body (e.g. ``image/jpeg``), as a
+    multipart ``image`` file, or as a JSON base64 data URL.
+    """
+    try:
+        nparr = _read_request_image()
+        if nparr is None or nparr.size == 0:
+            return jsonify({'success': False, 'error': 'No image data provided'})
         
-        return jsonify({
+        # Get models from app context
+        face_model = current_app.face_model
+        people_manager = current_app.people_manager
+        
+        # Decode straight from the request buffer
+        frame = _decode_frame(nparr)
+        
+        if frame is None:
+            return jsonify({'success': False, 'error': 'Invalid image data'})
+        
+        # Perform face recognition
+        face_locations, face_names = face_model.recognize_faces(frame)
+        
+        # Prepare response data
+        faces, detected_people = _format_recognition(face_locations, face_names, people_manager)
+        
+        return _serialize({
             'success': True,
             'faces': faces,
             'detected_people': detected_people
@@ -74,6 +149,64 @@ def recognize():
         logger.error(f"Recognition error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@api_bp.route('/recognize_batch', methods=['POST'])
+def recognize_batch():
+    """
+    Face recognition for many frames in one request
+    
+    Accepts either multipart form data with one or more ``images`` files, or
+    an ``application/octet-stream`` body of length-prefixed encoded images.
+    """
+    try:
+        # Get models from app context
+        face_model = current_app.face_model
+        people_manager = current_app.people_manager
+        
+        if request.files:
+            buffers = [
+                np.frombuffer(file.read(), np.uint8)
+                for file in request.files.getlist('images')
+            ]
+        else:
+            buffers = _unpack_batch_body(request.get_data())
+        
+        if not buffers:
+            return jsonify({'success': False, 'error': 'No image data provided'})
+        
+        max_batch_size = face_model.config.MAX_BATCH_SIZE
+        if len(buffers) > max_batch_size:
+            return jsonify({
+                'success': False,
+                'error': f'Too many images in batch ({len(buffers)} > {max_batch_size})'
+            }), 413
+        
+        # Decode, detect and recognize all frames together
+        results = []
+        for recognition in face_model.recognize_encoded_batch(buffers):
+            if recognition is None:
+                results.append({'success': False, 'error': 'Invalid image data'})
+                continue
+            
+            faces, detected_people = _format_recognition(*recognition, people_manager)
+            results.append({
+                'success': True,
+                'faces': faces,
+                'detected_people': detected_people
+            })
+        
+        return _serialize({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+        
+    except Exception as e:
+        logger.error(f"Batch recognition error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @api_bp.route('/upload_test', methods=['POST'])
 def upload_test():
     """Process uploaded image for face recognition testing"""
@@ -92,41 +225,23 @@ def upload_test():
         # Read and process image
         image_bytes = file.read()
         nparr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        frame = _decode_frame(nparr)
         
         if frame is None:
             return jsonify({'success': False, 'error': 'Invalid image file'})
         
         # Convert back to base64 for display
-        _, buffer = cv2.imencode('.jpg', frame)
-        image_base64 = f"data:image/jpeg;base64,{base64.b64encode(buffer).decode()}"
+        with stage('reencode'):
+            _, buffer = cv2.imencode('.jpg', frame)
+            image_base64 = f"data:image/jpeg;base64,{base64.b64encode(buffer).decode()}"
         
         # Perform face recognition
         face_locations, face_names = face_model.recognize_faces(frame)
         
         # Prepare response data
-        faces = []
-        detected_people = []
-        
-        for (top, right, bottom, left), name in zip(face_locations, face_names):
-            faces.append({
-                'name': name,
-                'location': {
-                    'top': int(top), 
-                    'right': int(right), 
-                    'bottom': int(bottom), 
-                    'left': int(left)
-                }
-            })
-            
-            if name != "Unknown":
-                person_info = people_manager.get_person_info(name)
-                detected_people.append({
-                    'name': name,
-                    'info': person_info
-                })
+        faces, detected_people = _format_recognition(face_locations, face_names, people_manager)
         
-        return jsonify({
+        return _serialize({
             'success': True,
             'faces': faces,
             'detected_people': detected_people,
@@ -177,39 +292,63 @@ def save_capture():
 
 @api_bp.route('/reload_faces', methods=['POST'])
 def reload_faces():
-    """Reload and retrain face recognition model"""
+    """
+    Reload faces as a background training job
+    
+    Only new dataset images are enrolled unless ``full`` is set. Returns the
+    job immediately (202); pass ``wait`` to block until training finishes.
+    """
     try:
-        # Get models from app context
-        face_model = current_app.face_model
-        people_manager = current_app.people_manager
+        data = request.get_json(silent=True) or {}
         
         # Reload people info
-        people_manager.load_people_info()
+        current_app.people_manager.load_people_info()
         
-        # Import config here to avoid circular imports
-        from config.settings import StorageConfig
-        config = StorageConfig()
+        # Overlapping reloads share one queued job
+        job = current_app.training_jobs.submit(full=bool(data.get('full')))
         
-        # Retrain model
-        result = face_model.train(str(config.DATASET_PATH))
+        if not data.get('wait'):
+            return jsonify({'success': True, 'job': job.to_dict()}), 202
         
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'message': f'Reloaded {len(face_model.known_face_names)} faces',
-                'known_faces': face_model.known_face_names,
-                'training_info': result.get('training_info', {})
-            })
+        job.wait()
+        if job.status == job.COMPLETED:
+            return jsonify({'success': True, 'job': job.to_dict(), **job.result})
         else:
             return jsonify({
                 'success': False,
-                'error': result.get('error', 'Training failed')
+                'job': job.to_dict(),
+                'error': job.error or 'Training failed'
             })
         
     except Exception as e:
         logger.error(f"Reload faces error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+@api_bp.route('/training_jobs')
+def training_jobs():
+    """List recent training jobs, newest first"""
+    try:
+        jobs = current_app.training_jobs.list_jobs()
+        return jsonify({'success': True, 'jobs': [job.to_dict() for job in jobs]})
+        
+    except Exception as e:
+        logger.error(f"Training jobs error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@api_bp.route('/training_jobs/<job_id>')
+def training_job_status(job_id):
+    """Get status, progress and ETA of a training job"""
+    try:
+        job = current_app.training_jobs.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        
+        return jsonify({'success': True, 'job': job.to_dict()})
+        
+    except Exception as e:
+        logger.error(f"Training job status error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
 @api_bp.route('/people_info')
 def people_info():
     """Get information about all people"""
@@ -241,7 +380,8 @@ def settings():
                 'confidence_threshold': face_model.confidence_threshold,
                 'known_faces_count': len(face_model.known_face_names),
                 'use_augmentation': face_model.use_augmentation,
-                'augmentation_factor': face_model.augmentation_factor
+                'augmentation_factor': face_model.augmentation_factor,
+                'recognizer_backend': face_model.config.RECOGNIZER_BACKEND
             }
         })
         
@@ -323,7 +463,8 @@ def health():
             'components': {
                 'face_model': 'ok' if face_model else 'error',
                 'people_manager': 'ok' if people_manager else 'error',
-                'is_trained': face_model.is_trained if face_model else False
+                'is_trained': face_model.is_trained if face_model else False,
+                'streaming_sessions': len(getattr(current_app, 'recognition_sessions', ()))
             }
         })
         
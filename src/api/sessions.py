@@ -0,0 +1,198 @@
+"""
+Streaming Recognition Sessions
+Persistent WebSocket sessions that push binary frames and get results back
+
+flask-sock is an optional dependency; without it the endpoint is simply not
+registered and the web client keeps polling /recognize.
+"""
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+
+from src.utils.face_cache import content_digest
+from src.utils.face_tracker import FaceTracker
+from .routes import _decode_frame, _format_recognition
+
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:  # pragma: no cover - optional dependency
+    Sock = None
+    ConnectionClosed = None
+
+logger = logging.getLogger(__name__)
+
+WEBSOCKET_ROUTE = '/ws/recognize'
+
+
+class RecognitionSession:
+    """
+    Server-side state of one streaming client
+
+    Frames are processed one at a time. Frames that arrive while one is
+    being recognized are coalesced: only the newest is kept (latest frame
+    wins) and the rest are counted as dropped. The last result is kept so
+    an unchanged frame is answered without running recognition again, as
+    long as the model that produced it is still the published one, and a
+    face tracker carries identities over from frame to frame.
+    """
+
+    def __init__(self, face_model, people_manager, remote_addr: str = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.face_model = face_model
+        self.people_manager = people_manager
+        self.remote_addr = remote_addr
+        self.opened_at = time.time()
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.frames_reused = 0
+        self._last_digest: Optional[bytes] = None
+        self._last_result: Optional[Dict[str, Any]] = None
+        self._last_version: Optional[int] = None
+        self.tracker = FaceTracker(face_model.config)
+
+    def run(self, receive: Callable[[Optional[float]], Any], send: Callable[[str], None]):
+        """
+        Serve the session until the connection closes
+
+        Args:
+            receive: Returns the next message, blocking up to ``timeout``
+                seconds (None = forever); returns None when nothing arrived
+            send: Sends a text message to the client
+        """
+        while True:
+            message = receive(None)
+            if message is None:
+                continue
+            self.frames_received += 1
+
+            # Latest frame wins: skip everything the client sent while we were busy
+            while True:
+                newer = receive(0)
+                if newer is None:
+                    break
+                self.frames_received += 1
+                self.frames_dropped += 1
+                message = newer
+
+            send(json.dumps(self.process(message)))
+
+    def process(self, message) -> Dict[str, Any]:
+        """Recognize one frame message and build the response"""
+        started = time.perf_counter()
+
+        if not isinstance(message, (bytes, bytearray)):
+            return {'success': False, 'error': 'Frames must be sent as binary messages'}
+
+        digest = content_digest(message)
+        # Pick up a model another worker published, so a retrain invalidates the last result
+        self.face_model.sync_published_model()
+        version = self.face_model.model_version
+        if digest == self._last_digest and version == self._last_version and self._last_result is not None:
+            self.frames_reused += 1
+            result = dict(self._last_result)
+        else:
+            frame = _decode_frame(np.frombuffer(message, np.uint8))
+            if frame is None:
+                return {'success': False, 'error': 'Invalid image data'}
+
+            face_locations, face_names = self.face_model.recognize_faces_tracked(frame, self.tracker)
+            faces, detected_people = _format_recognition(face_locations, face_names, self.people_manager)
+            result = {
+                'success': True,
+                'faces': faces,
+                'detected_people': detected_people
+            }
+            self._last_digest = digest
+            self._last_result = result
+            self._last_version = version
+            self.frames_processed += 1
+
+        result['frame'] = self.frames_received
+        result['dropped_frames'] = self.frames_dropped
+        result['processing_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Session counters for monitoring"""
+        return {
+            'session_id': self.id,
+            'remote_addr': self.remote_addr,
+            'opened_at': self.opened_at,
+            'frames_received': self.frames_received,
+            'frames_processed': self.frames_processed,
+            'frames_dropped': self.frames_dropped,
+            'frames_reused': self.frames_reused,
+            'tracker': self.tracker.get_stats()
+        }
+
+
+class SessionRegistry:
+    """Tracks the open streaming sessions of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, RecognitionSession] = {}
+
+    def open(self, face_model, people_manager, remote_addr: str = None) -> RecognitionSession:
+        session = RecognitionSession(face_model, people_manager, remote_addr)
+        with self._lock:
+            self._sessions[session.id] = session
+        logger.info(f"Recognition session {session.id} opened from {remote_addr}")
+        return session
+
+    def close(self, session: RecognitionSession):
+        with self._lock:
+            self._sessions.pop(session.id, None)
+        logger.info(
+            f"Recognition session {session.id} closed: {session.frames_processed} processed, "
+            f"{session.frames_dropped} dropped, {session.frames_reused} reused"
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [session.get_stats() for session in self._sessions.values()]
+
+
+def register_websocket_routes(app) -> bool:
+    """
+    Register the streaming recognition endpoint on the app
+
+    Returns:
+        True if WebSocket support is available
+    """
+    app.recognition_sessions = SessionRegistry()
+
+    if Sock is None:
+        logger.warning("flask-sock is not installed, streaming recognition is disabled")
+        return False
+
+    sock = Sock(app)
+
+    @sock.route(WEBSOCKET_ROUTE)
+    def recognize_stream(ws):
+        """Streaming face recognition: binary frames in, JSON results out"""
+        from flask import current_app, request
+
+        session = current_app.recognition_sessions.open(
+            current_app.face_model, current_app.people_manager, request.remote_addr
+        )
+        try:
+            session.run(lambda timeout: ws.receive(timeout=timeout), ws.send)
+        except ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"Recognition session {session.id} error: {str(e)}")
+        finally:
+            current_app.recognition_sessions.close(session)
+
+    return True
@@ -0,0 +1,66 @@
+"""
+Request Tracing Hooks
+Request IDs for every request and stage traces for a sample of them
+
+Every response carries an ``X-Request-ID`` (the client's, when it sent a
+usable one). A TRACE_SAMPLE_RATE share of requests is traced: the
+response gets a ``Server-Timing`` header with the time per stage and the
+trace is appended to TRACE_FILE. Summarize the file with
+``python -m src.utils.trace_report``.
+"""
+import random
+import re
+import uuid
+import logging
+
+from flask import g, request
+
+from src.utils.tracing import Trace, TraceWriter, activate, deactivate
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Client request IDs are echoed back and written to the trace file, so only plain tokens are kept
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def _request_id() -> str:
+    request_id = request.headers.get(REQUEST_ID_HEADER, '')
+    return request_id if _VALID_REQUEST_ID.match(request_id) else uuid.uuid4().hex
+
+
+def register_tracing(app):
+    """Assign request IDs and trace sampled requests of the app"""
+    sample_rate = float(app.config.get('TRACE_SAMPLE_RATE', 0.0))
+    writer = TraceWriter(
+        app.config['TRACE_FILE'],
+        batch_size=app.config.get('TRACE_BATCH_SIZE', 20),
+        flush_interval=app.config.get('TRACE_FLUSH_INTERVAL', 5.0)
+    ) if sample_rate > 0 and app.config.get('TRACE_FILE') else None
+    app.trace_writer = writer
+
+    @app.before_request
+    def start_trace():
+        g.request_id = _request_id()
+        if writer is not None and random.random() < sample_rate:
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            g.trace = Trace(g.request_id, endpoint)
+            g.trace.attributes.update(method=request.method, content_length=request.content_length)
+            g.trace_token = activate(g.trace)
+
+    @app.after_request
+    def finish_trace(response):
+        response.headers[REQUEST_ID_HEADER] = g.get('request_id') or _request_id()
+        trace = g.pop('trace', None)
+        if trace is not None:
+            trace.finish()
+            trace.attributes['status'] = response.status_code
+            response.headers['Server-Timing'] = trace.server_timing()
+            writer.write(trace)
+        return response
+
+    @app.teardown_request
+    def end_trace(error=None):
+        token = g.pop('trace_token', None)
+        if token is not None:
+            deactivate(token)
@@ -10,14 +10,20 @@ from flask import Flask, render_template
 # Import configuration
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from config.settings import Config
+from config.settings import Config, StorageConfig
 
 # Import API blueprints
 from .api.routes import api_bp
+from .api.sessions import register_websocket_routes
+from .api.metrics import register_metrics_routes
+from .api.tracing import register_tracing
+from .api.admin import register_admin_routes
 
 # Import models and managers
 from .models.face_recognition_model import FaceRecognitionModel
+from .models.training_jobs import TrainingJobManager
 from .utils.people_manager import PeopleManager
+from .utils.async_logging import setup_logging
 
 
 def create_app(config_class=Config):
@@ -30,6 +36,9 @@ def create_app(config_class=Config):
     Returns:
         Flask: Configured Flask application
     """
+    # Log through a queue to stderr and LogConfig.LOG_FILE, written by a background thread
+    setup_logging()
+    
     # Create Flask app
     app = Flask(__name__, 
                 template_folder='templates',
@@ -41,14 +50,31 @@ def create_app(config_class=Config):
     # Initialize face recognition model
     face_model = FaceRecognitionModel()
     people_manager = PeopleManager()
+    # Job status lives in a file every gunicorn worker reads, so polls can reach any worker
+    training_jobs = TrainingJobManager(
+        face_model, str(StorageConfig.DATASET_PATH), StorageConfig.TRAINING_JOBS_FILE
+    )
     
     # Store in app context for access in routes
     app.face_model = face_model
     app.people_manager = people_manager
+    app.training_jobs = training_jobs
     
     # Register API blueprints
     app.register_blueprint(api_bp)
     
+    # Streaming recognition over WebSocket (needs flask-sock)
+    register_websocket_routes(app)
+    
+    # Request timing and the Prometheus /metrics endpoint
+    register_metrics_routes(app)
+    
+    # Request IDs, and Server-Timing plus trace file entries for sampled requests
+    register_tracing(app)
+    
+    # Token-protected profiling endpoints (only with ADMIN_TOKEN set)
+    register_admin_routes(app)
+    
     # Main route
     @app.route('/')
     def index():
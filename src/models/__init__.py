@@ -4,5 +4,6 @@ Contains machine learning models for face recognition
 """
 
 from .face_recognition_model import FaceRecognitionModel
+from .training_jobs import TrainingJob, TrainingJobManager
 
-__all__ = ['FaceRecognitionModel']
+__all__ = ['FaceRecognitionModel', 'TrainingJob', 'TrainingJobManager']
@@ -1,11 +1,15 @@
 """
 Face Recognition Model
 Handles face detection, training, and recognition using OpenCV LBPH
+or another recognizer backend (see src/models/recognizers.py)
 """
 import os
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Dict, Any, Set, Iterator, Callable, NamedTuple
 import logging
 import sys
 
@@ -14,10 +18,47 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from config.settings import FaceRecognitionConfig
 from src.utils.image_processor import ImageProcessor
+from src.utils.async_logging import PeriodicSummary
 from src.utils.augmentation import DataAugmentation
+from src.utils.face_cache import FaceROICache, content_digest
+from src.utils.parallel_loader import ParallelFaceExtractor, resolve_worker_count
+from src.utils.rwlock import ReadWriteLock
+from src.utils.face_tracker import FaceTracker
+from src.utils.prediction_cache import PredictionCache, perceptual_hash
+from src.utils.memory import PeakMemoryMonitor, gallery_memory, top_allocators
+from src.utils.metrics import TRAINING_LATENCY, TRAINING_MEMORY
+from src.utils.tracing import propagate, stage
+from src.models.model_store import ModelStore, scan_dataset_files
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+from src.models.recognizers import create_recognizer, distance_threshold, get_backend
+from src.models.prototypes import select_prototypes
 
 logger = logging.getLogger(__name__)
 
+# Called with (processed_images, total_images) while a dataset is loaded
+ProgressCallback = Callable[[int, int], None]
+
+# Face locations as (top, right, bottom, left) with the matching names
+RecognitionResult = Tuple[List[Tuple], List[str]]
+
+# Seconds between progress lines while a dataset is loaded
+DATASET_PROGRESS_INTERVAL = 10.0
+
+
+class TrainedModel(NamedTuple):
+    """
+    Everything recognition needs from a training run
+
+    Published as a single reference so readers always see a recognizer
+    together with the label map it was trained with.
+    """
+    recognizer: Any
+    known_face_names: List[str]
+    training_stats: Dict[str, Any]
+    trained_files: Dict[str, List[int]]
+    is_trained: bool
+    version: int
+
 class FaceRecognitionModel:
     """
     Main face recognition model using OpenCV LBPH (Local Binary Pattern Histogram)
@@ -30,12 +71,19 @@ class FaceRecognitionModel:
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + self.config.FACE_CASCADE_FILE
         )
-        self.face_recognizer = cv2.face.LBPHFaceRecognizer_create()
         
-        # Model state
-        self.is_trained = False
-        self.known_face_names = []
-        self.training_stats = {}
+        # Model state, replaced atomically by training (see TrainedModel)
+        self._model = TrainedModel(
+            recognizer=create_recognizer(self.config.RECOGNIZER_BACKEND, self.config),
+            known_face_names=[],
+            training_stats={},
+            trained_files={},
+            is_trained=False,
+            version=0
+        )
+        # Serializes training runs; in-place recognizer updates take the write side of _recognizer_lock
+        self._training_lock = threading.RLock()
+        self._recognizer_lock = ReadWriteLock()
         self.confidence_threshold = self.config.CONFIDENCE_THRESHOLD
         self.use_augmentation = self.config.USE_AUGMENTATION
         self.augmentation_factor = self.config.AUGMENTATION_FACTOR
@@ -43,21 +91,113 @@ class FaceRecognitionModel:
         # Processors
         self.image_processor = ImageProcessor(config=self.config)
         self.augmentation = DataAugmentation(config=self.config) if self.config.USE_AUGMENTATION else None
+        self.model_store = ModelStore(
+            self.config.MODEL_SNAPSHOT_DIR, config=self.config
+        ) if self.config.PERSIST_MODEL else None
+        # Snapshot this process last saved or loaded (see sync_published_model)
+        self._snapshot_stamp = None
+        self._next_sync_check = 0.0
+        self.face_cache = FaceROICache(
+            self.config.FACE_CACHE_FILE, config=self.config
+        ) if self.config.USE_FACE_CACHE else None
+        self._seen_digests = set()
+        self.prediction_cache = PredictionCache(
+            max_size=self.config.PREDICTION_CACHE_SIZE,
+            ttl=self.config.PREDICTION_CACHE_TTL,
+            max_distance=self.config.PREDICTION_CACHE_MAX_DISTANCE
+        ) if self.config.PREDICTION_CACHE_SIZE > 0 else None
+        
+        # Recognition: CascadeClassifier is not thread-safe, so each thread gets its own
+        self._thread_local = threading.local()
+        self._batch_executor = None
+        self._batch_executor_lock = threading.Lock()
+        self._recognition_summary = PeriodicSummary(
+            logger, "Recognized %(recognized)d faces and %(unknown)d unknown faces in the last %(seconds).0fs",
+            ("recognized", "unknown")
+        )
         
         logger.info("Face Recognition Model initialized")
         
         # Auto-load faces from dataset on initialization
+        if not self.config.AUTO_TRAIN_ON_INIT:
+            return
+        
         try:
             from pathlib import Path
             dataset_path = Path('dataset')
             if dataset_path.exists():
-                result = self.train(str(dataset_path))
-                logger.info(f"Auto-trained model: {result.get('message', 'Training completed')}")
+                if self.load_snapshot(str(dataset_path)):
+                    logger.info("Loaded trained model from snapshot, skipping training")
+                else:
+                    result = self.train(str(dataset_path))
+                    logger.info(f"Auto-trained model: {result.get('message', 'Training completed')}")
             else:
                 logger.warning(f"Dataset path {dataset_path} does not exist")
         except Exception as e:
             logger.warning(f"Could not auto-train model: {e}")
     
+    def reinit_after_fork(self):
+        """
+        Re-create per-process state in a process forked from the one holding this model
+        
+        The trained model is inherited copy-on-write and keeps serving. OpenCV
+        cascades, the batch thread pool (its threads do not survive fork) and
+        locks that another thread may have held at fork time are replaced.
+        The extraction pool's forkserver is reset by parallel_loader's own
+        fork hook, so this process starts its own on its next training run.
+        """
+        self.face_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + self.config.FACE_CASCADE_FILE
+        )
+        self._thread_local = threading.local()
+        self._batch_executor = None
+        self._batch_executor_lock = threading.Lock()
+        self._training_lock = threading.RLock()
+        self._recognizer_lock = ReadWriteLock()
+        self._recognition_summary.reset_after_fork()
+    
+    @property
+    def face_recognizer(self):
+        """Recognizer of the currently published model"""
+        return self._model.recognizer
+    
+    @property
+    def known_face_names(self) -> List[str]:
+        """Label map of the currently published model (index = label id)"""
+        return self._model.known_face_names
+    
+    @property
+    def training_stats(self) -> Dict[str, Any]:
+        """Training statistics of the currently published model"""
+        return self._model.training_stats
+    
+    @property
+    def trained_files(self) -> Dict[str, List[int]]:
+        """Dataset files the currently published model was trained on"""
+        return self._model.trained_files
+    
+    @property
+    def is_trained(self) -> bool:
+        """Whether the currently published model can recognize faces"""
+        return self._model.is_trained
+    
+    @property
+    def model_version(self) -> int:
+        """Incremented every time a new model is published"""
+        return self._model.version
+    
+    @property
+    def gallery_size(self) -> int:
+        """Face samples the currently published recognizer compares against"""
+        model = self._model
+        if not model.is_trained:
+            return 0
+        return len(model.recognizer.getLabels())
+    
+    def _publish(self, **changes):
+        """Swap in a new model state in one reference assignment"""
+        self._model = self._model._replace(version=self._model.version + 1, **changes)
+    
     def extract_face_from_image(self, image_path: str) -> Optional[np.ndarray]:
         """
         Extract and preprocess face from image file
@@ -74,36 +214,109 @@ class FaceRecognitionModel:
             if image is None:
                 return None
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray, 1.1, 4, minSize=self.config.MIN_FACE_SIZE
-            )
-            
-            if len(faces) == 0:
-                return None
-            
-            # Get the largest face (main subject)
-            largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
-            x, y, w, h = largest_face
-            
-            # Extract face region with padding
-            face_roi = self.image_processor.extract_face_roi(gray, x, y, w, h)
-            
+            face_roi, _ = self._extract_face(image)
             return face_roi
             
         except Exception as e:
             logger.error(f"Error extracting face from {image_path}: {e}")
             return None
     
-    def load_dataset(self, dataset_path: str) -> Tuple[List[np.ndarray], List[int], Dict[str, int]]:
+    def _extract_face(self, image: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]:
+        """Detect the largest face in a decoded image and return (face_roi, box)"""
+        return self.image_processor.extract_largest_face(self.face_cascade, image)
+    
+    def _extract_training_faces(self, image_paths: List[str]) -> Iterator[Tuple[str, Optional[np.ndarray]]]:
+        """
+        Extract training face ROIs for image_paths, in order
+        
+        Cached ROIs are returned straight away; the remaining images are
+        decoded and detected serially or on the worker pool depending on
+        TRAINING_WORKERS and how many of them there are.
+        """
+        extractor = ParallelFaceExtractor(config=self.config)
+        parallel = extractor.workers > 1 and len(image_paths) >= extractor.min_items
+        
+        if self.face_cache is None and not parallel:
+            for image_path in image_paths:
+                yield image_path, self.extract_face_from_image(image_path)
+            return
+        
+        results = {}
+        pending = {}
+        
+        def read_images():
+            """Read and hash images, yielding only cache misses for extraction"""
+            for index, image_path in enumerate(image_paths):
+                image_bytes = self.image_processor.read_image_bytes(image_path)
+                if image_bytes is None:
+                    results[index] = None
+                    continue
+                
+                digest = content_digest(image_bytes)
+                self._seen_digests.add(digest)
+                
+                cached = self.face_cache.get(digest) if self.face_cache is not None else None
+                if cached is not None:
+                    results[index] = cached[1]
+                    continue
+                
+                pending[index] = digest
+                yield index, image_bytes
+        
+        if parallel:
+            # Cache hits do not count, so a mostly cached dataset is still extracted serially
+            extracted = extractor.extract(read_images(), self._extract_face_from_bytes)
+        else:
+            extracted = (
+                (index, *self._extract_face_from_bytes(image_bytes))
+                for index, image_bytes in read_images()
+            )
+        
+        next_index = 0
+        for index, face_roi, box, error in extracted:
+            digest = pending.pop(index)
+            if error is not None:
+                # Errors are not cached so the image is retried next time
+                logger.error(f"Error extracting face from {image_paths[index]}: {error}")
+                face_roi = None
+            elif self.face_cache is not None:
+                self.face_cache.put(digest, face_roi, box)
+            results[index] = face_roi
+            
+            # Hand results back in dataset order as soon as they are contiguous
+            while next_index in results:
+                yield image_paths[next_index], results.pop(next_index)
+                next_index += 1
+        
+        while next_index in results:
+            yield image_paths[next_index], results.pop(next_index)
+            next_index += 1
+    
+    def _extract_face_from_bytes(self, image_bytes: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[Tuple], Optional[str]]:
+        """Decode an encoded image and extract its face, returning (face_roi, box, error)"""
+        try:
+            image = self.image_processor.decode_image(image_bytes)
+            if image is None:
+                return None, None, None
+            face_roi, box = self._extract_face(image)
+            return face_roi, box, None
+        except Exception as e:
+            return None, None, str(e)
+    
+    def load_dataset(self, dataset_path: str,
+                     only_files: Optional[Set[str]] = None,
+                     known_face_names: Optional[List[str]] = None,
+                     progress_callback: Optional[ProgressCallback] = None) -> Tuple[List[np.ndarray], List[int], Dict[str, int]]:
         """
         Load training dataset from folder structure
         
         Args:
             dataset_path: Path to dataset directory
+            only_files: If given, only these dataset-relative image paths are
+                processed (person labels are still registered for every folder)
+            known_face_names: Label map to extend with new people (defaults
+                to the live one)
+            progress_callback: Called with (processed, total) image counts
             
         Returns:
             Tuple of (face_images, face_labels, person_image_count)
@@ -116,26 +329,82 @@ class FaceRecognitionModel:
             logger.warning(f"Dataset path does not exist: {dataset_path}")
             return face_images, face_labels, person_image_count
         
+        if known_face_names is None:
+            known_face_names = self.known_face_names
+        
+        self._seen_digests = set()
+        cache_counts = (self.face_cache.hits, self.face_cache.misses) if self.face_cache is not None else (0, 0)
+        tasks = []
+        
         # Load from folder structure (recommended)
         person_folders = self._load_from_folders(
-            dataset_path, face_images, face_labels, person_image_count
+            dataset_path, tasks, person_image_count, known_face_names, only_files
         )
         
         # Load from flat file structure (legacy support)
         self._load_from_files(
-            dataset_path, face_images, face_labels, person_image_count
+            dataset_path, tasks, person_image_count, known_face_names, only_files
+        )
+        
+        # Extract faces (cached, serial or on the worker pool) and add them in dataset order
+        task_by_path = {task[0]: task for task in tasks}
+        total_images = len(task_by_path)
+        if progress_callback:
+            progress_callback(0, total_images)
+        
+        # One progress line per interval instead of one per image
+        started = time.perf_counter()
+        progress = PeriodicSummary(
+            logger, "Loading dataset: %(images)d more images, %(faces)d faces in the last %(seconds).0fs",
+            ("images", "faces"), interval=DATASET_PROGRESS_INTERVAL
+        )
+        no_face = []
+        for processed, (image_path, face_roi) in enumerate(
+            self._extract_training_faces(list(task_by_path)), start=1
+        ):
+            _, person_name, person_label, _ = task_by_path[image_path]
+            faces_before = len(face_images)
+            self._process_image(
+                image_path, face_roi, person_name, person_label,
+                face_images, face_labels, person_image_count
+            )
+            if face_roi is None:
+                no_face.append(os.path.basename(image_path))
+            progress.add(images=1, faces=len(face_images) - faces_before)
+            if progress_callback:
+                progress_callback(processed, total_images)
+        
+        logger.info(
+            "Loaded %s faces for %s people from %s images in %.1fs",
+            f"{len(face_images):,}", f"{len(known_face_names):,}", f"{total_images:,}",
+            time.perf_counter() - started
         )
+        if no_face:
+            logger.warning(
+                "No face found in %d images: %s%s", len(no_face), ", ".join(no_face[:10]),
+                f" and {len(no_face) - 10} more" if len(no_face) > 10 else ""
+            )
         
-        logger.info(f"Loaded {len(face_images)} face images for {len(self.known_face_names)} people")
+        if self.face_cache is not None:
+            self.face_cache.flush()
+            # Drop entries for removed images once they outnumber the live ones
+            if only_files is None and len(self.face_cache) > 2 * len(self._seen_digests):
+                self.face_cache.compact(self._seen_digests)
+            logger.info(
+                "Face ROI cache: %d hits, %d misses",
+                self.face_cache.hits - cache_counts[0], self.face_cache.misses - cache_counts[1]
+            )
         
         return face_images, face_labels, person_image_count
     
-    def _load_from_folders(self, dataset_path: str, face_images: List, 
-                          face_labels: List, person_image_count: Dict) -> set:
-        """Load images from person folders (recommended structure)"""
+    def _load_from_folders(self, dataset_path: str, tasks: List,
+                          person_image_count: Dict, known_face_names: List[str],
+                          only_files: Optional[Set[str]] = None) -> set:
+        """Collect images from person folders (recommended structure)"""
         person_folders = set()
         
-        for item in os.listdir(dataset_path):
+        # Sorted so label ids do not depend on filesystem listing order
+        for item in sorted(os.listdir(dataset_path)):
             item_path = os.path.join(dataset_path, item)
             
             # Skip files and README
@@ -146,32 +415,34 @@ class FaceRecognitionModel:
             person_folders.add(person_name)
             
             # Add person to known names
-            if person_name not in self.known_face_names:
-                self.known_face_names.append(person_name)
+            if person_name not in known_face_names:
+                known_face_names.append(person_name)
             
-            person_label = self.known_face_names.index(person_name)
+            person_label = known_face_names.index(person_name)
             person_image_count[person_name] = 0
             
-            # Process all images in folder
+            # Queue all images in folder
             try:
-                for filename in os.listdir(item_path):
+                for filename in sorted(os.listdir(item_path)):
+                    if only_files is not None and f"{item}/{filename}" not in only_files:
+                        continue
                     if self.image_processor.is_image_file(filename):
                         image_path = os.path.join(item_path, filename)
-                        self._process_image(
-                            image_path, person_name, person_label,
-                            face_images, face_labels, person_image_count
-                        )
+                        tasks.append((image_path, person_name, person_label, "folder"))
             except Exception as e:
                 logger.error(f"Error processing folder {item}: {e}")
         
         return person_folders
     
-    def _load_from_files(self, dataset_path: str, face_images: List,
-                        face_labels: List, person_image_count: Dict):
-        """Load images from flat file structure (legacy support)"""
+    def _load_from_files(self, dataset_path: str, tasks: List,
+                        person_image_count: Dict, known_face_names: List[str],
+                        only_files: Optional[Set[str]] = None):
+        """Collect images from flat file structure (legacy support)"""
         person_files = {}
         
-        for filename in os.listdir(dataset_path):
+        for filename in sorted(os.listdir(dataset_path)):
+            if only_files is not None and filename not in only_files:
+                continue
             if self.image_processor.is_image_file(filename):
                 # Extract person name
                 base_name = os.path.splitext(filename)[0]
@@ -182,99 +453,425 @@ class FaceRecognitionModel:
                     person_files[person_name] = []
                 person_files[person_name].append(filename)
         
-        # Process each person's images
+        # Queue each person's images
         for person_name, files in person_files.items():
             if person_name not in person_image_count:
                 person_image_count[person_name] = 0
             
             # Add person to known names
-            if person_name not in self.known_face_names:
-                self.known_face_names.append(person_name)
+            if person_name not in known_face_names:
+                known_face_names.append(person_name)
             
-            person_label = self.known_face_names.index(person_name)
+            person_label = known_face_names.index(person_name)
             
             for filename in files:
                 image_path = os.path.join(dataset_path, filename)
-                self._process_image(
-                    image_path, person_name, person_label,
-                    face_images, face_labels, person_image_count,
-                    source_type="file"
+                tasks.append((image_path, person_name, person_label, "file"))
+    
+    def _process_image(self, image_path: str, face_roi: Optional[np.ndarray],
+                      person_name: str, person_label: int,
+                      face_images: List, face_labels: List, person_image_count: Dict):
+        """Add an extracted face with optional augmentation"""
+        if face_roi is None:
+            logger.debug("No face found in %s", image_path)
+            return
+        
+        if self.config.USE_AUGMENTATION and self.augmentation:
+            # Apply data augmentation
+            faces = self.augmentation.augment_face(
+                face_roi, num_augmentations=self.config.AUGMENTATION_FACTOR
+            )
+        else:
+            faces = [face_roi]
+        
+        for face in faces:
+            face_images.append(face)
+            face_labels.append(person_label)
+        person_image_count[person_name] += len(faces)
+        logger.debug("Loaded face for %s from %s (+ %d augmented)", person_name, image_path, len(faces) - 1)
+    
+    def train(self, dataset_path: str,
+              progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Train the face recognition model
+        
+        The new recognizer is built off to the side and swapped in when it is
+        ready, so recognition keeps serving from the previous model meanwhile.
+        
+        Args:
+            dataset_path: Path to training dataset
+            progress_callback: Called with (processed, total) image counts
+            
+        Returns:
+            Training statistics
+        """
+        with self._training_lock, PeakMemoryMonitor() as memory_monitor:
+            logger.info("Starting model training...")
+            started = time.perf_counter()
+            
+            # Fingerprint before loading so files changed mid-training force a retrain next time
+            dataset_files = scan_dataset_files(dataset_path, self.image_processor)
+            fingerprint = self.model_store.compute_fingerprint(
+                dataset_path, dataset_files
+            ) if self.model_store else None
+            
+            # Load dataset, keeping existing label ids stable
+            known_face_names = list(self.known_face_names)
+            face_images, face_labels, person_image_count = self.load_dataset(
+                dataset_path, known_face_names=known_face_names,
+                progress_callback=progress_callback
+            )
+            
+            if len(face_images) == 0:
+                # Fail the run but keep serving whatever model is published
+                logger.warning("No face images found for training")
+                return {"success": False, "error": "No training data found"}
+            
+            # Measured before compaction drops any of them
+            face_images_bytes = sum(face.nbytes for face in face_images)
+            
+            try:
+                # Optionally keep only a few representative samples per person
+                compaction_stats = None
+                if self.config.GALLERY_PROTOTYPES > 0:
+                    face_images, face_labels, compaction_stats = self._compact_gallery(face_images, face_labels)
+                
+                # Train a fresh recognizer
+                recognizer = create_recognizer(self.config.RECOGNIZER_BACKEND, self.config)
+                recognizer.train(face_images, np.array(face_labels))
+                
+                # Compile training statistics
+                training_stats = self._compile_training_stats(
+                    sum(person_image_count.values()), person_image_count, len(known_face_names)
                 )
+                if compaction_stats is not None:
+                    training_stats["gallery_compaction"] = compaction_stats
+                training_stats["memory"] = self._training_memory_report(
+                    memory_monitor, recognizer, face_images_bytes, training_stats
+                )
+                
+                self._publish(
+                    recognizer=recognizer,
+                    known_face_names=known_face_names,
+                    training_stats=training_stats,
+                    trained_files=dataset_files,
+                    is_trained=True
+                )
+                
+                logger.info("Model training completed successfully")
+                
+                self._save_snapshot(fingerprint)
+                TRAINING_LATENCY.observe(time.perf_counter() - started, 'full')
+                
+                return {"success": True, "stats": training_stats}
+                
+            except Exception as e:
+                # The previous model was never touched, so it keeps serving
+                logger.error(f"Error during training: {e}")
+                return {"success": False, "error": str(e)}
     
-    def _process_image(self, image_path: str, person_name: str, person_label: int,
-                      face_images: List, face_labels: List, person_image_count: Dict,
-                      source_type: str = "folder"):
-        """Process a single image with optional augmentation"""
-        face_roi = self.extract_face_from_image(image_path)
-        
-        if face_roi is not None:
-            if self.config.USE_AUGMENTATION and self.augmentation:
-                # Apply data augmentation
-                augmented_faces = self.augmentation.augment_face(
-                    face_roi, num_augmentations=self.config.AUGMENTATION_FACTOR
+    def enroll_new_images(self, dataset_path: str,
+                          progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Add images that appeared in the dataset since the last training run
+        
+        Only the new faces (and their augmentations) are pushed into the live
+        recognizer through LBPH ``update()``; new people get new label ids.
+        Falls back to a full retrain when the model is not trained yet, when
+        images were removed or modified (LBPH cannot forget samples), or when
+        the recognizer backend has no ``update()`` (Eigenfaces, Fisherfaces).
+        
+        Args:
+            dataset_path: Path to training dataset
+            progress_callback: Called with (processed, total) image counts
+            
+        Returns:
+            Training result with ``mode`` ("incremental" or "full") and
+            ``added_files`` (dataset-relative paths of enrolled images)
+        """
+        with self._training_lock:
+            started = time.perf_counter()
+            if not self.is_trained or not self.trained_files:
+                return self._full_retrain(dataset_path, progress_callback)
+            
+            if not get_backend(self.config.RECOGNIZER_BACKEND).supports_update:
+                logger.info(f"{self.config.RECOGNIZER_BACKEND} recognizer cannot add samples, running full retrain")
+                return self._full_retrain(dataset_path, progress_callback)
+            
+            dataset_files = scan_dataset_files(dataset_path, self.image_processor)
+            changed_files = [
+                path for path, info in self.trained_files.items()
+                if not path.endswith('/') and dataset_files.get(path) != info
+            ]
+            if changed_files:
+                logger.info(f"{len(changed_files)} dataset images were removed or modified, running full retrain")
+                return self._full_retrain(dataset_path, progress_callback)
+            
+            added_files = [
+                path for path in dataset_files
+                if not path.endswith('/') and path not in self.trained_files
+            ]
+            if not added_files:
+                self._publish(trained_files=dataset_files)
+                return {"success": True, "mode": "incremental", "added_files": [], "stats": self.training_stats}
+            
+            logger.info(f"Enrolling {len(added_files)} new dataset images")
+            fingerprint = self.model_store.compute_fingerprint(
+                dataset_path, dataset_files
+            ) if self.model_store else None
+            
+            known_face_names = list(self.known_face_names)
+            face_images, face_labels, person_image_count = self.load_dataset(
+                dataset_path, only_files=set(added_files),
+                known_face_names=known_face_names,
+                progress_callback=progress_callback
+            )
+            
+            try:
+                # Merge the new counts into the per-person totals of the previous run
+                image_counts = {
+                    person: info["total_images"]
+                    for person, info in self.training_stats.get("quality_assessment", {}).items()
+                }
+                for person, count in person_image_count.items():
+                    image_counts[person] = image_counts.get(person, 0) + count
+                
+                training_stats = self._compile_training_stats(
+                    sum(image_counts.values()), image_counts, len(known_face_names)
                 )
+                if "gallery_compaction" in self.training_stats:
+                    # New samples are enrolled as they are; the next full retrain compacts them
+                    training_stats["gallery_compaction"] = self.training_stats["gallery_compaction"]
                 
-                for aug_face in augmented_faces:
-                    face_images.append(aug_face)
-                    face_labels.append(person_label)
-                    person_image_count[person_name] += 1
+                # update() mutates the live recognizer, so recognition pauses only for its duration
+                with self._recognizer_lock.write_lock():
+                    if face_images:
+                        self.face_recognizer.update(face_images, np.array(face_labels))
+                    self._publish(
+                        known_face_names=known_face_names,
+                        training_stats=training_stats,
+                        trained_files=dataset_files
+                    )
                 
-                emoji = "📁" if source_type == "folder" else "📄"
-                logger.info(f"{emoji} Loaded face for {person_name} from {os.path.basename(image_path)} (+ {len(augmented_faces)-1} augmented)")
-            else:
-                face_images.append(face_roi)
-                face_labels.append(person_label)
-                person_image_count[person_name] += 1
+                logger.info(f"Enrolled {len(face_images)} new face images")
                 
-                emoji = "📁" if source_type == "folder" else "📄"
-                logger.info(f"{emoji} Loaded face for {person_name} from {os.path.basename(image_path)}")
+                self._save_snapshot(fingerprint)
+                TRAINING_LATENCY.observe(time.perf_counter() - started, 'incremental')
+                
+                return {
+                    "success": True,
+                    "mode": "incremental",
+                    "added_files": added_files,
+                    "stats": training_stats
+                }
+                
+            except Exception as e:
+                logger.error(f"Error during incremental enrollment: {e}")
+                return {"success": False, "mode": "incremental", "error": str(e)}
+    
+    def _compact_gallery(self, face_images: List[np.ndarray],
+                         face_labels: List[int]) -> Tuple[List[np.ndarray], List[int], Dict[str, Any]]:
+        """
+        Reduce every person's samples to GALLERY_PROTOTYPES medoids
+        
+        The accuracy cost is measured first: one source image per person (when
+        they have two or more) is held out, and the held-out faces are
+        recognized by a full and by a compacted gallery built from the rest.
+        If compaction loses more than GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS the
+        full gallery is kept.
+        
+        Returns:
+            Tuple of (face_images, face_labels, compaction statistics)
+        """
+        labels = np.asarray(face_labels)
+        # Every source image contributes its face followed by its augmentations
+        group_size = self.config.AUGMENTATION_FACTOR + 1 if self.config.USE_AUGMENTATION and self.augmentation else 1
+        sources = np.arange(len(labels)) // group_size
+        
+        held_out = set()
+        for label in np.unique(labels):
+            person_sources = np.unique(sources[labels == label])
+            if len(person_sources) >= 2:
+                held_out.add(person_sources[-1])
+        is_held_out = np.isin(sources, list(held_out))
+        validation = np.flatnonzero(is_held_out & (np.arange(len(labels)) % group_size == 0))
+        rest = np.flatnonzero(~is_held_out)
+        
+        accuracy_before = accuracy_after = None
+        if len(validation):
+            probes = [face_images[index] for index in validation]
+            rest_images = [face_images[index] for index in rest]
+            kept = select_prototypes(rest_images, labels[rest], self.config.GALLERY_PROTOTYPES)
+            accuracy_before = self._gallery_accuracy(rest_images, labels[rest], probes, labels[validation])
+            accuracy_after = self._gallery_accuracy(
+                [rest_images[index] for index in kept], labels[rest][kept], probes, labels[validation]
+            )
+        
+        keep = select_prototypes(face_images, labels, self.config.GALLERY_PROTOTYPES)
+        accuracy_delta = accuracy_after - accuracy_before if accuracy_before is not None else None
+        applied = accuracy_delta is None or -accuracy_delta <= self.config.GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS
+        stats = {
+            "applied": applied,
+            "prototypes_per_person": self.config.GALLERY_PROTOTYPES,
+            "faces_before": len(face_images),
+            "faces_after": len(keep) if applied else len(face_images),
+            "reduction": round(len(face_images) / len(keep), 2) if applied else 1.0,
+            "validation_faces": len(validation),
+            "accuracy_before": round(accuracy_before, 4) if accuracy_before is not None else None,
+            "accuracy_after": round(accuracy_after, 4) if accuracy_after is not None else None,
+            "accuracy_delta": round(accuracy_delta, 4) if accuracy_delta is not None else None
+        }
+        
+        if not applied:
+            logger.warning(f"Gallery compaction skipped, accuracy would drop by {-accuracy_delta:.1%}")
+            return face_images, face_labels, stats
+        
+        logger.info(
+            f"Compacted gallery from {len(face_images)} to {len(keep)} faces "
+            f"(held-out accuracy {accuracy_before} -> {accuracy_after})"
+        )
+        return [face_images[index] for index in keep], [face_labels[index] for index in keep], stats
+    
+    def _training_memory_report(self, memory_monitor: PeakMemoryMonitor, recognizer,
+                                face_images_bytes: int, training_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Memory a training run used, by component, and its peak so far"""
+        total_faces = training_stats["total_faces"]
+        report = {
+            "face_images_bytes": face_images_bytes,
+            # All normalized faces have the same size, augmented copies included
+            "augmented_images_bytes": face_images_bytes * training_stats["augmented_count"] // total_faces
+            if total_faces else 0,
+            "gallery_bytes": sum(gallery_memory(recognizer).values()),
+            **memory_monitor.report(),
+            "top_allocators": top_allocators()
+        }
+        for measure in ("face_images_bytes", "augmented_images_bytes", "gallery_bytes",
+                        "peak_rss_bytes", "peak_increase_bytes"):
+            TRAINING_MEMORY.set(report[measure], measure[:-len("_bytes")])
+        return report
+    
+    def _gallery_accuracy(self, gallery_images: List[np.ndarray], gallery_labels: np.ndarray,
+                          probes: List[np.ndarray], probe_labels: np.ndarray) -> float:
+        """Share of probes a recognizer trained on the gallery names correctly"""
+        recognizer = create_recognizer(self.config.RECOGNIZER_BACKEND, self.config)
+        recognizer.train(gallery_images, np.asarray(gallery_labels))
+        if hasattr(recognizer, "predict_batch"):
+            labels, distances = recognizer.predict_batch(probes)
         else:
-            emoji = "📁" if source_type == "folder" else "📄"
-            logger.warning(f"{emoji} No face found in {os.path.basename(image_path)}")
+            labels, distances = zip(*[recognizer.predict(probe) for probe in probes])
+        accepted = np.asarray(distances) < distance_threshold(self.config)
+        return float(np.mean((np.asarray(labels) == probe_labels) & accepted))
     
-    def train(self, dataset_path: str) -> Dict[str, Any]:
+    def _full_retrain(self, dataset_path: str,
+                      progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Run a full retrain and report it in the enrollment result format"""
+        known_files = set(self.trained_files)
+        result = self.train(dataset_path, progress_callback)
+        result["mode"] = "full"
+        result["added_files"] = [
+            path for path in self.trained_files
+            if not path.endswith('/') and path not in known_files
+        ] if result["success"] else []
+        return result
+    
+    def _save_snapshot(self, fingerprint: Optional[str]):
+        """Persist the current model state if model persistence is enabled"""
+        if not self.model_store:
+            return
+        
+        model = self._model
+        with self._recognizer_lock.read_lock():
+            saved = self.model_store.save(
+                fingerprint, model.recognizer,
+                model.known_face_names, model.training_stats,
+                extra={"trained_files": model.trained_files}
+            )
+        if not saved:
+            return
+        self._snapshot_stamp = self.model_store.manifest_stamp()
+        
+        # Serve from the saved file too, so this worker shares the gallery pages with the others
+        if isinstance(model.recognizer, NumpyLBPHRecognizer):
+            recognizer = create_recognizer(self.config.RECOGNIZER_BACKEND, self.config)
+            if self.model_store.load(None, recognizer) is not None:
+                # Same gallery, so the version and cached predictions stay valid
+                self._model = self._model._replace(recognizer=recognizer)
+    
+    def load_snapshot(self, dataset_path: str) -> bool:
         """
-        Train the face recognition model
+        Restore the trained model from its snapshot if the dataset is unchanged
         
         Args:
             dataset_path: Path to training dataset
             
         Returns:
-            Training statistics
+            True if a matching snapshot was loaded, False otherwise
         """
-        logger.info("Starting model training...")
+        if not self.model_store:
+            return False
         
-        # Load dataset
-        face_images, face_labels, person_image_count = self.load_dataset(dataset_path)
+        fingerprint = self.model_store.compute_fingerprint(dataset_path)
+        stamp = self.model_store.manifest_stamp()
+        recognizer = create_recognizer(self.config.RECOGNIZER_BACKEND, self.config)
+        manifest = self.model_store.load(fingerprint, recognizer)
+        if manifest is None:
+            return False
+        
+        self._publish_manifest(recognizer, manifest)
+        self._snapshot_stamp = stamp
+        return True
+    
+    def sync_published_model(self) -> bool:
+        """
+        Switch to a model that another process saved to the snapshot store
+        
+        Gunicorn workers each hold their own model; the one that trains saves
+        a snapshot, and the others pick it up here, at most once every
+        SHARED_MODEL_SYNC_INTERVAL seconds. NumPy backends memory-map the
+        snapshot's gallery, so all workers share one copy of it in RAM.
+        
+        Returns:
+            True if a newer model was published in this process
+        """
+        interval = self.config.SHARED_MODEL_SYNC_INTERVAL
+        now = time.monotonic()
+        if not self.model_store or interval <= 0 or now < self._next_sync_check:
+            return False
+        self._next_sync_check = now + interval
         
-        if len(face_images) == 0:
-            logger.warning("No face images found for training")
-            self.is_trained = False
-            return {"success": False, "error": "No training data found"}
+        stamp = self.model_store.manifest_stamp()
+        if stamp is None or stamp == self._snapshot_stamp:
+            return False
         
+        # A training run in this process is about to publish (and save) its own model
+        if not self._training_lock.acquire(blocking=False):
+            return False
         try:
-            # Train the recognizer
-            self.face_recognizer.train(face_images, np.array(face_labels))
-            self.is_trained = True
+            self._snapshot_stamp = stamp
+            recognizer = create_recognizer(self.config.RECOGNIZER_BACKEND, self.config)
+            manifest = self.model_store.load(None, recognizer)
+            if manifest is None:
+                return False
             
-            # Compile training statistics
-            self.training_stats = self._compile_training_stats(
-                face_images, person_image_count
-            )
-            
-            logger.info("Model training completed successfully")
-            return {"success": True, "stats": self.training_stats}
-            
-        except Exception as e:
-            logger.error(f"Error during training: {e}")
-            self.is_trained = False
-            return {"success": False, "error": str(e)}
+            self._publish_manifest(recognizer, manifest)
+            logger.info("Switched to the model snapshot saved by another process")
+            return True
+        finally:
+            self._training_lock.release()
+    
+    def _publish_manifest(self, recognizer, manifest: Dict[str, Any]):
+        """Publish a recognizer restored from a snapshot along with its manifest state"""
+        self._publish(
+            recognizer=recognizer,
+            known_face_names=manifest["known_face_names"],
+            training_stats=manifest["training_stats"],
+            trained_files=manifest.get("trained_files", {}),
+            is_trained=True
+        )
     
-    def _compile_training_stats(self, face_images: List, person_image_count: Dict) -> Dict:
+    def _compile_training_stats(self, total_faces: int, person_image_count: Dict,
+                                total_people: int) -> Dict:
         """Compile training statistics"""
-        total_faces = len(face_images)
-        total_people = len(self.known_face_names)
-        
         # Calculate original vs augmented counts
         original_count = 0
         for person, count in person_image_count.items():
@@ -315,7 +912,7 @@ class FaceRecognitionModel:
             "quality_assessment": quality_assessment
         }
     
-    def recognize_faces(self, frame: np.ndarray) -> Tuple[List[Tuple], List[str]]:
+    def recognize_faces(self, frame: np.ndarray) -> RecognitionResult:
         """
         Recognize faces in a frame
         
@@ -325,39 +922,206 @@ class FaceRecognitionModel:
         Returns:
             Tuple of (face_locations, face_names)
         """
+        self.sync_published_model()
         if not self.is_trained:
             return [], []
         
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray, 1.1, 4, minSize=(30, 30)
-        )
+        return self._recognize_detections([self._detect_faces(frame)])[0]
+    
+    def recognize_faces_tracked(self, frame: np.ndarray, tracker: FaceTracker) -> RecognitionResult:
+        """
+        Recognize faces in a frame of a continuous stream
         
-        face_locations = []
-        face_names = []
+        Faces are still detected every frame, but only faces the tracker
+        flags (new, moved, or due for a refresh) are sent to the recognizer;
+        the others keep their tracked, vote-smoothed identity.
         
-        for (x, y, w, h) in faces:
-            # Extract face region
-            face_roi = gray[y:y+h, x:x+w]
-            face_roi = cv2.resize(face_roi, self.config.FACE_SIZE_NORMALIZED)
+        Args:
+            frame: Input image frame
+            tracker: Tracker holding the state of this stream
             
-            # Predict using trained model
-            label, confidence = self.face_recognizer.predict(face_roi)
+        Returns:
+            Tuple of (face_locations, face_names)
+        """
+        self.sync_published_model()
+        if not self.is_trained:
+            return [], []
+        
+        face_locations, face_rois = self._detect_faces(frame)
+        
+        with self._recognizer_lock.read_lock():
+            model = self._model
+            if not model.is_trained:
+                return [], []
+            
+            tracked = tracker.update(face_locations, model.version)
+            pending = [index for index, (_, needs_prediction) in enumerate(tracked) if needs_prediction]
+            predicted = self._predict_names(model, [face_rois[index] for index in pending])
+            for index, name in zip(pending, predicted):
+                tracker.record_prediction(tracked[index][0], name, model.version)
+            face_names = [track.name for track, _ in tracked]
+        
+        return face_locations, face_names
+    
+    def recognize_faces_batch(self, frames: List[np.ndarray]) -> List[RecognitionResult]:
+        """
+        Recognize faces in many frames at once
+        
+        Detection runs on a thread pool and every detected face of the batch
+        is then predicted in one pass against the same model.
+        
+        Args:
+            frames: Decoded input frames
             
-            # Determine name based on confidence
-            if confidence < self.config.CONFIDENCE_THRESHOLD:
-                name = self.known_face_names[label]
-                confidence_percent = max(0, 100 - confidence)
-                logger.debug(f"Recognized: {name} (confidence: {confidence_percent:.1f}%)")
+        Returns:
+            (face_locations, face_names) per frame, in input order
+        """
+        self.sync_published_model()
+        if not self.is_trained:
+            return [([], []) for _ in frames]
+        
+        return self._recognize_detections(self._map_batch(self._detect_faces, frames))
+    
+    def recognize_encoded_batch(self, buffers: List[np.ndarray]) -> List[Optional[RecognitionResult]]:
+        """
+        Decode and recognize faces in many encoded images at once
+        
+        Like recognize_faces_batch, but decoding also happens on the thread pool.
+        
+        Args:
+            buffers: Encoded image buffers (uint8)
+            
+        Returns:
+            (face_locations, face_names) per image, or None for images that
+            could not be decoded
+        """
+        self.sync_published_model()
+        detections = self._map_batch(self._decode_and_detect_faces, buffers)
+        valid = [index for index, detection in enumerate(detections) if detection is not None]
+        
+        results = [None] * len(buffers)
+        if not self.is_trained:
+            for index in valid:
+                results[index] = ([], [])
+            return results
+        
+        for index, result in zip(valid, self._recognize_detections([detections[i] for i in valid])):
+            results[index] = result
+        return results
+    
+    def _map_batch(self, func: Callable, items: List) -> List:
+        """Apply func to every item, on the batch thread pool when it pays off"""
+        workers = resolve_worker_count(self.config.BATCH_WORKERS)
+        if workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        
+        with self._batch_executor_lock:
+            if self._batch_executor is None:
+                self._batch_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="recognize-batch"
+                )
+        return list(self._batch_executor.map(propagate(func), items))
+    
+    def _get_thread_cascade(self) -> cv2.CascadeClassifier:
+        """Face cascade owned by the calling thread"""
+        cascade = getattr(self._thread_local, "face_cascade", None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + self.config.FACE_CASCADE_FILE
+            )
+            self._thread_local.face_cascade = cascade
+        return cascade
+    
+    def _decode_and_detect_faces(self, image_bytes: np.ndarray) -> Optional[Tuple[List[Tuple], List[np.ndarray]]]:
+        """Decode an encoded image and detect faces in it (None if undecodable)"""
+        with stage('decode'):
+            frame = self.image_processor.decode_image(image_bytes)
+        if frame is None:
+            return None
+        return self._detect_faces(frame)
+    
+    def _detect_faces(self, frame: np.ndarray) -> Tuple[List[Tuple], List[np.ndarray]]:
+        """Detect faces in a frame and return their locations and normalized ROIs"""
+        with stage('grayscale'):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        with stage('detect', width=frame.shape[1], height=frame.shape[0]):
+            faces = self.image_processor.detect_faces(
+                self._get_thread_cascade(), gray, self.config.RECOGNITION_MIN_FACE_SIZE
+            )
+            
+            face_locations = []
+            face_rois = []
+            
+            for (x, y, w, h) in faces:
+                # Extract face region
+                face_roi = gray[y:y+h, x:x+w]
+                face_rois.append(cv2.resize(face_roi, self.config.FACE_SIZE_NORMALIZED))
+                
+                # Convert to standardized format (top, right, bottom, left)
+                face_locations.append((y, x + w, y + h, x))
+        
+        return face_locations, face_rois
+    
+    def _recognize_detections(self, detections: List[Tuple[List[Tuple], List[np.ndarray]]]) -> List[RecognitionResult]:
+        """Predict names for the face ROIs of several frames in one pass"""
+        with self._recognizer_lock.read_lock():
+            # Recognizer and label map must come from the same published model
+            model = self._model
+            if not model.is_trained:
+                return [([], []) for _ in detections]
+            
+            face_names = iter(self._predict_names(
+                model, [face_roi for _, face_rois in detections for face_roi in face_rois]
+            ))
+            return [
+                (face_locations, [next(face_names) for _ in face_rois])
+                for face_locations, face_rois in detections
+            ]
+    
+    def _predict_names(self, model: TrainedModel, face_rois: List[np.ndarray]) -> List[str]:
+        """Predict the names for normalized face ROIs using the given model state"""
+        predictions = [None] * len(face_rois)
+        
+        # Skip ROIs that are near-identical to one that was just predicted
+        phashes = []
+        if self.prediction_cache is not None:
+            phashes = [perceptual_hash(face_roi) for face_roi in face_rois]
+            for index, phash in enumerate(phashes):
+                predictions[index] = self.prediction_cache.get(phash, model.version)
+        
+        misses = [index for index, prediction in enumerate(predictions) if prediction is None]
+        if misses:
+            rois = [face_rois[index] for index in misses]
+            if hasattr(model.recognizer, "predict_batch"):
+                with stage('predict', faces=len(rois)):
+                    labels, confidences = model.recognizer.predict_batch(rois)
+                fresh = [(int(label), float(confidence)) for label, confidence in zip(labels, confidences)]
             else:
-                name = "Unknown"
-                logger.debug(f"Unknown person (confidence too low: {100 - confidence:.1f}%)")
+                fresh = []
+                for face_roi in rois:
+                    with stage('predict', faces=1):
+                        fresh.append(model.recognizer.predict(face_roi))
             
-            # Convert to standardized format (top, right, bottom, left)
-            face_locations.append((y, x + w, y + h, x))
-            face_names.append(name)
+            for index, (label, confidence) in zip(misses, fresh):
+                predictions[index] = (label, confidence)
+                if self.prediction_cache is not None:
+                    self.prediction_cache.put(phashes[index], model.version, label, confidence)
         
-        return face_locations, face_names
+        return [self._label_to_name(model, label, confidence) for label, confidence in predictions]
+    
+    def _label_to_name(self, model: TrainedModel, label: int, confidence: float) -> str:
+        """Determine name based on confidence"""
+        if confidence < distance_threshold(self.config):
+            name = model.known_face_names[label]
+            logger.debug("Recognized: %s (confidence: %.1f%%)", name, max(0, 100 - confidence))
+            self._recognition_summary.add(recognized=1)
+        else:
+            name = "Unknown"
+            logger.debug("Unknown person (confidence too low: %.1f%%)", 100 - confidence)
+            self._recognition_summary.add(unknown=1)
+        
+        return name
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information and statistics"""
@@ -367,13 +1131,40 @@ class FaceRecognitionModel:
             "total_people": len(self.known_face_names),
             "confidence_threshold": self.config.CONFIDENCE_THRESHOLD,
             "training_stats": self.training_stats if hasattr(self, 'training_stats') else {},
+            "recognizer": {
+                "backend": self.config.RECOGNIZER_BACKEND,
+                "description": get_backend(self.config.RECOGNIZER_BACKEND).description,
+                "distance_threshold": distance_threshold(self.config),
+                "incremental_updates": get_backend(self.config.RECOGNIZER_BACKEND).supports_update,
+                "gallery_index": self.face_recognizer.get_index_stats()
+                if hasattr(self.face_recognizer, "get_index_stats") else None
+            },
             "config": {
                 "use_augmentation": self.config.USE_AUGMENTATION,
                 "augmentation_factor": self.config.AUGMENTATION_FACTOR,
                 "min_face_size": self.config.MIN_FACE_SIZE,
                 "face_size_normalized": self.config.FACE_SIZE_NORMALIZED
-            }
+            },
+            "roi_cache": self.face_cache.get_stats() if self.face_cache is not None else None,
+            "prediction_cache": self.prediction_cache.get_stats() if self.prediction_cache is not None else None
+        }
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held by the published gallery and the caches, by component"""
+        model = self._model
+        gallery = gallery_memory(model.recognizer) if model.is_trained else {"private_bytes": 0, "mapped_bytes": 0}
+        usage = {
+            "gallery": gallery["private_bytes"],
+            "gallery_mapped": gallery["mapped_bytes"],
+            "face_cache_mapped": 0,
+            "face_cache_index": 0,
+            "face_cache_pending": 0,
+            "prediction_cache": self.prediction_cache.memory_usage() if self.prediction_cache is not None else 0
         }
+        if self.face_cache is not None:
+            for name, size in self.face_cache.memory_usage().items():
+                usage["face_cache_" + name[:-len("_bytes")]] = size
+        return usage
     
     def update_config(self, **kwargs):
         """Update model configuration"""
@@ -0,0 +1,82 @@
+"""
+Gallery File
+Flat file of named arrays that is memory-mapped read-only for serving
+
+Processes that map the same file share its pages through the OS page cache,
+so a gallery costs its size in RAM once, not once per worker process.
+"""
+import json
+from typing import Dict
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GALLERY_MAGIC = b"FRGALLRY"
+GALLERY_FORMAT_VERSION = 1
+# Array data offsets are multiples of this, so every mapped array is aligned
+ALIGNMENT = 64
+
+
+def write_gallery_file(path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Write arrays to path
+
+    Layout: magic, format version and header length (two little-endian u4),
+    a JSON header with the dtype, shape and offset of every array, then the
+    raw C-ordered array data.
+
+    Args:
+        path: Destination file
+        arrays: Arrays by name
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps(entries).encode("utf-8")
+    preamble = GALLERY_MAGIC + np.array([GALLERY_FORMAT_VERSION, len(header)], dtype="<u4").tobytes()
+    data_start = -(-(len(preamble) + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    with open(path, 'wb') as f:
+        f.write(preamble + header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(array.data)
+        f.truncate(data_start + offset)
+
+
+def map_gallery_file(path: str) -> Dict[str, np.ndarray]:
+    """
+    Memory-map the arrays of a gallery file
+
+    Args:
+        path: File written by ``write_gallery_file``
+
+    Returns:
+        Read-only arrays by name, all views of one shared mapping
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(len(GALLERY_MAGIC) + 8)
+        if preamble[:len(GALLERY_MAGIC)] != GALLERY_MAGIC:
+            raise ValueError(f"{path} is not a gallery file")
+        version, header_size = np.frombuffer(preamble[len(GALLERY_MAGIC):], dtype="<u4")
+        if version != GALLERY_FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported gallery format version {version}")
+        entries = json.loads(f.read(int(header_size)).decode("utf-8"))
+
+    data_start = -(-(len(preamble) + int(header_size)) // ALIGNMENT) * ALIGNMENT
+    mapping = np.memmap(path, dtype=np.uint8, mode='r')
+
+    arrays = {}
+    for name, entry in entries.items():
+        dtype = np.dtype(entry["dtype"])
+        start = data_start + entry["offset"]
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        arrays[name] = mapping[start:start + count * dtype.itemsize].view(dtype).reshape(entry["shape"])
+    return arrays
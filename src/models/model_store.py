@@ -0,0 +1,293 @@
+"""
+Model Snapshot Store
+Persists the trained recognizer, label map and training statistics so that
+startup can skip re-training when the dataset has not changed
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+import cv2
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from config.settings import FaceRecognitionConfig
+from src.models.gallery_file import GALLERY_FORMAT_VERSION
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+from src.models.recognizers import file_extension
+from src.utils.file_lock import locked_file
+from src.utils.image_processor import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout of a snapshot changes
+SNAPSHOT_FORMAT_VERSION = 3
+MANIFEST_FILE = "manifest.json"
+# Held while a snapshot is published or read, by every process sharing the directory
+LOCK_FILE = MANIFEST_FILE + ".lock"
+
+# Config values that change what training produces
+FINGERPRINT_CONFIG_KEYS = (
+    "RECOGNIZER_BACKEND",
+    "FACE_CASCADE_FILE",
+    "MIN_FACE_SIZE",
+    "FACE_SIZE_NORMALIZED",
+    "DETECTION_MAX_SIDE",
+    "USE_AUGMENTATION",
+    "AUGMENTATION_FACTOR",
+    "GALLERY_PROTOTYPES",
+    "ROTATION_RANGE",
+    "BRIGHTNESS_RANGE",
+    "CONTRAST_RANGE",
+    "FLIP_PROBABILITY",
+    "NOISE_STD",
+    "TRANSLATION_RANGE",
+)
+
+
+def scan_dataset_files(dataset_path: str, image_processor: ImageProcessor) -> Dict[str, List[int]]:
+    """
+    List dataset images in the layout ``load_dataset`` reads
+
+    Args:
+        dataset_path: Path to dataset directory
+        image_processor: Used to recognise image files
+
+    Returns:
+        Mapping of relative path to [size, mtime_ns]. Person folders are
+        included as ``"<folder>/"`` entries since they create a label even
+        when empty.
+    """
+    files = {}
+    if not os.path.exists(dataset_path):
+        return files
+
+    for item in sorted(os.listdir(dataset_path)):
+        item_path = os.path.join(dataset_path, item)
+
+        if os.path.isdir(item_path):
+            files[item + "/"] = [0, 0]
+            for filename in sorted(os.listdir(item_path)):
+                if image_processor.is_image_file(filename):
+                    stat = os.stat(os.path.join(item_path, filename))
+                    files[item + "/" + filename] = [stat.st_size, stat.st_mtime_ns]
+        elif image_processor.is_image_file(item):
+            stat = os.stat(item_path)
+            files[item] = [stat.st_size, stat.st_mtime_ns]
+
+    return files
+
+
+class ModelStore:
+    """
+    Versioned on-disk snapshot of a trained face recognizer
+
+    A snapshot is a directory holding the serialized recognizer and a
+    ``manifest.json`` with the label map, training statistics and the
+    fingerprint of the dataset it was trained on.
+
+    Several worker processes may share the directory: publishing a snapshot
+    (and deleting the files it replaces) and reading one both hold a file
+    lock, so a worker never loses its recognizer file to another's cleanup.
+    """
+
+    def __init__(self, snapshot_dir, config: FaceRecognitionConfig = None):
+        self.config = config or FaceRecognitionConfig()
+        self.snapshot_dir = Path(snapshot_dir)
+        self.image_processor = ImageProcessor(config=self.config)
+        self.lock_path = self.snapshot_dir / LOCK_FILE
+
+    def compute_fingerprint(self, dataset_path: str,
+                            files: Optional[Dict[str, List[int]]] = None) -> str:
+        """
+        Compute a fingerprint of the dataset and training configuration
+
+        Only file metadata (relative path, size, mtime) is hashed, so this
+        is a directory walk rather than a read of every image.
+
+        Args:
+            dataset_path: Path to dataset directory
+            files: Result of ``scan_dataset_files`` if already available
+
+        Returns:
+            Hex digest identifying the dataset state
+        """
+        if files is None:
+            files = scan_dataset_files(dataset_path, self.image_processor)
+
+        payload = json.dumps(
+            {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "config": self.config_values(),
+                "files": sorted([path] + list(info) for path, info in files.items()),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=list,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def config_values(self) -> Dict[str, Any]:
+        """Training configuration as stored in the manifest (tuples become lists)"""
+        return json.loads(json.dumps(
+            {key: getattr(self.config, key, None) for key in FINGERPRINT_CONFIG_KEYS},
+            default=list,
+        ))
+
+    def manifest_stamp(self) -> Optional[Tuple[int, int]]:
+        """
+        Identify the current snapshot without reading it
+
+        Every save replaces the manifest with a new file, so its inode and
+        modification time change whenever any process publishes a model.
+
+        Returns:
+            (inode, mtime_ns) of the manifest, or None if there is no snapshot
+        """
+        try:
+            stat = os.stat(self.snapshot_dir / MANIFEST_FILE)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def load(self, fingerprint: Optional[str], recognizer) -> Optional[Dict[str, Any]]:
+        """
+        Load a snapshot into ``recognizer`` if it matches the fingerprint
+
+        The snapshot must also have been trained with the current backend
+        and training configuration, and its gallery file (NumPy backends)
+        must be in the format this version reads.
+
+        Args:
+            fingerprint: Expected dataset fingerprint, or None to load the
+                latest snapshot whatever dataset state it was trained on
+            recognizer: Recognizer instance to restore state into
+
+        Returns:
+            Manifest dictionary or None if no matching snapshot exists
+        """
+        manifest_path = self.snapshot_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+
+        try:
+            with locked_file(self.lock_path):
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+
+                if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                    logger.info("Model snapshot has an outdated format, ignoring it")
+                    return None
+
+                if fingerprint is not None and manifest.get("fingerprint") != fingerprint:
+                    logger.info("Dataset changed since the last snapshot, retraining required")
+                    return None
+
+                if not self._settings_match(manifest, recognizer):
+                    return None
+
+                recognizer_path = self.snapshot_dir / manifest["recognizer_file"]
+                if not recognizer_path.exists():
+                    logger.warning(f"Model snapshot is missing {recognizer_path.name}")
+                    return None
+
+                recognizer.read(str(recognizer_path))
+                return manifest
+
+        except Exception as e:
+            logger.error(f"Error loading model snapshot: {e}")
+            return None
+
+    def save(self, fingerprint: str, recognizer, known_face_names: List[str],
+             training_stats: Dict[str, Any], extra: Dict[str, Any] = None) -> bool:
+        """
+        Save a snapshot of a trained recognizer
+
+        Files are written under temporary names and moved into place, the
+        manifest last, so a crash never leaves a half-written snapshot.
+
+        Args:
+            fingerprint: Fingerprint of the dataset the recognizer was trained on
+            recognizer: Trained recognizer
+            known_face_names: Label map (index = label id)
+            training_stats: Training statistics to restore with the model
+            extra: Additional JSON-serializable state to store in the manifest
+
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+            recognizer_file = f"recognizer-{fingerprint[:16]}{file_extension(recognizer)}"
+            recognizer_path = self.snapshot_dir / recognizer_file
+            tmp_recognizer_path = self.snapshot_dir / f".tmp-{os.getpid()}-{recognizer_file}"
+            recognizer.write(str(tmp_recognizer_path))
+
+            manifest = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "fingerprint": fingerprint,
+                "created_at": time.time(),
+                "opencv_version": cv2.__version__,
+                "backend": self.config.RECOGNIZER_BACKEND,
+                "config": self.config_values(),
+                "recognizer_file": recognizer_file,
+                "known_face_names": list(known_face_names),
+                "training_stats": training_stats,
+            }
+            if isinstance(recognizer, NumpyLBPHRecognizer):
+                manifest["gallery_format_version"] = GALLERY_FORMAT_VERSION
+            if extra:
+                manifest.update(extra)
+
+            tmp_manifest_path = self.snapshot_dir / f".tmp-{os.getpid()}-{MANIFEST_FILE}"
+            with open(tmp_manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            # Publish and clean up in one step, so no other worker deletes
+            # this recognizer file before its manifest is in place
+            with locked_file(self.lock_path):
+                os.replace(tmp_recognizer_path, recognizer_path)
+                os.replace(tmp_manifest_path, self.snapshot_dir / MANIFEST_FILE)
+                self._remove_stale_files(keep=recognizer_file)
+            logger.info(f"Saved model snapshot to {self.snapshot_dir}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving model snapshot: {e}")
+            return False
+
+    def _settings_match(self, manifest: Dict[str, Any], recognizer) -> bool:
+        """Whether a snapshot was trained with the current backend and configuration"""
+        backend = manifest.get("backend")
+        if backend != self.config.RECOGNIZER_BACKEND:
+            logger.info(f"Model snapshot was trained with the {backend} backend, "
+                        f"not {self.config.RECOGNIZER_BACKEND}, ignoring it")
+            return False
+
+        saved_config = manifest.get("config") or {}
+        changed = sorted(
+            key for key, value in self.config_values().items() if saved_config.get(key) != value
+        )
+        if changed:
+            logger.info(f"Training settings changed since the last snapshot ({', '.join(changed)}), ignoring it")
+            return False
+
+        if isinstance(recognizer, NumpyLBPHRecognizer) and manifest.get("gallery_format_version") != GALLERY_FORMAT_VERSION:
+            logger.info("Model snapshot has an outdated gallery file format, ignoring it")
+            return False
+        return True
+
+    def _remove_stale_files(self, keep: str):
+        """Delete recognizer files from previous snapshots (caller holds the snapshot lock)"""
+        for path in self.snapshot_dir.glob("recognizer-*"):
+            if path.name != keep:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove stale snapshot file {path.name}: {e}")
@@ -0,0 +1,341 @@
+"""
+NumPy LBPH Recognizer
+Vectorized re-implementation of OpenCV's LBPH face recognizer
+"""
+import math
+from typing import Iterator, List, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from src.models.gallery_file import map_gallery_file, write_gallery_file
+
+logger = logging.getLogger(__name__)
+
+# Gallery faces the index PCA is fitted on, and rows processed at once while fitting
+INDEX_FIT_SAMPLE = 8192
+INDEX_CHUNK_SIZE = 1024
+
+def chi_square_matrix(queries: np.ndarray, histograms: np.ndarray) -> np.ndarray:
+    """
+    Chi-square (alt) distances, as LBPH computes them, between every pair
+
+    Args:
+        queries: (queries x bins) histograms
+        histograms: (histograms x bins) histograms
+
+    Returns:
+        (queries x histograms) float64 distances
+    """
+    columns = np.ascontiguousarray(np.asarray(histograms, dtype=np.float32).T)
+    sums = columns.sum(axis=0, dtype=np.float64)
+    distances = np.empty((len(queries), columns.shape[1]), dtype=np.float64)
+    for row, query in enumerate(queries):
+        bins = np.flatnonzero(query)
+        distances[row] = NumpyLBPHRecognizer._chi_square(query[bins], np.take(columns, bins, axis=0), sums)
+    return np.maximum(distances, 0.0)
+
+
+class NumpyLBPHRecognizer:
+    """
+    Drop-in replacement for ``cv2.face.LBPHFaceRecognizer``
+
+    Computes the same extended LBP codes, normalized grid histograms and
+    chi-square (alt) distance as OpenCV, so predictions match. The gallery
+    is one contiguous float32 matrix laid out bin-major (bins x faces), so
+    a probe is scored against every face at once.
+
+    For a gallery histogram g and a probe q, each bin contributes
+
+        (g - q)^2 / (g + q) = g - 3q + 4 * q^2 / (g + q)
+
+    which is just g where q == 0. The distance is therefore
+
+        2 * (sum(g) - 3 * sum(q) + 4 * sum_{q > 0}(q^2 / (g + q)))
+
+    so only the probe's non-zero bins (about a quarter) are ever touched.
+
+    Large galleries are searched through an index instead: every histogram
+    is reduced to a short PCA code of its square root (so code distances
+    approximate the Hellinger distance), the ``index_shortlist`` gallery
+    faces with the nearest codes are shortlisted, and only those are
+    re-ranked with the exact chi-square distance. The code search costs a
+    few microseconds per thousand faces, so predict latency stays nearly
+    flat as the gallery grows; a longer shortlist raises recall@1 against
+    the full scan.
+
+    ``write`` saves the gallery in the layout predictions read and ``read``
+    memory-maps it, so processes serving the same file share its pages.
+    """
+
+    # write() saves a gallery file (see gallery_file.py), not OpenCV's YAML
+    FILE_EXTENSION = ".gallery"
+
+    # Gallery arrays predictions read, written and mapped as they are
+    _SERVING_ARRAYS = ("_labels", "_gallery_sums", "_gallery", "_rows", "_codes", "_code_norms",
+                       "_projection", "_index_mean")
+
+    def __init__(self, radius: int = 1, neighbors: int = 8, grid_x: int = 8, grid_y: int = 8,
+                 index_min_size: int = 0, index_dim: int = 128, index_shortlist: int = 32):
+        """
+        Args:
+            radius, neighbors, grid_x, grid_y: LBPH parameters, as in OpenCV
+            index_min_size: Gallery size from which the index is used
+                (0 = always scan the whole gallery)
+            index_dim: Length of the PCA codes
+            index_shortlist: Gallery faces re-ranked exactly per probe
+        """
+        self.radius = radius
+        self.neighbors = neighbors
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.num_patterns = 2 ** neighbors
+        self.index_min_size = index_min_size
+        self.index_dim = index_dim
+        self.index_shortlist = index_shortlist
+        self._set_gallery(np.zeros((0, grid_x * grid_y * self.num_patterns), dtype=np.float32), np.zeros(0))
+
+    # OpenCV-compatible API
+
+    def train(self, images: Sequence[np.ndarray], labels) -> None:
+        """Replace the gallery with the given faces"""
+        self._set_gallery(self.compute_histograms(images), np.asarray(labels, dtype=np.int32).ravel())
+
+    def update(self, images: Sequence[np.ndarray], labels) -> None:
+        """Add faces to the gallery"""
+        self._set_gallery(
+            np.concatenate([self._gallery_histograms(), self.compute_histograms(images)]),
+            np.concatenate([self._labels, np.asarray(labels, dtype=np.int32).ravel()])
+        )
+
+    def predict(self, face_roi: np.ndarray) -> Tuple[int, float]:
+        """Return (label, distance) of the nearest gallery face"""
+        labels, distances = self.predict_batch([face_roi])
+        return int(labels[0]), float(distances[0])
+
+    def empty(self) -> bool:
+        return len(self._labels) == 0
+
+    def getHistograms(self) -> List[np.ndarray]:
+        return [row.reshape(1, -1) for row in self._gallery_histograms()]
+
+    def getLabels(self) -> np.ndarray:
+        return self._labels.reshape(-1, 1)
+
+    def write(self, path: str) -> None:
+        arrays = {
+            name: getattr(self, name) for name in self._SERVING_ARRAYS if getattr(self, name, None) is not None
+        }
+        arrays["params"] = np.array([self.radius, self.neighbors, self.grid_x, self.grid_y])
+        write_gallery_file(path, arrays)
+
+    def read(self, path: str) -> None:
+        """Memory-map a gallery saved by ``write`` (read-only, shared between processes)"""
+        arrays = map_gallery_file(path)
+        self.radius, self.neighbors, self.grid_x, self.grid_y = (int(v) for v in arrays.pop("params"))
+        self.num_patterns = 2 ** self.neighbors
+        for name in self._SERVING_ARRAYS:
+            setattr(self, name, arrays.get(name))
+
+        # Index settings are not part of the file; rebuild (privately) if they changed since
+        if not self._layout_matches():
+            logger.info("Gallery index settings changed, rebuilding the gallery layout")
+            self._set_gallery(self._gallery_histograms(), self._labels)
+
+    # Batched API
+
+    def predict_batch(self, face_rois: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a batch of probe ROIs against the whole gallery
+
+        Args:
+            face_rois: Normalized grayscale face ROIs
+
+        Returns:
+            (labels, distances) arrays, one entry per probe
+        """
+        if self.empty():
+            raise ValueError("NumpyLBPHRecognizer is not trained")
+
+        queries = self.compute_histograms(face_rois)
+        labels = np.empty(len(queries), dtype=np.int32)
+        distances = np.empty(len(queries), dtype=np.float64)
+
+        shortlists = self._shortlist(queries) if self.index_active else None
+
+        for row, query in enumerate(queries):
+            bins = np.flatnonzero(query)
+            values = query[bins]
+
+            if shortlists is not None:
+                faces = np.sort(shortlists[row])
+                block = np.take(np.take(self._rows, faces, axis=0), bins, axis=1)
+                scores = self._chi_square(values, block.T, self._gallery_sums[faces])
+                best = faces[scores.argmin()]
+            else:
+                scores = self._chi_square(values, np.take(self._gallery, bins, axis=0), self._gallery_sums)
+                # argmin keeps the first of equal distances, like OpenCV's nearest-neighbour scan
+                best = scores.argmin()
+
+            labels[row] = self._labels[best]
+            distances[row] = max(scores.min(), 0.0)
+
+        return labels, distances
+
+    @property
+    def index_active(self) -> bool:
+        """Whether predictions go through the index"""
+        return self._codes is not None
+
+    def get_index_stats(self) -> dict:
+        """Gallery and index sizes for monitoring"""
+        return {
+            "faces": len(self._labels),
+            "indexed": self.index_active,
+            "code_dim": self._codes.shape[1] if self.index_active else None,
+            "shortlist": self.index_shortlist if self.index_active else None
+        }
+
+    def compute_histograms(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        """Spatial LBP histograms of the images, one float32 row each"""
+        if len(images) == 0:
+            return np.zeros((0, self.grid_x * self.grid_y * self.num_patterns), dtype=np.float32)
+
+        shapes = {image.shape for image in images}
+        if len(shapes) > 1:
+            return np.concatenate([self._spatial_histograms(self._elbp(image[None])) for image in images])
+        return self._spatial_histograms(self._elbp(np.stack(images)))
+
+    # Internals
+
+    def _set_gallery(self, histograms: np.ndarray, labels: np.ndarray):
+        """
+        Store the gallery histograms with per-face sums for the distance
+
+        The full scan reads a few bins of every face, so the gallery is kept
+        bin-major (bins x faces). With the index only a few whole faces are
+        read per probe, so it is kept face-major (faces x bins) instead.
+        """
+        histograms = np.ascontiguousarray(histograms, dtype=np.float32)
+        self._labels = np.ascontiguousarray(labels, dtype=np.int32)
+        self._gallery_sums = histograms.sum(axis=1, dtype=np.float64)
+        self._codes = self._code_norms = self._projection = self._index_mean = None
+        if self._wants_index(len(self._labels)):
+            self._gallery, self._rows = None, histograms
+            self._build_index(histograms)
+        else:
+            self._gallery, self._rows = np.ascontiguousarray(histograms.T), None
+
+    def _wants_index(self, count: int) -> bool:
+        """Whether a gallery of count faces is searched through the index"""
+        return 0 < self.index_min_size <= count and self.index_shortlist < count
+
+    def _layout_matches(self) -> bool:
+        """Whether the stored layout is the one _set_gallery builds with the current settings"""
+        count = len(self._labels)
+        if not self._wants_index(count):
+            return self._codes is None
+        return self._codes is not None and self._codes.shape[1] == min(self.index_dim, count, INDEX_FIT_SAMPLE)
+
+    def _gallery_histograms(self) -> np.ndarray:
+        """Gallery as (faces x bins) histograms"""
+        return self._rows if self._rows is not None else self._gallery.T
+
+    def _build_index(self, histograms: np.ndarray):
+        """Fit the PCA projection on (a sample of) the gallery and encode every face"""
+        rng = np.random.default_rng(0)
+        sample = histograms
+        if len(sample) > INDEX_FIT_SAMPLE:
+            sample = histograms[np.sort(rng.choice(len(histograms), INDEX_FIT_SAMPLE, replace=False))]
+
+        # Randomized SVD with two power iterations, streaming over row chunks so the
+        # centered square roots of the sample never exist all at once
+        self._index_mean = np.zeros(sample.shape[1], dtype=np.float32)
+        self._index_mean = sum(roots.sum(axis=0) for _, roots in self._root_chunks(sample)) / len(sample)
+        dim = min(self.index_dim, len(sample))
+        basis = rng.standard_normal((sample.shape[1], dim + 8), dtype=np.float32)
+        for _ in range(2):
+            range_basis = np.concatenate([roots @ basis for _, roots in self._root_chunks(sample)])
+            basis = sum(roots.T @ range_basis[start:start + len(roots)] for start, roots in self._root_chunks(sample))
+        range_basis, _ = np.linalg.qr(np.concatenate([roots @ basis for _, roots in self._root_chunks(sample)]))
+        projected = sum(range_basis[start:start + len(roots)].T @ roots for start, roots in self._root_chunks(sample))
+        _, _, components = np.linalg.svd(projected, full_matrices=False)
+        self._projection = np.ascontiguousarray(components[:dim].T, dtype=np.float32)
+
+        self._codes = np.concatenate([roots @ self._projection for _, roots in self._root_chunks(histograms)])
+        self._code_norms = np.einsum("ij,ij->i", self._codes, self._codes)
+
+    def _root_chunks(self, histograms: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """(start row, centered square roots) of consecutive chunks of histograms"""
+        for start in range(0, len(histograms), INDEX_CHUNK_SIZE):
+            yield start, np.sqrt(histograms[start:start + INDEX_CHUNK_SIZE]) - self._index_mean
+
+    def _encode(self, histograms: np.ndarray) -> np.ndarray:
+        """PCA codes of (faces x bins) histograms"""
+        return (np.sqrt(histograms) - self._index_mean) @ self._projection
+
+    def _shortlist(self, queries: np.ndarray) -> np.ndarray:
+        """Gallery columns of the faces whose codes are nearest each query"""
+        codes = self._encode(queries)
+        # Squared code distance, up to the per-query constant |code|^2
+        distances = self._code_norms[None, :] - 2.0 * (codes @ self._codes.T)
+        return np.argpartition(distances, self.index_shortlist - 1, axis=1)[:, :self.index_shortlist]
+
+    @staticmethod
+    def _chi_square(values: np.ndarray, block: np.ndarray, sums: np.ndarray) -> np.ndarray:
+        """
+        Chi-square (alt) distances from a probe to histograms
+
+        Args:
+            values: The probe's non-zero bin values
+            block: (probe bins x histograms) rows of those bins, overwritten
+            sums: Per-histogram sums over all bins
+        """
+        # q^2 / (g + q), computed in place
+        block += values[:, None]
+        np.divide((values * values)[:, None], block, out=block)
+        return 2.0 * (sums - 3.0 * values.sum(dtype=np.float64) + 4.0 * np.add.reduce(block, axis=0, dtype=np.float64))
+
+    def _elbp(self, images: np.ndarray) -> np.ndarray:
+        """Extended LBP codes of a (N, H, W) stack, computed exactly like OpenCV's elbp"""
+        r = self.radius
+        src = images.astype(np.float32)
+        height, width = images.shape[1] - 2 * r, images.shape[2] - 2 * r
+        center = src[:, r:r + height, r:r + width]
+        codes = np.zeros((len(images), height, width), dtype=np.int32)
+        eps = np.finfo(np.float32).eps
+
+        def window(dy, dx):
+            return src[:, r + dy:r + dy + height, r + dx:r + dx + width]
+
+        for n in range(self.neighbors):
+            x = np.float32(r * math.cos(2.0 * math.pi * n / float(self.neighbors)))
+            y = np.float32(-r * math.sin(2.0 * math.pi * n / float(self.neighbors)))
+            fx, fy = int(math.floor(x)), int(math.floor(y))
+            cx, cy = int(math.ceil(x)), int(math.ceil(y))
+            ty, tx = np.float32(y - fy), np.float32(x - fx)
+            w1 = (np.float32(1) - tx) * (np.float32(1) - ty)
+            w2 = tx * (np.float32(1) - ty)
+            w3 = (np.float32(1) - tx) * ty
+            w4 = tx * ty
+
+            t = w1 * window(fy, fx) + w2 * window(fy, cx) + w3 * window(cy, fx) + w4 * window(cy, cx)
+            codes |= ((t > center) | (np.abs(t - center) < eps)).astype(np.int32) << n
+
+        return codes
+
+    def _spatial_histograms(self, codes: np.ndarray) -> np.ndarray:
+        """Normalized per-cell histograms, concatenated row-major like OpenCV's spatial_histogram"""
+        count, height, width = codes.shape
+        cell_h, cell_w = height // self.grid_y, width // self.grid_x
+        cells = self.grid_x * self.grid_y
+
+        # (N, grid_y, cell_h, grid_x, cell_w) -> (N, cell index, pixels)
+        grid = codes[:, :cell_h * self.grid_y, :cell_w * self.grid_x]
+        grid = grid.reshape(count, self.grid_y, cell_h, self.grid_x, cell_w).transpose(0, 1, 3, 2, 4)
+        grid = grid.reshape(count, cells, cell_h * cell_w)
+
+        offsets = (np.arange(count * cells) * self.num_patterns).reshape(count, cells, 1)
+        counts = np.bincount((grid + offsets).ravel(), minlength=count * cells * self.num_patterns)
+        histograms = counts.astype(np.float32) / np.float32(cell_h * cell_w)
+        return histograms.reshape(count, cells * self.num_patterns)
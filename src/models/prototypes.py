@@ -0,0 +1,84 @@
+"""
+Gallery Prototypes
+Compacts a training gallery to a few representative samples per person
+
+Augmentation stores several near-identical copies of every training face.
+Per person, k-medoids clustering under the LBPH chi-square distance keeps
+the k samples that best represent all of that person's samples; since
+medoids are real training samples, any recognizer backend can simply be
+trained on them.
+"""
+from typing import Sequence
+import logging
+
+import numpy as np
+
+from src.models.numpy_lbph import NumpyLBPHRecognizer, chi_square_matrix
+
+logger = logging.getLogger(__name__)
+
+# Alternating k-medoids rounds before giving up on convergence
+MAX_MEDOID_ITERATIONS = 20
+
+
+def k_medoids(distances: np.ndarray, k: int) -> np.ndarray:
+    """
+    Choose k medoids from a symmetric distance matrix
+
+    Starts from the most central sample and adds the sample farthest from the
+    chosen ones, then alternates between assigning samples to their nearest
+    medoid and moving each medoid to the member closest to its cluster.
+
+    Returns:
+        Sorted indices of the medoids
+    """
+    count = len(distances)
+    if k >= count:
+        return np.arange(count)
+
+    medoids = [int(distances.sum(axis=1).argmin())]
+    while len(medoids) < k:
+        medoids.append(int(distances[:, medoids].min(axis=1).argmax()))
+    medoids = np.array(medoids)
+
+    for _ in range(MAX_MEDOID_ITERATIONS):
+        assignment = distances[:, medoids].argmin(axis=1)
+        updated = medoids.copy()
+        for cluster in range(k):
+            members = np.flatnonzero(assignment == cluster)
+            if len(members):
+                updated[cluster] = members[distances[np.ix_(members, members)].sum(axis=1).argmin()]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+
+    return np.sort(medoids)
+
+
+def select_prototypes(face_images: Sequence[np.ndarray], face_labels: Sequence[int], per_person: int) -> np.ndarray:
+    """
+    Pick up to ``per_person`` representative samples of every label
+
+    Args:
+        face_images: Normalized training face ROIs
+        face_labels: Label of every face
+        per_person: Prototypes kept per label
+
+    Returns:
+        Sorted indices into face_images of the samples to keep
+    """
+    histograms = NumpyLBPHRecognizer().compute_histograms(face_images)
+    labels = np.asarray(face_labels)
+
+    keep = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        if len(members) <= per_person:
+            keep.append(members)
+            continue
+        distances = chi_square_matrix(histograms[members], histograms[members])
+        # Chi-square is symmetric up to rounding; make it exact for the medoid sums
+        distances = (distances + distances.T) / 2.0
+        keep.append(members[k_medoids(distances, per_person)])
+
+    return np.sort(np.concatenate(keep))
@@ -0,0 +1,154 @@
+"""
+Recognizer Backends
+Selectable face recognizer implementations behind one interface
+
+Every backend produces an object with the OpenCV ``FaceRecognizer`` surface
+the model relies on: ``train(images, labels)``, ``predict(roi) -> (label,
+distance)``, ``write(path)`` and ``read(path)``. Backends that can add
+samples without retraining also provide ``update(images, labels)``, and
+backends that can score many faces at once provide ``predict_batch(rois)``.
+
+Distances are on a different scale for every backend, so the "unknown
+person" threshold is looked up per backend (see ``distance_threshold``).
+"""
+from typing import Any, Callable, Dict, NamedTuple, Sequence, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+
+logger = logging.getLogger(__name__)
+
+
+class KNNLBPHRecognizer(NumpyLBPHRecognizer):
+    """
+    k-nearest-neighbour classifier over LBP grid histograms
+
+    Uses the same histograms as LBPH, but compares them with the Hellinger
+    distance (Euclidean distance between square-rooted histograms). Since
+    every square-rooted histogram has the same squared norm (the number of
+    grid cells), a whole batch is scored with one matrix product:
+
+        |sqrt(g) - sqrt(q)|^2 = 2 * cells - 2 * sqrt(g) . sqrt(q)
+
+    The predicted label is the majority of the k nearest gallery faces (ties
+    go to the nearest), and the distance is that of the closest face with
+    that label.
+    """
+
+    _SERVING_ARRAYS = ("_labels", "_histograms", "_roots")
+
+    def __init__(self, n_neighbors: int = 3, **lbp_params):
+        self.n_neighbors = n_neighbors
+        super().__init__(**lbp_params)
+
+    def predict_batch(self, face_rois: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if self.empty():
+            raise ValueError("KNNLBPHRecognizer is not trained")
+
+        similarity = np.sqrt(self.compute_histograms(face_rois)) @ self._roots.T
+        distances = np.sqrt(np.maximum(2.0 * (self.grid_x * self.grid_y - similarity), 0.0))
+
+        k = min(self.n_neighbors, len(self._labels))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+
+        labels = np.empty(len(distances), dtype=np.int32)
+        best_distances = np.empty(len(distances), dtype=np.float64)
+        for row, candidates in enumerate(nearest):
+            candidates = candidates[np.argsort(distances[row, candidates], kind="stable")]
+            votes = self._labels[candidates]
+            # Candidates are nearest first, so the first label with the top count wins ties
+            _, first_seen, counts = np.unique(votes, return_index=True, return_counts=True)
+            winner = min(zip(-counts, first_seen))[1]
+            labels[row] = votes[winner]
+            best_distances[row] = distances[row, candidates[winner]]
+        return labels, best_distances
+
+    def _set_gallery(self, histograms: np.ndarray, labels: np.ndarray):
+        self._histograms = np.ascontiguousarray(histograms, dtype=np.float32)
+        self._roots = np.sqrt(self._histograms)
+        self._labels = np.ascontiguousarray(labels, dtype=np.int32)
+        # Always a full scan, there is no index
+        self._codes = None
+
+    def _layout_matches(self) -> bool:
+        return True
+
+    def _gallery_histograms(self) -> np.ndarray:
+        return self._histograms
+
+
+class RecognizerBackend(NamedTuple):
+    """How to build one recognizer implementation"""
+    factory: Callable[[Any], Any]
+    # Whether update() can add samples, otherwise enrollment retrains fully
+    supports_update: bool
+    description: str
+
+
+def _numpy_lbph_factory(config) -> NumpyLBPHRecognizer:
+    if config is None:
+        return NumpyLBPHRecognizer()
+    return NumpyLBPHRecognizer(
+        index_min_size=config.GALLERY_INDEX_MIN_SIZE,
+        index_dim=config.GALLERY_INDEX_DIM,
+        index_shortlist=config.GALLERY_INDEX_SHORTLIST
+    )
+
+
+def _knn_factory(config) -> KNNLBPHRecognizer:
+    return KNNLBPHRecognizer(n_neighbors=config.KNN_NEIGHBORS if config is not None else 3)
+
+
+# RECOGNIZER_BACKEND values
+RECOGNIZER_BACKENDS: Dict[str, RecognizerBackend] = {
+    "lbph": RecognizerBackend(
+        lambda config: cv2.face.LBPHFaceRecognizer_create(), True,
+        "OpenCV LBPH, chi-square over LBP grid histograms"
+    ),
+    "numpy_lbph": RecognizerBackend(
+        _numpy_lbph_factory, True,
+        "NumPy LBPH, same predictions as OpenCV with batched scoring and a gallery index"
+    ),
+    "knn_lbph": RecognizerBackend(
+        _knn_factory, True,
+        "k-nearest-neighbour over LBP grid histograms, Hellinger distance"
+    ),
+    "eigen": RecognizerBackend(
+        lambda config: cv2.face.EigenFaceRecognizer_create(), False,
+        "OpenCV Eigenfaces (PCA)"
+    ),
+    "fisher": RecognizerBackend(
+        lambda config: cv2.face.FisherFaceRecognizer_create(), False,
+        "OpenCV Fisherfaces (LDA), needs at least two people"
+    ),
+}
+
+
+def get_backend(name: str) -> RecognizerBackend:
+    """Look up a RECOGNIZER_BACKEND value"""
+    try:
+        return RECOGNIZER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown recognizer backend '{name}', expected one of {sorted(RECOGNIZER_BACKENDS)}"
+        ) from None
+
+
+def create_recognizer(name: str, config=None):
+    """Create an untrained recognizer for a RECOGNIZER_BACKEND value"""
+    return get_backend(name).factory(config)
+
+
+def file_extension(recognizer) -> str:
+    """Extension of the file the recognizer's ``write`` produces"""
+    # OpenCV recognizers write YAML (and pick the format from the extension)
+    return getattr(recognizer, "FILE_EXTENSION", ".yml")
+
+
+def distance_threshold(config, name: str = None) -> float:
+    """Distance under which a prediction of the backend names a known person"""
+    name = name or config.RECOGNIZER_BACKEND
+    return config.RECOGNIZER_THRESHOLDS.get(name, config.CONFIDENCE_THRESHOLD)
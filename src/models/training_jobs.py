@@ -0,0 +1,375 @@
+"""
+Training Jobs
+Runs model (re)training in the background and tracks its progress
+
+Job state lives in a job store. With a shared store (a JSON file next to
+the model snapshot) every gunicorn worker sees every job: a status poll
+can reach any worker, and reloads sent to different workers coalesce
+into one queued job instead of training once per worker.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+import psutil
+
+from src.utils.file_lock import locked_file
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept around for the status endpoint
+MAX_JOB_HISTORY = 20
+# Seconds between checks whether a queued job may start
+JOB_POLL_INTERVAL = 0.5
+# Seconds between progress writes to the job store
+PROGRESS_SAVE_INTERVAL = 1.0
+
+
+def _current_owner() -> str:
+    """Identifies this process in job records (re-read after every fork)"""
+    process = psutil.Process()
+    return f"{socket.gethostname()}:{process.pid}:{process.create_time():.2f}"
+
+
+def _owner_alive(owner: str) -> bool:
+    """False only for a process on this host that no longer exists"""
+    host, _, process_id = owner.partition(":")
+    if host != socket.gethostname():
+        return True
+    pid, _, create_time = process_id.partition(":")
+    try:
+        # The start time tells a reused pid apart from the process that created the job
+        return f"{psutil.Process(int(pid)).create_time():.2f}" == create_time
+    except (psutil.NoSuchProcess, ValueError):
+        return False
+
+
+class JobStore:
+    """Job records of this process only, newest last"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @contextmanager
+    def transaction(self):
+        """Yield the records for reading and changing, with every other writer locked out"""
+        with self._lock:
+            yield self._records
+
+    def read(self) -> "OrderedDict[str, Dict[str, Any]]":
+        with self._lock:
+            return OrderedDict((job_id, dict(record)) for job_id, record in self._records.items())
+
+
+class SharedJobStore(JobStore):
+    """
+    Job records in a JSON file that every process using the same path shares
+
+    Changes hold an exclusive lock on a sidecar lock file (flock, or msvcrt
+    on Windows) and replace the JSON file atomically, so readers never need
+    the lock.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+
+    @contextmanager
+    def transaction(self):
+        with self._lock, locked_file(self.lock_path):
+            records = self.read()
+            yield records
+            tmp_path = self.path.with_name(f".tmp-{os.getpid()}-{self.path.name}")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(records.values()), f)
+            os.replace(tmp_path, self.path)
+
+    def read(self) -> "OrderedDict[str, Dict[str, Any]]":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return OrderedDict((record["job_id"], record) for record in json.load(f))
+        except FileNotFoundError:
+            return OrderedDict()
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Ignoring unreadable training job store {self.path}: {e}")
+            return OrderedDict()
+
+
+class TrainingJob:
+    """State of a single background training run"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, full: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.full = full
+        self.owner = _current_owner()
+        self.status = self.QUEUED
+        self.processed = 0
+        self.total = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        # Set on jobs run by another process; wait() then polls it
+        self._store: Optional[JobStore] = None
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], store: Optional[JobStore] = None) -> "TrainingJob":
+        """A job as recorded in a job store"""
+        job = cls(full=record.get("full", False))
+        job._apply(record)
+        job._store = store
+        return job
+
+    def _apply(self, record: Dict[str, Any]):
+        self.id = record["job_id"]
+        self.full = record.get("full", False)
+        self.owner = record.get("owner", "")
+        self.status = record["status"]
+        self.processed = record.get("processed_images", 0)
+        self.total = record.get("total_images", 0)
+        self.result = record.get("result")
+        self.error = record.get("error")
+        self.created_at = record.get("created_at")
+        self.started_at = record.get("started_at")
+        self.finished_at = record.get("finished_at")
+
+    def to_record(self) -> Dict[str, Any]:
+        """Serialize the job for the job store"""
+        return {**self.to_dict(), "full": self.full, "owner": self.owner}
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    @property
+    def progress(self) -> float:
+        """Fraction of dataset images processed (0.0 - 1.0)"""
+        if self.finished:
+            return 1.0
+        if self.total <= 0:
+            return 0.0
+        return self.processed / self.total
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds left, extrapolated from the images processed so far"""
+        if self.status != self.RUNNING or not self.processed or not self.started_at:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed / self.processed * (self.total - self.processed)
+
+    def update_progress(self, processed: int, total: int):
+        """Progress callback handed to the model"""
+        self.processed = processed
+        self.total = total
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished; returns False on timeout"""
+        if self._store is None:
+            return self._done.wait(timeout)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            record = self._store.read().get(self.id)
+            if record is not None:
+                self._apply(record)
+            if self.finished or record is None:
+                return self.finished
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(JOB_POLL_INTERVAL)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for API responses"""
+        eta = self.eta_seconds
+        return {
+            "job_id": self.id,
+            "mode": "full" if self.full else "incremental",
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "processed_images": self.processed,
+            "total_images": self.total,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class TrainingJobManager:
+    """
+    Runs training jobs one at a time on a background thread
+
+    At most one job runs and at most one waits behind it, across every
+    process sharing the job store. Reload requests that arrive while a job
+    is running all attach to the waiting job, so a burst of reloads costs
+    at most one extra training run. The waiting job is run by the process
+    that created it, once no job is running anywhere.
+    """
+
+    def __init__(self, face_model, dataset_path: str, store_file=None):
+        self.face_model = face_model
+        self.dataset_path = dataset_path
+        self._store = SharedJobStore(store_file) if store_file else JobStore()
+        # Jobs this process runs, with live progress
+        self._local: Dict[str, TrainingJob] = {}
+        self._last_progress_save = 0.0
+        # Set by the admin routes when profiling is enabled (src/utils/profiling.py)
+        self.profiler = None
+
+    def submit(self, full: bool = False) -> TrainingJob:
+        """
+        Request a reload of the dataset
+
+        Args:
+            full: Retrain from scratch instead of enrolling only new images
+
+        Returns:
+            The job that will pick up this request (possibly shared with
+            other callers, in this or another process)
+        """
+        with self._store.transaction() as records:
+            self._fail_orphans(records)
+            queued = next((record for record in records.values() if record["status"] == TrainingJob.QUEUED), None)
+            if queued is not None:
+                # Coalesce into the job that has not started yet
+                queued["full"] = queued["full"] or full
+                queued["mode"] = "full" if queued["full"] else "incremental"
+                job = self._local.get(queued["job_id"])
+                if job is None:
+                    return TrainingJob.from_record(queued, self._store)
+                job.full = queued["full"]
+                return job
+
+            job = TrainingJob(full=full)
+            records[job.id] = job.to_record()
+            self._trim(records)
+            self._local[job.id] = job
+
+        threading.Thread(target=self._run, args=(job,), name="training-job", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        """Look up a job by id"""
+        job = self._local.get(job_id)
+        if job is not None:
+            return job
+        record = self._store.read().get(job_id)
+        return TrainingJob.from_record(record, self._store) if record is not None else None
+
+    def list_jobs(self) -> List[TrainingJob]:
+        """All remembered jobs, newest first"""
+        return [
+            self._local.get(job_id) or TrainingJob.from_record(record, self._store)
+            for job_id, record in reversed(self._store.read().items())
+        ]
+
+    @property
+    def active_job(self) -> Optional[TrainingJob]:
+        """The job currently running, if any"""
+        return next((job for job in self.list_jobs() if job.status == TrainingJob.RUNNING), None)
+
+    def _trim(self, records):
+        while len(records) > MAX_JOB_HISTORY:
+            oldest_id, oldest = next(iter(records.items()))
+            if oldest["status"] not in (TrainingJob.COMPLETED, TrainingJob.FAILED):
+                break
+            del records[oldest_id]
+            self._local.pop(oldest_id, None)
+
+    def _fail_orphans(self, records):
+        """Fail unfinished jobs whose process has exited, so they stop blocking new ones"""
+        for record in records.values():
+            if record["status"] in (TrainingJob.QUEUED, TrainingJob.RUNNING) and not _owner_alive(record["owner"]):
+                record["status"] = TrainingJob.FAILED
+                record["error"] = "The worker running the job exited"
+                record["finished_at"] = time.time()
+
+    def _save(self, job: TrainingJob):
+        with self._store.transaction() as records:
+            records[job.id] = job.to_record()
+
+    def _run(self, job: TrainingJob):
+        """Worker thread: start the job once no job is running, then run it"""
+        while True:
+            with self._store.transaction() as records:
+                self._fail_orphans(records)
+                if not any(record["status"] == TrainingJob.RUNNING for record in records.values()):
+                    # Another process may have made the job a full retrain meanwhile
+                    job.full = records.get(job.id, {}).get("full", job.full)
+                    job.status = TrainingJob.RUNNING
+                    job.started_at = time.time()
+                    records[job.id] = job.to_record()
+                    break
+            time.sleep(JOB_POLL_INTERVAL)
+
+        self._execute(job)
+
+    def _update_progress(self, job: TrainingJob, processed: int, total: int):
+        job.update_progress(processed, total)
+        now = time.monotonic()
+        if now - self._last_progress_save >= PROGRESS_SAVE_INTERVAL:
+            self._last_progress_save = now
+            try:
+                self._save(job)
+            except OSError as e:
+                logger.error(f"Could not save progress of training job {job.id}: {e}")
+
+    def _execute(self, job: TrainingJob):
+        logger.info(f"Training job {job.id} started ({'full' if job.full else 'incremental'})")
+        progress_callback = lambda processed, total: self._update_progress(job, processed, total)
+
+        try:
+            with self.profiler.profile_training() if self.profiler is not None else nullcontext():
+                if job.full:
+                    result = self.face_model.train(self.dataset_path, progress_callback)
+                    result["mode"] = "full"
+                else:
+                    result = self.face_model.enroll_new_images(self.dataset_path, progress_callback)
+
+            if result.get("success"):
+                known_faces = list(self.face_model.known_face_names)
+                job.result = {
+                    "message": f"Reloaded {len(known_faces)} faces",
+                    "known_faces": known_faces,
+                    "mode": result.get("mode"),
+                    "added_files": result.get("added_files", []),
+                    "model_version": self.face_model.model_version
+                }
+                job.status = TrainingJob.COMPLETED
+            else:
+                job.error = result.get("error", "Training failed")
+                job.status = TrainingJob.FAILED
+
+        except Exception as e:
+            logger.error(f"Training job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = TrainingJob.FAILED
+
+        finally:
+            job.finished_at = time.time()
+            try:
+                self._save(job)
+            except OSError as e:
+                logger.error(f"Could not save training job {job.id}: {e}")
+            job._done.set()
+            logger.info(f"Training job {job.id} {job.status} in {job.finished_at - job.started_at:.1f}s")
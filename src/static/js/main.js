@@ -4,8 +4,14 @@
 let video = document.getElementById('video');
 let stream = null;
 let recognitionInterval = null;
+let recognitionSocket = null;
 let capturedImageData = null;
 let lastDetectedFaces = [];
+let frameCanvas = document.createElement('canvas');
+
+// Frame rate: streamed over a WebSocket when available, polled over HTTP otherwise
+const STREAM_INTERVAL_MS = 100;
+const POLL_INTERVAL_MS = 1000;
 
 /**
  * Camera Management Functions
@@ -27,7 +33,8 @@ async function startCamera() {
         updateStatus('Camera đã khởi động thành công', 'success');
         
         // Start face recognition
-        recognitionInterval = setInterval(recognizeFaces, 1000); // Check every second
+        openRecognitionStream();
+        startRecognitionLoop();
         
     } catch (err) {
         console.error('Error accessing camera:', err);
@@ -41,10 +48,8 @@ function stopCamera() {
         stream = null;
     }
     
-    if (recognitionInterval) {
-        clearInterval(recognitionInterval);
-        recognitionInterval = null;
-    }
+    stopRecognitionLoop();
+    closeRecognitionStream();
     
     document.getElementById('startBtn').style.display = 'inline-block';
     document.getElementById('stopBtn').classList.add('btn-hidden');
@@ -73,38 +78,81 @@ function stopCamera() {
 /**
  * Face Recognition Functions
  */
+function startRecognitionLoop() {
+    stopRecognitionLoop();
+    const interval = recognitionSocket ? STREAM_INTERVAL_MS : POLL_INTERVAL_MS;
+    recognitionInterval = setInterval(recognizeFaces, interval);
+}
+
+function stopRecognitionLoop() {
+    if (recognitionInterval) {
+        clearInterval(recognitionInterval);
+        recognitionInterval = null;
+    }
+}
+
+function openRecognitionStream() {
+    if (!('WebSocket' in window)) return;
+    
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${protocol}://${window.location.host}/ws/recognize`);
+    
+    socket.onopen = () => {
+        recognitionSocket = socket;
+        // Switch the running loop over to streaming
+        if (recognitionInterval) startRecognitionLoop();
+    };
+    
+    socket.onmessage = event => handleRecognitionResult(JSON.parse(event.data));
+    
+    socket.onclose = () => {
+        if (recognitionSocket !== socket) return;
+        // Fall back to HTTP polling
+        recognitionSocket = null;
+        if (recognitionInterval) startRecognitionLoop();
+    };
+}
+
+function closeRecognitionStream() {
+    if (recognitionSocket) {
+        const socket = recognitionSocket;
+        recognitionSocket = null;
+        socket.close();
+    }
+}
+
 async function recognizeFaces() {
     if (!video.videoWidth || !video.videoHeight) return;
     
+    // Don't queue frames behind a slow network; the server keeps only the newest anyway
+    if (recognitionSocket && recognitionSocket.bufferedAmount > 0) return;
+    
     try {
-        // Capture frame from video
-        const canvas = document.createElement('canvas');
-        canvas.width = video.videoWidth;
-        canvas.height = video.videoHeight;
-        const ctx = canvas.getContext('2d');
+        // Capture frame from video (the canvas is reused between frames)
+        frameCanvas.width = video.videoWidth;
+        frameCanvas.height = video.videoHeight;
+        const ctx = frameCanvas.getContext('2d');
         ctx.drawImage(video, 0, 0);
         
-        // Convert to base64
-        const imageData = canvas.toDataURL('image/jpeg', 0.8);
+        // Encode as JPEG bytes, no base64 round trip
+        const imageBlob = await new Promise(resolve => frameCanvas.toBlob(resolve, 'image/jpeg', 0.8));
+        
+        if (recognitionSocket) {
+            // Results arrive asynchronously in handleRecognitionResult
+            recognitionSocket.send(imageBlob);
+            return;
+        }
         
         // Send to server for recognition
         const response = await fetch('/recognize', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json',
+                'Content-Type': 'image/jpeg',
             },
-            body: JSON.stringify({ image: imageData })
+            body: imageBlob
         });
         
-        const result = await response.json();
-        
-        if (result.success) {
-            displayFaces(result.faces);
-            lastDetectedFaces = result.detected_people || [];
-            updateStatus(`Detected ${result.faces.length} face(s) - Click Capture to save`, 'success');
-        } else {
-            updateStatus('Recognition error: ' + result.error, 'error');
-        }
+        handleRecognitionResult(await response.json());
         
     } catch (err) {
         console.error('Recognition error:', err);
@@ -112,6 +160,19 @@ async function recognizeFaces() {
     }
 }
 
+function handleRecognitionResult(result) {
+    // Ignore results that arrive after recognition was paused or stopped
+    if (!recognitionInterval) return;
+    
+    if (result.success) {
+        displayFaces(result.faces);
+        lastDetectedFaces = result.detected_people || [];
+        updateStatus(`Detected ${result.faces.length} face(s) - Click Capture to save`, 'success');
+    } else {
+        updateStatus('Recognition error: ' + result.error, 'error');
+    }
+}
+
 function displayFaces(faces) {
     const overlaysContainer = document.getElementById('face-overlays');
     overlaysContainer.innerHTML = '';
@@ -156,10 +217,7 @@ function capturePhoto() {
     }
 
     // Stop recognition temporarily
-    if (recognitionInterval) {
-        clearInterval(recognitionInterval);
-        recognitionInterval = null;
-    }
+    stopRecognitionLoop();
 
     // Capture frame from video
     const canvas = document.getElementById('capturedCanvas');
@@ -298,7 +356,7 @@ function cancelCapture() {
     
     // Resume recognition
     if (stream && !recognitionInterval) {
-        recognitionInterval = setInterval(recognizeFaces, 1000);
+        startRecognitionLoop();
     }
     
     // Clear detected people info
@@ -362,9 +420,18 @@ async function reloadFaces() {
             method: 'POST'
         });
         
-        const result = await response.json();
+        let result = await response.json();
         
-        if (result.success) {
+        if (!result.success) {
+            updateStatus('Lỗi khi tải lại dữ liệu khuôn mặt', 'error');
+            return;
+        }
+        
+        // Training runs in the background; poll the job until it finishes
+        const job = await waitForTrainingJob(result.job.job_id);
+        
+        if (job.status === 'completed') {
+            result = job.result;
             updateStatus(result.message, 'success');
             
             // Update known faces list
@@ -392,7 +459,7 @@ async function reloadFaces() {
             loadTrainingInfo();
             
         } else {
-            updateStatus('Lỗi khi tải lại dữ liệu khuôn mặt', 'error');
+            updateStatus('Lỗi khi tải lại dữ liệu khuôn mặt: ' + (job.error || ''), 'error');
         }
         
     } catch (err) {
@@ -401,6 +468,29 @@ async function reloadFaces() {
     }
 }
 
+// Every worker reads jobs from the shared job store, so any worker can answer
+async function waitForTrainingJob(jobId) {
+    while (true) {
+        const response = await fetch(`/training_jobs/${jobId}`);
+        const result = await response.json();
+        
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        
+        const job = result.job;
+        if (job.status === 'completed' || job.status === 'failed') {
+            return job;
+        }
+        
+        const percent = Math.round(job.progress * 100);
+        const eta = job.eta_seconds !== null ? ` - còn khoảng ${Math.ceil(job.eta_seconds)}s` : '';
+        updateStatus(`Đang huấn luyện... ${percent}%${eta}`, 'info');
+        
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+}
+
 /**
  * Utility Functions
  */
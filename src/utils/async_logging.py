@@ -0,0 +1,160 @@
+"""
+Asynchronous Logging
+Queue-based log handling, so request and training threads never wait on log I/O
+
+The root logger gets a single handler that puts records on a bounded
+queue. A background thread takes them off, formats them and writes them
+to stderr and LogConfig.LOG_FILE. When the queue is full, records are
+dropped and counted rather than blocking the caller.
+
+Records are formatted on the background thread too. Log calls on hot
+paths should therefore pass their arguments separately
+(``logger.debug("Recognized %s", name)``) instead of pre-formatting them;
+arguments must not be mutated after the call.
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import LogConfig
+from src.utils.metrics import LOG_RECORDS_DROPPED
+
+_handler: Optional["DeferredQueueHandler"] = None
+_listener: Optional[QueueListener] = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues records as they are, leaving formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(record.levelname)
+
+
+def _start_listener(handlers) -> QueueListener:
+    global _listener
+    _listener = QueueListener(_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def _restart_after_fork():
+    # The listener thread does not survive a fork, and the queue lock may have been held
+    if _handler is not None:
+        _handler.queue = queue.Queue(maxsize=_handler.queue.maxsize)
+        _start_listener(_listener.handlers)
+
+
+def setup_logging(level: str = LogConfig.LOG_LEVEL, log_file=LogConfig.LOG_FILE,
+                  log_format: str = LogConfig.LOG_FORMAT, queue_size: int = LogConfig.LOG_QUEUE_SIZE):
+    """
+    Route the root logger through a queue to stderr and the log file
+
+    Calling it again does nothing. Pass ``log_file=None`` to only log to stderr.
+    """
+    global _handler
+    if _handler is not None:
+        return
+
+    formatter = logging.Formatter(log_format)
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        try:
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            # delay: the file is opened by the listener thread on the first record
+            handlers.append(logging.FileHandler(log_file, encoding='utf-8', delay=True))
+        except OSError as e:
+            print(f"Cannot write log file {log_file}: {e}", file=sys.stderr)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _handler = DeferredQueueHandler(queue.Queue(maxsize=queue_size))
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(level)
+    _start_listener(handlers)
+
+
+def stop_logging():
+    """Write out queued records and detach the queue handler from the root logger"""
+    global _handler, _listener
+    if _handler is None:
+        return
+    logging.getLogger().removeHandler(_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _handler = _listener = None
+
+
+atexit.register(stop_logging)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+class PeriodicSummary:
+    """
+    Counts events and logs their totals at most once per ``interval`` seconds
+
+    Replaces a log line per event on a hot path. The message is %-formatted
+    with the counts of ``fields`` and ``seconds``, the length of the window
+    they cover. A window is only logged by the first event after it ends,
+    so nothing is logged while there are no events.
+    """
+
+    def __init__(self, logger: logging.Logger, message: str, fields,
+                 interval: float = LogConfig.LOG_SUMMARY_INTERVAL, level: int = logging.INFO,
+                 clock=time.monotonic):
+        self.logger = logger
+        self.message = message
+        self.fields = tuple(fields)
+        self.interval = interval
+        self.level = level
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.fields, 0)
+        self._window_start = clock()
+
+    def add(self, **counts: int):
+        now = self._clock()
+        with self._lock:
+            for name, count in counts.items():
+                self._counts[name] += count
+            if now - self._window_start < self.interval:
+                return
+            summary = self._take(now)
+        self._log(summary)
+
+    def flush(self):
+        """Log the counts of the current window now, if it had any events"""
+        with self._lock:
+            summary = self._take(self._clock())
+        if any(summary[name] for name in self.fields):
+            self._log(summary)
+
+    def reset_after_fork(self):
+        """A forked process starts a new window with a new lock"""
+        self._lock = threading.Lock()
+        self._take(self._clock())
+
+    def _take(self, now: float) -> Dict[str, float]:
+        summary = {**self._counts, 'seconds': now - self._window_start}
+        self._counts = dict.fromkeys(self.fields, 0)
+        self._window_start = now
+        return summary
+
+    def _log(self, summary: Dict[str, float]):
+        self.logger.log(self.level, self.message, summary)
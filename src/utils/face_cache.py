@@ -0,0 +1,254 @@
+"""
+Face ROI Cache
+Content-addressed on-disk cache of extracted training face regions
+"""
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from config.settings import FaceRecognitionConfig
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAGIC = b"FROICACH"
+CACHE_FORMAT_VERSION = 1
+HEADER_SIZE = 64
+
+# Config values that change the extracted ROI for the same image bytes
+CACHE_CONFIG_KEYS = (
+    "FACE_CASCADE_FILE",
+    "MIN_FACE_SIZE",
+    "FACE_SIZE_NORMALIZED",
+    "DETECTION_MAX_SIDE",
+)
+
+
+def content_digest(data) -> bytes:
+    """Hash raw image bytes into a 32-byte cache key"""
+    return hashlib.blake2b(memoryview(data), digest_size=32).digest()
+
+
+class FaceROICache:
+    """
+    Maps image content hashes to their normalized grayscale face ROI
+
+    All entries live in a single append-only file of fixed-size records
+    (digest, detection box, found flag, ROI pixels) that is memory-mapped
+    for reading. Images without a detectable face are cached too, so they
+    are not re-scanned on every training run.
+    """
+
+    def __init__(self, cache_file, config: FaceRecognitionConfig = None):
+        self.config = config or FaceRecognitionConfig()
+        self.cache_file = Path(cache_file)
+        self.roi_shape = (self.config.FACE_SIZE_NORMALIZED[1], self.config.FACE_SIZE_NORMALIZED[0])
+        self.record_dtype = np.dtype([
+            ("digest", "u1", (32,)),
+            ("box", "<i4", (4,)),
+            ("found", "u1"),
+            ("roi", "u1", self.roi_shape),
+        ])
+        self.config_key = self._compute_config_key()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._records = None
+        self._index: Dict[bytes, int] = {}
+        self._pending: Dict[bytes, np.ndarray] = {}
+        self._open()
+
+    def _compute_config_key(self) -> bytes:
+        """Hash the config values the cached ROIs depend on"""
+        values = {key: getattr(self.config, key, None) for key in CACHE_CONFIG_KEYS}
+        payload = json.dumps(values, sort_keys=True, default=list).encode("utf-8")
+        return hashlib.sha256(payload).digest()
+
+    def _header(self) -> bytes:
+        """Build the fixed-size file header"""
+        header = (
+            CACHE_MAGIC
+            + np.array(
+                [CACHE_FORMAT_VERSION, self.roi_shape[0], self.roi_shape[1]], dtype="<u4"
+            ).tobytes()
+            + self.config_key
+        )
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def _open(self):
+        """Map the cache file and rebuild the in-memory digest index"""
+        self._records = None
+        self._index = {}
+
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, "rb") as f:
+                header = f.read(HEADER_SIZE)
+
+            if header != self._header():
+                logger.info("Face ROI cache was built with different settings, resetting it")
+                self.clear()
+                return
+
+            count = (self.cache_file.stat().st_size - HEADER_SIZE) // self.record_dtype.itemsize
+            if count <= 0:
+                return
+
+            self._records = np.memmap(
+                self.cache_file, dtype=self.record_dtype, mode="r",
+                offset=HEADER_SIZE, shape=(count,)
+            )
+            digests = np.ascontiguousarray(self._records["digest"]).tobytes()
+            for i in range(count):
+                self._index[digests[i * 32:(i + 1) * 32]] = i
+
+        except Exception as e:
+            logger.error(f"Error opening face ROI cache: {e}")
+            self._records = None
+            self._index = {}
+
+    def get(self, digest: bytes) -> Optional[Tuple[bool, Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]]:
+        """
+        Look up a cached extraction result
+
+        Args:
+            digest: Content digest of the image bytes
+
+        Returns:
+            None on a cache miss, otherwise (found, face_roi, box) where
+            face_roi and box are None if no face was found in the image
+        """
+        index = self._index.get(digest)
+        if index is not None:
+            self.hits += 1
+            return self._unpack(self._records[index])
+
+        pending = self._pending.get(digest)
+        if pending is not None:
+            self.hits += 1
+            return self._unpack(pending)
+
+        self.misses += 1
+        return None
+
+    def _unpack(self, record):
+        """Convert a stored record into (found, face_roi, box)"""
+        if not record["found"]:
+            return False, None, None
+        box = tuple(int(v) for v in record["box"])
+        return True, np.array(record["roi"]), box
+
+    def put(self, digest: bytes, face_roi: Optional[np.ndarray],
+            box: Optional[Tuple[int, int, int, int]] = None):
+        """
+        Queue an extraction result for the next flush
+
+        Args:
+            digest: Content digest of the image bytes
+            face_roi: Normalized face ROI, or None if no face was found
+            box: Detection box (x, y, w, h) in the source image
+        """
+        if digest in self._index or digest in self._pending:
+            return
+
+        record = np.zeros((), dtype=self.record_dtype)
+        record["digest"] = np.frombuffer(digest, dtype=np.uint8)
+        if face_roi is not None and face_roi.shape == self.roi_shape:
+            record["found"] = 1
+            record["roi"] = face_roi
+            if box is not None:
+                record["box"] = box
+        self._pending[digest] = record
+
+    def flush(self):
+        """Append queued entries to the cache file and remap it"""
+        if not self._pending:
+            return
+
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            if not self.cache_file.exists() or self.cache_file.stat().st_size < HEADER_SIZE:
+                with open(self.cache_file, "wb") as f:
+                    f.write(self._header())
+
+            # One write call per flush keeps concurrent appenders from interleaving records
+            with open(self.cache_file, "ab") as f:
+                f.write(np.array(list(self._pending.values()), dtype=self.record_dtype).tobytes())
+
+            self._pending = {}
+            self._open()
+
+        except Exception as e:
+            logger.error(f"Error writing face ROI cache: {e}")
+
+    def compact(self, live_digests: Iterable[bytes]):
+        """
+        Rewrite the cache keeping only entries for the given digests
+
+        Args:
+            live_digests: Digests of images that are still in the dataset
+        """
+        self.flush()
+        if self._records is None:
+            return
+
+        keep = [self._index[d] for d in set(live_digests) if d in self._index]
+        if len(keep) == len(self._records):
+            return
+
+        try:
+            kept = np.array(self._records[sorted(keep)])
+            tmp_file = self.cache_file.with_name(f".tmp-{os.getpid()}-{self.cache_file.name}")
+            with open(tmp_file, "wb") as f:
+                f.write(self._header())
+                f.write(kept.tobytes())
+            self._records = None
+            os.replace(tmp_file, self.cache_file)
+            logger.info(f"Compacted face ROI cache to {len(kept)} entries")
+        except Exception as e:
+            logger.error(f"Error compacting face ROI cache: {e}")
+        finally:
+            self._open()
+
+    def clear(self):
+        """Remove all cached entries"""
+        self._records = None
+        self._index = {}
+        self._pending = {}
+        try:
+            if self.cache_file.exists():
+                self.cache_file.unlink()
+        except OSError as e:
+            logger.error(f"Error clearing face ROI cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._pending)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes of the mapped records, the digest index and the entries waiting for a flush"""
+        records = self._records
+        index_entry = sys.getsizeof(bytes(32)) + sys.getsizeof(len(self._index))
+        return {
+            "mapped_bytes": records.nbytes if records is not None else 0,
+            "index_bytes": sys.getsizeof(self._index) + len(self._index) * index_entry,
+            "pending_bytes": len(self._pending) * self.record_dtype.itemsize,
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss counters and size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+            "file_bytes": self.cache_file.stat().st_size if self.cache_file.exists() else 0,
+        }
@@ -0,0 +1,172 @@
+"""
+Face Tracker
+Associates face detections across consecutive frames of one camera stream
+so identities only have to be predicted when something changed
+"""
+import itertools
+from collections import Counter, deque
+from typing import List, Optional, Tuple
+import logging
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from config.settings import FaceRecognitionConfig
+
+logger = logging.getLogger(__name__)
+
+# Face location as (top, right, bottom, left), the format recognize_faces returns
+Location = Tuple[int, int, int, int]
+
+
+def box_iou(a: Location, b: Location) -> float:
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    inter_h = min(a[2], b[2]) - max(a[0], b[0])
+    inter_w = min(a[1], b[1]) - max(a[3], b[3])
+    if inter_h <= 0 or inter_w <= 0:
+        return 0.0
+    inter = inter_h * inter_w
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+
+def center_shift(a: Location, b: Location) -> float:
+    """Distance between box centers, relative to the size of box a"""
+    ay, ax = (a[0] + a[2]) / 2.0, (a[1] + a[3]) / 2.0
+    by, bx = (b[0] + b[2]) / 2.0, (b[1] + b[3]) / 2.0
+    size = max(a[2] - a[0], a[1] - a[3], 1)
+    return ((ay - by) ** 2 + (ax - bx) ** 2) ** 0.5 / size
+
+
+class Track:
+    """A face followed across frames"""
+
+    def __init__(self, track_id: int, location: Location, vote_window: int):
+        self.id = track_id
+        self.location = location
+        self.predicted_location: Optional[Location] = None
+        self.predicted_version: Optional[int] = None
+        self.frames_since_prediction = 0
+        self.misses = 0
+        self.votes = deque(maxlen=vote_window)
+
+    def forget_identity(self):
+        """Drop the votes, which a retrained model may name or label differently"""
+        self.votes.clear()
+        self.predicted_location = None
+        self.predicted_version = None
+
+    @property
+    def name(self) -> str:
+        """Identity smoothed by a majority vote over recent predictions (ties go to the newest)"""
+        if not self.votes:
+            return "Unknown"
+        counts = Counter(self.votes)
+        best = max(counts.values())
+        return next(name for name in reversed(self.votes) if counts[name] == best)
+
+
+class FaceTracker:
+    """
+    IoU / center-distance tracker for one camera stream
+
+    Each frame's detections are matched greedily to existing tracks. A track
+    asks for a new identity prediction when it is new, every
+    TRACKER_REPREDICT_INTERVAL frames, when its box moved or resized a lot
+    since the last prediction, or when the model was retrained. A retrain
+    also drops the track's votes, so the identity comes from the new model
+    alone.
+    """
+
+    def __init__(self, config: FaceRecognitionConfig = None):
+        self.config = config or FaceRecognitionConfig()
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+        self.frames = 0
+        self.predictions = 0
+
+    def update(self, locations: List[Location], model_version: int = 0) -> List[Tuple[Track, bool]]:
+        """
+        Match this frame's detections to tracks
+
+        Args:
+            locations: Detected face boxes of the frame
+            model_version: Version of the model that will predict; tracks
+                predicted by another version are re-predicted
+
+        Returns:
+            (track, needs_prediction) for each location, in the same order
+        """
+        self.frames += 1
+        matches = self._match(locations)
+
+        results = []
+        matched_tracks = set()
+        for index, location in enumerate(locations):
+            track = matches.get(index)
+            if track is None:
+                track = Track(next(self._ids), location, self.config.TRACKER_VOTE_WINDOW)
+                self.tracks.append(track)
+            else:
+                track.location = location
+                track.frames_since_prediction += 1
+                if track.predicted_version not in (None, model_version):
+                    track.forget_identity()
+            track.misses = 0
+            matched_tracks.add(track.id)
+            results.append((track, self._needs_prediction(track, model_version)))
+
+        # Forget tracks that have not been seen for a while
+        for track in self.tracks:
+            if track.id not in matched_tracks:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.config.TRACKER_MAX_MISSES]
+
+        return results
+
+    def record_prediction(self, track: Track, name: str, model_version: int = 0):
+        """Store a fresh identity prediction for a track"""
+        track.votes.append(name)
+        track.predicted_location = track.location
+        track.predicted_version = model_version
+        track.frames_since_prediction = 0
+        self.predictions += 1
+
+    def get_stats(self) -> dict:
+        """Tracker counters for monitoring"""
+        return {
+            "active_tracks": len(self.tracks),
+            "frames": self.frames,
+            "predictions": self.predictions,
+            "predictions_per_frame": round(self.predictions / self.frames, 3) if self.frames else 0.0
+        }
+
+    def _match(self, locations: List[Location]) -> dict:
+        """Greedy best-first assignment of detections to tracks"""
+        candidates = []
+        for track in self.tracks:
+            for index, location in enumerate(locations):
+                iou = box_iou(track.location, location)
+                shift = center_shift(track.location, location)
+                if iou >= self.config.TRACKER_IOU_THRESHOLD or shift <= self.config.TRACKER_MAX_CENTER_SHIFT:
+                    candidates.append((-iou, shift, index, track))
+
+        matches = {}
+        used_tracks = set()
+        for _, _, index, track in sorted(candidates, key=lambda c: (c[0], c[1])):
+            if index in matches or track.id in used_tracks:
+                continue
+            matches[index] = track
+            used_tracks.add(track.id)
+        return matches
+
+    def _needs_prediction(self, track: Track, model_version: int) -> bool:
+        if track.predicted_location is None or track.predicted_version != model_version:
+            return True
+        if track.frames_since_prediction >= self.config.TRACKER_REPREDICT_INTERVAL:
+            return True
+        # The face moved or changed size a lot since it was last identified
+        return box_iou(track.predicted_location, track.location) < self.config.TRACKER_REPREDICT_IOU
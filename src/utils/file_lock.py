@@ -0,0 +1,55 @@
+"""
+File Lock
+Exclusive lock on a file shared by every process on the host
+
+Uses flock on POSIX and a one-byte msvcrt lock on Windows. Every call
+opens the lock file anew, so threads of one process exclude each other
+too, and the lock is not reentrant.
+"""
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Seconds between attempts while another process holds a Windows lock
+WINDOWS_RETRY_INTERVAL = 0.05
+
+
+@contextmanager
+def locked_file(path):
+    """
+    Hold an exclusive lock on path (created if missing) for the duration of the block
+
+    Args:
+        path: Lock file, usually a sidecar of the file it protects
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return
+
+        lock_file.seek(0)
+        while True:
+            try:
+                # LK_NBLCK: LK_LOCK would give up after ten one-second attempts
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                time.sleep(WINDOWS_RETRY_INTERVAL)
+        try:
+            yield
+        finally:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -6,7 +6,7 @@ import cv2
 import numpy as np
 import os
 import sys
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import logging
 from pathlib import Path
 
@@ -24,6 +24,7 @@ class ImageProcessor:
     
     def __init__(self, config: FaceRecognitionConfig = None):
         self.config = config or FaceRecognitionConfig()
+        self._warned_min_sizes = set()
         
     def load_image(self, image_path: str) -> Optional[np.ndarray]:
         """
@@ -46,6 +47,38 @@ class ImageProcessor:
             logger.error(f"Error loading image {image_path}: {e}")
             return None
     
+    def read_image_bytes(self, image_path: str) -> Optional[np.ndarray]:
+        """
+        Read raw (still encoded) image bytes with Unicode path support
+        
+        Args:
+            image_path: Path to image file
+            
+        Returns:
+            Encoded image buffer or None if failed
+        """
+        try:
+            return np.fromfile(image_path, dtype=np.uint8)
+        except Exception as e:
+            logger.error(f"Error reading image {image_path}: {e}")
+            return None
+    
+    def decode_image(self, image_bytes: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Decode an encoded image buffer
+        
+        Args:
+            image_bytes: Encoded image buffer (uint8)
+            
+        Returns:
+            Decoded BGR image or None if the buffer is not a valid image
+        """
+        try:
+            return cv2.imdecode(image_bytes, cv2.IMREAD_COLOR)
+        except Exception as e:
+            logger.error(f"Error decoding image: {e}")
+            return None
+    
     def is_image_file(self, filename: str) -> bool:
         """
         Check if file is a supported image format
@@ -85,6 +118,92 @@ class ImageProcessor:
         
         return face_roi
     
+    def detect_faces(self, face_cascade, gray_image: np.ndarray,
+                     min_size: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+        """
+        Run Haar face detection, downscaled according to DETECTION_MAX_SIDE
+        
+        Detection cost grows with pixel count, so large images are shrunk until
+        their longest side is at most DETECTION_MAX_SIDE; the boxes are mapped
+        back so callers can cut ROIs from the full-resolution image. Images are
+        never shrunk so far that ``min_size`` falls below the cascade's
+        detection window, since faces that small cannot be found.
+        
+        Args:
+            face_cascade: Haar cascade classifier used for detection
+            gray_image: Full-resolution grayscale image
+            min_size: Minimum face size in full-resolution pixels
+            
+        Returns:
+            Face boxes (x, y, w, h) in full-resolution coordinates
+        """
+        h, w = gray_image.shape[:2]
+        max_side = self.config.DETECTION_MAX_SIDE
+        scale = max_side / max(h, w) if max_side and max(h, w) > max_side else 1.0
+        
+        if scale < 1.0:
+            window = face_cascade.getOriginalWindowSize()
+            min_scale = max(window[0] / min_size[0], window[1] / min_size[1])
+            if scale < min_scale:
+                self._warn_min_size(min_size, window)
+                scale = min(1.0, min_scale)
+        
+        if scale == 1.0:
+            faces = face_cascade.detectMultiScale(gray_image, 1.1, 4, minSize=min_size)
+            return [tuple(int(v) for v in face) for face in faces]
+        
+        small = cv2.resize(
+            gray_image, (max(1, round(w * scale)), max(1, round(h * scale))),
+            interpolation=cv2.INTER_AREA
+        )
+        small_min_size = tuple(max(1, round(side * scale)) for side in min_size)
+        faces = face_cascade.detectMultiScale(small, 1.1, 4, minSize=small_min_size)
+        
+        boxes = []
+        for (x, y, bw, bh) in faces:
+            x1, y1 = round(x / scale), round(y / scale)
+            x2, y2 = min(w, round((x + bw) / scale)), min(h, round((y + bh) / scale))
+            boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return boxes
+    
+    def _warn_min_size(self, min_size: Tuple[int, int], window: Tuple[int, int]):
+        """Warn once per minimum face size that DETECTION_MAX_SIDE was raised for it"""
+        if tuple(min_size) in self._warned_min_sizes:
+            return
+        self._warned_min_sizes.add(tuple(min_size))
+        logger.warning(
+            f"DETECTION_MAX_SIDE={self.config.DETECTION_MAX_SIDE} would shrink {min_size[0]}x{min_size[1]} "
+            f"faces below the {window[0]}x{window[1]} detection window; detecting at a larger size instead"
+        )
+    
+    def extract_largest_face(self, face_cascade, image: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]:
+        """
+        Detect the largest face in an image and extract its normalized ROI
+        
+        Args:
+            face_cascade: Haar cascade classifier used for detection
+            image: Decoded BGR image
+            
+        Returns:
+            Tuple of (face_roi, (x, y, w, h)) or (None, None) if no face found
+        """
+        # Convert to grayscale
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        # Detect faces
+        faces = self.detect_faces(face_cascade, gray, self.config.MIN_FACE_SIZE)
+        
+        if len(faces) == 0:
+            return None, None
+        
+        # Get the largest face (main subject)
+        x, y, w, h = max(faces, key=lambda rect: rect[2] * rect[3])
+        
+        # Extract face region with padding
+        face_roi = self.extract_face_roi(gray, x, y, w, h)
+        
+        return face_roi, (x, y, w, h)
+    
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
         Preprocess image for better face detection
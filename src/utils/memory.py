@@ -0,0 +1,224 @@
+"""
+Memory Accounting
+Process memory and its breakdown by component: gallery, caches, request buffers
+
+Component sizes are computed from the objects themselves (array nbytes,
+container sizes), so they say what a component holds, not what the
+allocator rounded it to. Memory-mapped arrays are reported separately:
+their pages live in the OS page cache and are shared between processes.
+
+Python allocations are only attributed to source lines when tracemalloc
+is running (``PYTHONTRACEMALLOC=1``), which slows allocation down.
+"""
+import mmap
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+import logging
+
+import numpy as np
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+TOP_ALLOCATORS = 10
+
+
+def is_memory_mapped(array: np.ndarray) -> bool:
+    """Whether the array's data lives in a memory mapping"""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+def peak_rss(process: Optional[psutil.Process] = None) -> int:
+    """Highest RSS of this process since it started, in bytes"""
+    process = process or psutil.Process()
+    info = process.memory_info()
+    if hasattr(info, 'peak_wset'):
+        # Windows: the peak working set
+        return info.peak_wset
+    if resource is None:
+        return info.rss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux and the BSDs
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit, info.rss)
+
+
+def process_memory(detailed: bool = False) -> Dict[str, int]:
+    """
+    Memory of this process in bytes
+
+    Args:
+        detailed: Also read USS and PSS (walks /proc/self/smaps, a few ms)
+    """
+    process = psutil.Process()
+    info = process.memory_info()
+    memory = {
+        'rss_bytes': info.rss,
+        'vms_bytes': info.vms,
+        'peak_rss_bytes': peak_rss(process),
+    }
+    if detailed:
+        try:
+            full = process.memory_full_info()
+            memory['uss_bytes'] = full.uss
+            if hasattr(full, 'pss'):
+                memory['pss_bytes'] = full.pss
+        except (psutil.AccessDenied, AttributeError):
+            pass
+    return memory
+
+
+def gallery_memory(recognizer) -> Dict[str, Any]:
+    """Bytes a recognizer holds for its gallery, split into private and memory-mapped"""
+    private = mapped = 0
+    serving_arrays = getattr(recognizer, '_SERVING_ARRAYS', None)
+    if serving_arrays is not None:
+        # NumPy backends: the arrays predictions read
+        for name in serving_arrays:
+            array = getattr(recognizer, name, None)
+            if isinstance(array, np.ndarray):
+                if is_memory_mapped(array):
+                    mapped += array.nbytes
+                else:
+                    private += array.nbytes
+    elif hasattr(recognizer, 'getGridX'):
+        # OpenCV LBPH keeps one float32 grid histogram per face
+        bins = recognizer.getGridX() * recognizer.getGridY() * 2 ** recognizer.getNeighbors()
+        private = len(recognizer.getLabels()) * bins * np.dtype(np.float32).itemsize
+    elif hasattr(recognizer, 'getEigenVectors'):
+        # OpenCV Eigen/Fisherfaces: the basis, the mean and one projection per face
+        arrays = [recognizer.getEigenVectors(), recognizer.getMean(), *recognizer.getProjections()]
+        private = sum(np.asarray(array).nbytes for array in arrays)
+    return {'private_bytes': int(private), 'mapped_bytes': int(mapped)}
+
+
+def top_allocators(limit: int = TOP_ALLOCATORS) -> Optional[List[Dict[str, Any]]]:
+    """Source lines holding the most traced memory, or None when tracemalloc is off"""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ])
+    return [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_bytes': stat.size,
+            'blocks': stat.count
+        }
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+class RequestBuffers:
+    """Bytes of request bodies currently being handled, and the most seen at once"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inflight_bytes = 0
+        self.peak_bytes = 0
+        self.largest_bytes = 0
+
+    def acquire(self, size: int):
+        with self._lock:
+            self.inflight_bytes += size
+            self.peak_bytes = max(self.peak_bytes, self.inflight_bytes)
+            self.largest_bytes = max(self.largest_bytes, size)
+
+    def release(self, size: int):
+        with self._lock:
+            self.inflight_bytes -= size
+
+    def reset_after_fork(self):
+        """A forked worker starts with a new lock and no requests in flight"""
+        self._lock = threading.Lock()
+        self.inflight_bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'inflight_bytes': self.inflight_bytes,
+            'peak_bytes': self.peak_bytes,
+            'largest_bytes': self.largest_bytes
+        }
+
+
+REQUEST_BUFFERS = RequestBuffers()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=REQUEST_BUFFERS.reset_after_fork)
+
+
+class PeakMemoryMonitor:
+    """
+    Highest RSS of the process while the monitor is active
+
+    RSS is sampled on a background thread every ``interval`` seconds, so a
+    spike shorter than that can be missed. With tracemalloc running, its
+    peak is reset on entry and reported as well.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.rss_before = 0
+        self.peak_rss = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.rss_before = self.peak_rss = self._process.memory_info().rss
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._sample()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def _sample(self) -> int:
+        rss = self._process.memory_info().rss
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def report(self) -> Dict[str, Any]:
+        """Memory so far: RSS before, now and at its peak, and the tracemalloc peak"""
+        rss = self._sample()
+        report = {
+            'rss_before_bytes': self.rss_before,
+            'rss_bytes': rss,
+            'peak_rss_bytes': self.peak_rss,
+            'peak_increase_bytes': self.peak_rss - self.rss_before,
+            'tracemalloc_peak_bytes': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        }
+        return report
+
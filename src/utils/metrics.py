@@ -0,0 +1,249 @@
+"""
+Metrics
+Counters, gauges and latency histograms exposed in the Prometheus text format
+
+Recording a sample is a lock, a dictionary lookup and (for histograms) a
+bisect, so it is cheap enough for every request and every recognition
+stage. Values are per process: with several gunicorn workers each one
+reports its own.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond decodes to training runs
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TRAINING_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class _Metric:
+    """Name, help text, label names and the per-label-values samples of one metric"""
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labelvalues: Tuple) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(value) for value in labelvalues)
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        """(name suffix, formatted labels, value) of every sample"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.type_name}']
+        with self._lock:
+            samples = list(self._samples())
+        lines.extend(f'{self.name}{suffix}{labels} {_format_value(value)}' for suffix, labels, value in samples)
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = 'counter'
+
+    def inc(self, *labelvalues, amount: float = 1):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0)
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield '_total', _format_labels(self.labelnames, key), value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, *labelvalues):
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, *labelvalues) -> Optional[float]:
+        return self._values.get(self._key(labelvalues))
+
+    def _samples(self):
+        for key, value in sorted(self._values.items()):
+            yield '', _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    """Counts of observations per cumulative bucket, with their sum and count"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues):
+        key = self._key(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (not cumulative) counts with the +Inf bucket last, then the sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the duration of the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def get_count(self, *labelvalues) -> int:
+        state = self._values.get(self._key(labelvalues))
+        return sum(state[:-1]) if state is not None else 0
+
+    def _samples(self):
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                yield '_bucket', _format_labels(self.labelnames + ('le',), key + (_format_value(bound),)), cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield '_sum', labels, state[-1]
+            yield '_count', labels, cumulative
+
+
+class MetricsRegistry:
+    """The metrics of this process, rendered together for a scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """Drop every recorded sample (tests)"""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def reset_locks(self):
+        """Replace the metric locks, which another thread may have held when the process forked"""
+        for metric in self._metrics.values():
+            metric._reset_lock()
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    'face_recognition_stage_duration_seconds',
+    'Time spent in each stage of handling a recognition request',
+    ['stage']
+))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'face_recognition_request_duration_seconds',
+    'HTTP request latency by endpoint',
+    ['endpoint', 'method']
+))
+REQUESTS = REGISTRY.register(Counter(
+    'face_recognition_requests',
+    'HTTP requests by endpoint and status code',
+    ['endpoint', 'method', 'status']
+))
+FACES = REGISTRY.register(Counter(
+    'face_recognition_faces',
+    'Faces returned by recognition, by result (recognized or unknown)',
+    ['result']
+))
+TRAINING_LATENCY = REGISTRY.register(Histogram(
+    'face_recognition_training_duration_seconds',
+    'Duration of successful training runs, by mode (full or incremental)',
+    ['mode'],
+    buckets=TRAINING_BUCKETS
+))
+GALLERY_FACES = REGISTRY.register(Gauge(
+    'face_recognition_gallery_faces',
+    'Face samples in the gallery of the published model'
+))
+KNOWN_PEOPLE = REGISTRY.register(Gauge(
+    'face_recognition_known_people',
+    'People the published model can recognize'
+))
+MODEL_VERSION = REGISTRY.register(Gauge(
+    'face_recognition_model_version',
+    'Version of the published model, incremented on every training run'
+))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    'face_recognition_log_records_dropped',
+    'Log records dropped because the log queue was full, by level',
+    ['level']
+))
+PROCESS_MEMORY = REGISTRY.register(Gauge(
+    'process_resident_memory_bytes',
+    'Resident set size of this process'
+))
+MEMORY = REGISTRY.register(Gauge(
+    'face_recognition_memory_bytes',
+    'Bytes held by the gallery, caches and in-flight request bodies, by component',
+    ['component']
+))
+TRAINING_MEMORY = REGISTRY.register(Gauge(
+    'face_recognition_training_memory_bytes',
+    'Memory used by the last full training run in this process, by measure',
+    ['measure']
+))
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=REGISTRY.reset_locks)
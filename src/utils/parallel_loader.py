@@ -0,0 +1,212 @@
+"""
+Parallel Face Extraction
+Fans out image decoding and face detection for training across worker processes
+
+Workers are started from a forkserver where available, so they never inherit
+the threads of the server process. Unlike multiprocessing's default, they do
+not re-import the parent's ``__main__`` script either: workers only run this
+module, and a script without an ``if __name__ == '__main__'`` guard would
+otherwise be run again in every worker (building the app and training).
+
+A forked process (a gunicorn worker) starts its own forkserver: the one it
+inherited is its parent's child, which it cannot wait on. If the pool cannot
+be started or breaks anyway, the remaining images are extracted serially.
+"""
+import io
+import threading
+import multiprocessing
+import os
+import sys
+import cv2
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from config.settings import FaceRecognitionConfig
+from src.utils.image_processor import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+# Per-process state, created once by the pool initializer
+_worker_state = {}
+
+# Starting the pool costs more than it saves on fewer images than this per worker
+MIN_IMAGES_PER_WORKER = 2
+
+if "forkserver" in multiprocessing.get_all_start_methods():
+    from multiprocessing import forkserver, popen_forkserver, reduction, spawn, util
+    from multiprocessing.context import ForkServerContext, ForkServerProcess, set_spawning_popen
+
+    class _WorkerPopen(popen_forkserver.Popen):
+        """Forkserver launch that leaves the parent's __main__ out of the worker's preparation"""
+
+        def _launch(self, process_obj):
+            # As popen_forkserver.Popen._launch, minus the main module entries
+            prep_data = spawn.get_preparation_data(process_obj._name)
+            prep_data.pop("init_main_from_path", None)
+            prep_data.pop("init_main_from_name", None)
+            buf = io.BytesIO()
+            set_spawning_popen(self)
+            try:
+                reduction.dump(prep_data, buf)
+                reduction.dump(process_obj, buf)
+            finally:
+                set_spawning_popen(None)
+
+            self.sentinel, w = forkserver.connect_to_new_process(self._fds)
+            _parent_w = os.dup(w)
+            self.finalizer = util.Finalize(self, util.close_fds, (_parent_w, self.sentinel))
+            with open(w, 'wb', closefd=True) as f:
+                f.write(buf.getbuffer())
+            self.pid = forkserver.read_signed(self.sentinel)
+
+    class _WorkerProcess(ForkServerProcess):
+        @staticmethod
+        def _Popen(process_obj):
+            return _WorkerPopen(process_obj)
+
+    class _WorkerContext(ForkServerContext):
+        Process = _WorkerProcess
+
+    _worker_context = _WorkerContext()
+
+    def _forget_forkserver_after_fork():
+        """Make this process start its own forkserver the next time a pool is created"""
+        server = forkserver._forkserver
+        if server._forkserver_alive_fd is not None:
+            try:
+                os.close(server._forkserver_alive_fd)
+            except OSError:
+                pass
+        server._forkserver_address = None
+        server._forkserver_alive_fd = None
+        server._forkserver_pid = None
+        if hasattr(server, '_forkserver_authkey'):
+            server._forkserver_authkey = None
+        server._lock = threading.Lock()
+
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_forget_forkserver_after_fork)
+else:
+    # Windows: spawn re-imports __main__, so entry scripts must guard app creation
+    _worker_context = multiprocessing.get_context("spawn")
+
+ExtractResult = Tuple[Optional[np.ndarray], Optional[Tuple], Optional[str]]
+
+
+def _init_worker(config: FaceRecognitionConfig):
+    """Create the cascade and image processor in a worker process"""
+    # Parallelism comes from the pool, so keep OpenCV single-threaded per worker
+    cv2.setNumThreads(1)
+    _worker_state["face_cascade"] = cv2.CascadeClassifier(
+        cv2.data.haarcascades + config.FACE_CASCADE_FILE
+    )
+    _worker_state["image_processor"] = ImageProcessor(config=config)
+
+
+def _extract_chunk(chunk: List[Tuple[int, np.ndarray]]) -> List[Tuple[int, Optional[np.ndarray], Optional[Tuple], Optional[str]]]:
+    """Decode and extract the largest face for a chunk of (key, image_bytes) items"""
+    image_processor = _worker_state["image_processor"]
+    face_cascade = _worker_state["face_cascade"]
+
+    results = []
+    for key, image_bytes in chunk:
+        try:
+            image = image_processor.decode_image(image_bytes)
+            if image is None:
+                results.append((key, None, None, None))
+                continue
+            face_roi, box = image_processor.extract_largest_face(face_cascade, image)
+            results.append((key, face_roi, box, None))
+        except Exception as e:
+            results.append((key, None, None, str(e)))
+    return results
+
+
+def resolve_worker_count(workers: int) -> int:
+    """Translate the TRAINING_WORKERS setting (0 = all cores) into a process count"""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class ParallelFaceExtractor:
+    """
+    Runs training face extraction on a process pool
+
+    Items are grouped into chunks to amortize inter-process overhead, and
+    only a bounded number of chunks is in flight so memory stays flat no
+    matter how large the dataset is. Batches smaller than ``min_items``
+    (e.g. a small incremental enroll) are extracted in this process
+    instead, since starting the workers would take longer than the work.
+    """
+
+    def __init__(self, config: FaceRecognitionConfig = None):
+        self.config = config or FaceRecognitionConfig()
+        self.workers = resolve_worker_count(self.config.TRAINING_WORKERS)
+        self.chunk_size = max(1, self.config.TRAINING_CHUNK_SIZE)
+        self.min_items = self.workers * MIN_IMAGES_PER_WORKER
+
+    def extract(self, items: Iterable[Tuple[int, np.ndarray]],
+                serial_extract: Callable[[np.ndarray], ExtractResult]) -> Iterator[Tuple[int, Optional[np.ndarray], Optional[Tuple], Optional[str]]]:
+        """
+        Extract faces for (key, image_bytes) items
+
+        Args:
+            items: Keys with encoded image buffers; consumed lazily
+            serial_extract: Returns (face_roi, box, error) for one image
+                buffer in this process, used for batches below min_items
+                and for the rest of a batch when the pool fails
+
+        Yields:
+            (key, face_roi, box, error) tuples in submission order
+        """
+        items = iter(items)
+        head = list(islice(items, self.min_items))
+        if len(head) < self.min_items:
+            for key, image_bytes in head:
+                yield (key, *serial_extract(image_bytes))
+            return
+        items = chain(head, items)
+
+        max_in_flight = self.workers * 2
+        in_flight = deque()
+        chunk = []
+
+        # Fork is unsafe once OpenCV/Flask threads exist, so start workers from a clean process
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=_worker_context,
+            initializer=_init_worker, initargs=(self.config,)
+        ) as executor:
+            try:
+                for item in items:
+                    chunk.append(item)
+                    if len(chunk) >= self.chunk_size:
+                        in_flight.append((executor.submit(_extract_chunk, chunk), chunk))
+                        chunk = []
+                        while len(in_flight) >= max_in_flight:
+                            yield from in_flight[0][0].result()
+                            in_flight.popleft()
+
+                if chunk:
+                    in_flight.append((executor.submit(_extract_chunk, chunk), chunk))
+                    chunk = []
+                while in_flight:
+                    yield from in_flight[0][0].result()
+                    in_flight.popleft()
+                return
+
+            except (OSError, RuntimeError) as e:
+                # Covers BrokenProcessPool; errors of single images are returned, not raised
+                logger.warning(f"Face extraction pool failed ({e!r}), extracting the remaining images serially")
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        remaining = chain(chain.from_iterable(pending for _, pending in in_flight), chunk, items)
+        for key, image_bytes in remaining:
+            yield (key, *serial_extract(image_bytes))
@@ -0,0 +1,137 @@
+"""
+Prediction Cache
+Remembers recent recognizer predictions for near-identical face ROIs
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Side of the downsampled image the DCT is taken of, and of the low-frequency block kept
+PHASH_IMAGE_SIZE = 32
+PHASH_BLOCK_SIZE = 8
+
+
+def perceptual_hash(face_roi: np.ndarray) -> int:
+    """
+    64-bit DCT perceptual hash of a grayscale face ROI
+
+    Small changes in noise, brightness or compression flip only a few bits,
+    so similar ROIs have a small Hamming distance.
+    """
+    small = cv2.resize(face_roi, (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE), interpolation=cv2.INTER_AREA)
+    block = cv2.dct(np.float32(small))[:PHASH_BLOCK_SIZE, :PHASH_BLOCK_SIZE].flatten()
+    # The DC term only encodes overall brightness, so compare against the median of the rest
+    bits = block > np.median(block[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class PredictionCache:
+    """
+    Bounded LRU of (label, confidence) keyed by perceptual hash
+
+    A lookup hits when a cached hash is within ``max_distance`` bits of the
+    query. Entries expire after ``ttl`` seconds, and the whole cache is
+    dropped when the model version it was filled with changes.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 5.0, max_distance: int = 4,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._clock = clock
+        self._lock = threading.Lock()
+        # hash -> (label, confidence, stored_at)
+        self._entries: "OrderedDict[int, Tuple[int, float, float]]" = OrderedDict()
+        self._model_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, phash: int, model_version: int) -> Optional[Tuple[int, float]]:
+        """Return the cached (label, confidence) for a similar ROI, or None"""
+        with self._lock:
+            self._check_version(model_version)
+            now = self._clock()
+
+            key = phash if phash in self._entries else self._nearest(phash)
+            if key is not None:
+                label, confidence, stored_at = self._entries[key]
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return label, confidence
+                del self._entries[key]
+                self.expired += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, phash: int, model_version: int, label: int, confidence: float):
+        """Store a prediction made by the given model version"""
+        with self._lock:
+            if self._model_version is not None and model_version < self._model_version:
+                # Predicted by a model that was replaced while predicting
+                return
+            self._check_version(model_version)
+            self._entries[phash] = (label, confidence, self._clock())
+            self._entries.move_to_end(phash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        """Cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the entries"""
+        with self._lock:
+            return sys.getsizeof(self._entries) + sum(
+                sys.getsizeof(phash) + sys.getsizeof(entry) + sum(sys.getsizeof(field) for field in entry)
+                for phash, entry in self._entries.items()
+            )
+
+    def _check_version(self, model_version: int):
+        """Drop every entry when the model was retrained (labels may have changed)"""
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._model_version = model_version
+
+    def _nearest(self, phash: int) -> Optional[int]:
+        """Most recently used cached hash within max_distance bits"""
+        if self.max_distance <= 0:
+            return None
+        for key in reversed(self._entries):
+            if bin(key ^ phash).count("1") <= self.max_distance:
+                return key
+        return None
@@ -0,0 +1,266 @@
+"""
+Profiling
+On-demand CPU profiles of the next requests or the next training run
+
+An admin arms one capture at a time. Until then nothing is profiled and
+the request hook only reads one attribute. A capture profiles its target
+with cProfile (saved as a pstats file, for ``python -m pstats`` or
+snakeviz) or with a sampling profiler (saved as collapsed stacks, for
+flamegraph.pl or speedscope).
+
+Only the thread handling the request or the training run is profiled;
+work it hands to other threads or processes (batch detection pool,
+parallel face extraction) shows up as time spent waiting for it.
+"""
+import cProfile
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'sampling')
+PROFILE_TARGETS = ('requests', 'training')
+PROFILE_EXTENSIONS = {'cprofile': '.pstats', 'sampling': '.collapsed'}
+
+
+def collapse_stack(frame) -> str:
+    """Frame and its callers as one collapsed-stack line, outermost call first"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Counts the stacks of chosen threads, sampled every ``interval`` seconds"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._threads = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_thread(self, ident: int):
+        self._threads.add(ident)
+
+    def remove_thread(self, ident: int):
+        self._threads.discard(ident)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self._threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapse_stack(frame)] += 1
+                    self.samples += 1
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileCapture:
+    """One armed profile: its target, mode, progress and result file"""
+
+    ARMED = "armed"
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+    def __init__(self, target: str, mode: str, requests: int = 1, interval: float = 0.005):
+        self.id = uuid.uuid4().hex[:12]
+        self.target = target
+        self.mode = mode
+        self.requests = requests if target == 'requests' else 0
+        self.profiled_requests = 0
+        self.interval = interval
+        self.status = self.ARMED
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.filename: Optional[str] = None
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else SamplingProfiler(interval)
+
+    def start(self):
+        """Start profiling the calling thread"""
+        self.status = self.RUNNING
+        if self.mode == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.add_thread(threading.get_ident())
+            self.profiler.start()
+
+    def pause(self):
+        """Stop profiling the calling thread"""
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.remove_thread(threading.get_ident())
+
+    def save(self, output_dir: str):
+        if self.mode == 'sampling':
+            self.profiler.stop()
+        os.makedirs(output_dir, exist_ok=True)
+        self.filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.target}-{self.id}{PROFILE_EXTENSIONS[self.mode]}"
+        path = os.path.join(output_dir, self.filename)
+        if self.mode == 'cprofile':
+            self.profiler.dump_stats(path)
+        else:
+            self.profiler.write(path)
+        self.status = self.COMPLETED
+        self.finished_at = time.time()
+        logger.info(f"Saved {self.mode} profile of {self.target} to {path}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capture_id": self.id,
+            "target": self.target,
+            "mode": self.mode,
+            "status": self.status,
+            "requests": self.requests,
+            "profiled_requests": self.profiled_requests,
+            "interval_ms": self.interval * 1000 if self.mode == 'sampling' else None,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "file": self.filename
+        }
+
+
+class Profiler:
+    """
+    Runs at most one capture at a time around requests or a training run
+
+    Requests are profiled one at a time: a request that arrives while
+    another is being profiled is served normally and does not count.
+    """
+
+    def __init__(self, output_dir, max_requests: int = 100):
+        self.output_dir = str(output_dir)
+        self.max_requests = max_requests
+        self.capture: Optional[ProfileCapture] = None
+        self.last_capture: Optional[ProfileCapture] = None
+        self._lock = threading.Lock()
+        self._busy = False
+
+    def arm(self, target: str, mode: str = 'cprofile', requests: int = 1,
+            interval: float = 0.005) -> ProfileCapture:
+        """
+        Profile the next ``requests`` requests, or the next training run
+
+        Raises:
+            ValueError: Invalid arguments, or another capture is armed
+        """
+        if target not in PROFILE_TARGETS:
+            raise ValueError(f"target must be one of {', '.join(PROFILE_TARGETS)}")
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+        if not 1 <= requests <= self.max_requests:
+            raise ValueError(f"requests must be between 1 and {self.max_requests}")
+        if not 0.001 <= interval <= 1.0:
+            raise ValueError("interval must be between 1 and 1000 ms")
+
+        with self._lock:
+            if self.capture is not None:
+                raise ValueError(f"Capture {self.capture.id} is still {self.capture.status}")
+            self.capture = ProfileCapture(target, mode, requests, interval)
+            return self.capture
+
+    def cancel(self) -> Optional[ProfileCapture]:
+        """Drop an armed capture that has not started"""
+        with self._lock:
+            capture = self.capture
+            if capture is None or capture.status != ProfileCapture.ARMED:
+                return None
+            self.capture = None
+            return capture
+
+    def begin_request(self) -> Optional[ProfileCapture]:
+        """Start profiling the current request if a request capture wants it"""
+        with self._lock:
+            capture = self.capture
+            if capture is None or capture.target != 'requests' or self._busy:
+                return None
+            self._busy = True
+        try:
+            capture.start()
+        except ValueError as e:
+            # cProfile refuses to start while another profiler (e.g. a coverage tool) is active
+            logger.error(f"Could not start profile {capture.id}: {e}")
+            with self._lock:
+                self._busy = False
+            return None
+        return capture
+
+    def end_request(self, capture: ProfileCapture):
+        """Stop profiling the current request; saves the capture after its last request"""
+        capture.pause()
+        capture.profiled_requests += 1
+        if capture.profiled_requests >= capture.requests:
+            self._finish(capture)
+        with self._lock:
+            self._busy = False
+
+    @contextmanager
+    def profile_training(self):
+        """Profile the training run in the with block if a training capture is armed"""
+        with self._lock:
+            capture = self.capture
+            if capture is None or capture.target != 'training' or capture.status != ProfileCapture.ARMED:
+                capture = None
+            else:
+                capture.status = ProfileCapture.RUNNING
+        if capture is None:
+            yield
+            return
+
+        capture.start()
+        try:
+            yield
+        finally:
+            capture.pause()
+            self._finish(capture)
+
+    def _finish(self, capture: ProfileCapture):
+        try:
+            capture.save(self.output_dir)
+        except Exception as e:
+            logger.error(f"Could not save profile {capture.id}: {e}")
+        with self._lock:
+            self.capture = None
+            self.last_capture = capture
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Saved profile files, newest first"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        profiles = []
+        for filename in os.listdir(self.output_dir):
+            if os.path.splitext(filename)[1] not in PROFILE_EXTENSIONS.values():
+                continue
+            stat = os.stat(os.path.join(self.output_dir, filename))
+            profiles.append({"file": filename, "size_bytes": stat.st_size, "modified_at": stat.st_mtime})
+        return sorted(profiles, key=lambda profile: profile["modified_at"], reverse=True)
@@ -0,0 +1,115 @@
+"""
+Trace Report
+Summarizes a request trace file (see src/utils/tracing.py)
+
+Prints the time per stage over all traces, then the slowest traces with
+the stage times of each, so the stage that made them slow stands out.
+
+Usage:
+    python -m src.utils.trace_report [logs/traces.jsonl] [--top 10]
+                                     [--endpoint /upload_test] [--stage detect]
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+# Add project root to path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from config.settings import LogConfig
+
+STAGE_COLUMN_WIDTH = 10
+
+
+def read_traces(path: str) -> Iterator[Dict[str, Any]]:
+    """Traces of a JSONL trace file, skipping lines that do not parse (e.g. a partial last write)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def stage_totals(trace: Dict[str, Any]) -> Dict[str, float]:
+    """Summed span duration (ms) per stage of one trace"""
+    totals: Dict[str, float] = {}
+    for span in trace.get('spans', []):
+        totals[span['name']] = totals.get(span['name'], 0.0) + span['duration_ms']
+    return totals
+
+
+def stage_summary(traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Count, median, p95 and max of every stage's time per trace, slowest p95 first"""
+    per_stage: Dict[str, List[float]] = {}
+    for trace in traces:
+        for name, duration in stage_totals(trace).items():
+            per_stage.setdefault(name, []).append(duration)
+
+    rows = []
+    for name, durations in per_stage.items():
+        values = np.array(durations)
+        rows.append({
+            'stage': name,
+            'traces': len(values),
+            'p50_ms': float(np.median(values)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max())
+        })
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+
+def slowest(traces: List[Dict[str, Any]], top: int, stage: str = None) -> List[Dict[str, Any]]:
+    """The top traces by total duration, or by time spent in one stage"""
+    if stage:
+        key = lambda trace: stage_totals(trace).get(stage, 0.0)
+    else:
+        key = lambda trace: trace.get('duration_ms', 0.0)
+    return sorted(traces, key=key, reverse=True)[:top]
+
+
+def print_report(traces: List[Dict[str, Any]], top: int, stage: str = None):
+    summary = stage_summary(traces)
+    print(f"{len(traces)} traces\n")
+    print(f"{'stage':<16} {'traces':>7} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for row in summary:
+        print(f"{row['stage']:<16} {row['traces']:>7} {row['p50_ms']:10.2f} {row['p95_ms']:10.2f} {row['max_ms']:10.2f}")
+
+    stages = [row['stage'] for row in summary]
+    print(f"\nSlowest {min(top, len(traces))} by {stage or 'total time'}:")
+    print(f"{'request id':<34} {'endpoint':<20} {'status':>6} {'total ms':>10} "
+          + ' '.join(f"{name[:STAGE_COLUMN_WIDTH]:>{STAGE_COLUMN_WIDTH}}" for name in stages))
+    for trace in slowest(traces, top, stage):
+        totals = stage_totals(trace)
+        cells = ' '.join(
+            f"{totals[name]:{STAGE_COLUMN_WIDTH}.2f}" if name in totals else f"{'-':>{STAGE_COLUMN_WIDTH}}"
+            for name in stages
+        )
+        print(f"{trace.get('request_id', ''):<34} {trace.get('name', ''):<20} {str(trace.get('status', '')):>6} "
+              f"{trace.get('duration_ms', 0.0):10.2f} {cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('trace_file', nargs='?', default=str(LogConfig.TRACE_FILE))
+    parser.add_argument('--top', type=int, default=10, help='number of slowest traces to list')
+    parser.add_argument('--endpoint', help='only traces of this route, e.g. /upload_test')
+    parser.add_argument('--stage', help='rank traces by the time spent in this stage instead of in total')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.trace_file):
+        raise SystemExit(f"No trace file at {args.trace_file}; set TRACE_SAMPLE_RATE to record traces")
+
+    traces = [trace for trace in read_traces(args.trace_file)
+              if args.endpoint is None or trace.get('name') == args.endpoint]
+    if not traces:
+        raise SystemExit("No matching traces")
+    print_report(traces, args.top, args.stage)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Request Tracing
+Timed spans of single requests, for finding out why one request was slow
+
+A sampled request gets a Trace that recognition stages add spans to while
+it is handled. ``stage()`` is used for every stage whether or not the
+request is traced: it always feeds the stage latency histogram (see
+src/utils/metrics.py) and adds a span only when a trace is active.
+Finished traces are appended to a JSONL file in batches by TraceWriter.
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from src.utils.metrics import STAGE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('trace', default=None)
+
+
+class Trace:
+    """Spans of one request, with offsets relative to its start"""
+
+    def __init__(self, request_id: str, name: str):
+        self.request_id = request_id
+        self.name = name
+        self.started_at = time.time()
+        self.attributes: Dict[str, Any] = {}
+        self.spans: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._duration: Optional[float] = None
+
+    def add_span(self, name: str, start: float, duration: float, attributes: Dict[str, Any] = None):
+        """Record a span given its perf_counter start and duration in seconds"""
+        span = {
+            'name': name,
+            'start_ms': round((start - self._start) * 1000, 3),
+            'duration_ms': round(duration * 1000, 3)
+        }
+        if attributes:
+            span.update(attributes)
+        # list.append is atomic, so batch worker threads can add spans too
+        self.spans.append(span)
+
+    def finish(self):
+        if self._duration is None:
+            self._duration = time.perf_counter() - self._start
+
+    @property
+    def duration_ms(self) -> float:
+        duration = self._duration if self._duration is not None else time.perf_counter() - self._start
+        return round(duration * 1000, 3)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Summed span duration (ms) per span name, in first-seen order"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span['name']] = totals.get(span['name'], 0.0) + span['duration_ms']
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one entry per span name plus the total"""
+        counts: Dict[str, int] = {}
+        for span in self.spans:
+            counts[span['name']] = counts.get(span['name'], 0) + 1
+        entries = [
+            f'{name};dur={duration:.2f}' + (f';desc="x{counts[name]}"' if counts[name] > 1 else '')
+            for name, duration in self.stage_totals().items()
+        ]
+        entries.append(f'total;dur={self.duration_ms:.2f}')
+        return ', '.join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'request_id': self.request_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            **self.attributes,
+            'spans': self.spans
+        }
+
+
+class _Stage:
+    """Context manager returned by stage()"""
+
+    __slots__ = ('name', 'attributes', '_start')
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        STAGE_LATENCY.observe(duration, self.name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(self.name, self._start, duration, self.attributes)
+        return False
+
+
+def stage(name: str, **attributes) -> _Stage:
+    """
+    Time a stage of request handling
+
+    Args:
+        name: Stage name, the stage label of the latency histogram
+        **attributes: Extra fields of the span when the request is traced
+    """
+    return _Stage(name, attributes)
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the request being handled in this context, if it is sampled"""
+    return _current_trace.get()
+
+
+def activate(trace: Optional[Trace]):
+    """Make trace the current trace; returns a token for deactivate()"""
+    return _current_trace.set(trace)
+
+
+def deactivate(token):
+    _current_trace.reset(token)
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Wrap func so it adds spans to the current trace from another thread
+
+    Thread pools do not carry context variables over, so stages run on a
+    pool would otherwise be missing from the trace. Returns func unchanged
+    when no trace is active.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return func
+
+    def run(*args, **kwargs):
+        token = _current_trace.set(trace)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_trace.reset(token)
+    return run
+
+
+class TraceWriter:
+    """
+    Appends finished traces to a JSONL file
+
+    Traces are buffered and written in one append per ``batch_size`` traces,
+    or on the first trace after ``flush_interval`` seconds, and at exit.
+    """
+
+    def __init__(self, path, batch_size: int = 20, flush_interval: float = 5.0):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+        self.written = 0
+        atexit.register(self.flush)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def write(self, trace: Trace):
+        line = json.dumps(trace.to_dict(), separators=(',', ':'), default=str)
+        with self._lock:
+            self._pending.append(line)
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Append all buffered traces to the file"""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not lines:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+                self.written += len(lines)
+            except OSError as e:
+                logger.error(f"Could not write traces to {self.path}: {e}")
+
+    def _after_fork(self):
+        # Traces buffered by the parent are its to write
+        self._lock = threading.Lock()
+        self._pending = []
@@ -0,0 +1,39 @@
+"""
+Shared test helpers
+
+Test modules import ``make_test_config`` with ``from conftest import
+make_test_config``; pytest and ``python tests/test_*.py`` both put this
+directory on sys.path.
+"""
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig
+
+# Tests train their own small models in memory, serially, without augmentation
+TEST_CONFIG_DEFAULTS = {
+    'AUTO_TRAIN_ON_INIT': False,
+    'PERSIST_MODEL': False,
+    'USE_FACE_CACHE': False,
+    'USE_AUGMENTATION': False,
+    'TRAINING_WORKERS': 1,
+}
+
+
+def make_test_config(**overrides) -> FaceRecognitionConfig:
+    """
+    Config for a model a test trains itself
+
+    Never writes the shared model snapshot or face cache, and never trains
+    on the bundled dataset at construction. Keyword arguments override any
+    setting, including the defaults above.
+    """
+    config = FaceRecognitionConfig()
+    for key, value in {**TEST_CONFIG_DEFAULTS, **overrides}.items():
+        if not hasattr(config, key):
+            raise AttributeError(f"FaceRecognitionConfig has no setting {key}")
+        setattr(config, key, value)
+    return config
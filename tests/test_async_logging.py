@@ -0,0 +1,114 @@
+"""
+Unit tests for queue-based logging and periodic summaries
+"""
+import unittest
+import sys
+import os
+import logging
+import queue
+import shutil
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.async_logging import DeferredQueueHandler, PeriodicSummary, setup_logging, stop_logging
+from src.utils.metrics import LOG_RECORDS_DROPPED
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAsyncLogging(unittest.TestCase):
+    """Test cases for the log queue and aggregated hot path messages"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_records_written_by_listener(self):
+        """Test records are formatted lazily and written to the log file by the listener thread"""
+        log_file = os.path.join(self.tmp_dir, 'logs', 'app.log')
+        root = logging.getLogger()
+        level = root.level
+        setup_logging(level='INFO', log_file=log_file, log_format='%(threadName)s %(message)s')
+        try:
+            setup_logging(level='INFO', log_file=os.path.join(self.tmp_dir, 'other.log'))
+            logger = logging.getLogger('test.async')
+            worker = threading.Thread(target=logger.info, args=("Loaded %s faces", 12), name="request-thread")
+            worker.start()
+            worker.join()
+            logger.debug("Not logged %s", 1)
+        finally:
+            stop_logging()
+            root.setLevel(level)
+
+        with open(log_file, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'request-thread Loaded 12 faces\n')
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, 'other.log')))
+
+    def test_full_queue_drops_records(self):
+        """Test a full queue drops records instead of blocking"""
+        handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+        logger = logging.Logger('test.dropped')
+        logger.addHandler(handler)
+        dropped = LOG_RECORDS_DROPPED.get('WARNING')
+
+        logger.warning("first %d", 1)
+        logger.warning("second %d", 2)
+        self.assertEqual(handler.queue.get_nowait().args, (1,))
+        self.assertEqual(LOG_RECORDS_DROPPED.get('WARNING'), dropped + 1)
+
+    def test_periodic_summary(self):
+        """Test events are logged as one summary per interval"""
+        clock = FakeClock()
+        logger = logging.getLogger('test.summary')
+        summary = PeriodicSummary(logger, "%(recognized)d recognized, %(unknown)d unknown in %(seconds).0fs",
+                                  ("recognized", "unknown"), interval=60, clock=clock)
+        with self.assertLogs(logger, 'INFO') as logs:
+            for second in range(90):
+                clock.now = second
+                summary.add(recognized=1)
+            summary.add(unknown=1)
+            summary.flush()
+            summary.flush()
+        self.assertEqual(logs.output, [
+            'INFO:test.summary:61 recognized, 0 unknown in 60s',
+            'INFO:test.summary:29 recognized, 1 unknown in 29s',
+        ])
+
+    def test_dataset_load_summary(self):
+        """Test loading a dataset logs a summary instead of a line per image"""
+        dataset_dir = os.path.join(self.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+        with open(os.path.join(dataset_dir, 'thanh', 'blank.jpg'), 'wb') as f:
+            f.write(b'not an image')
+
+        model = FaceRecognitionModel(make_test_config(USE_AUGMENTATION=True, AUGMENTATION_FACTOR=2))
+
+        with self.assertLogs('src.models.face_recognition_model', 'INFO') as logs:
+            face_images, _, _ = model.load_dataset(dataset_dir, known_face_names=[])
+        self.assertEqual(len(face_images), 3)
+        messages = [record.getMessage() for record in logs.records]
+        self.assertIn('No face found in 1 images: blank.jpg', messages)
+        self.assertTrue(any(message.startswith('Loaded 3 faces for 1 people from 2 images in ')
+                            for message in messages))
+        self.assertFalse(any('Loaded face for' in message for message in messages))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for batch recognition
+"""
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.routes import api_bp, BATCH_LENGTH_PREFIX
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestBatchRecognition(unittest.TestCase):
+    """Test cases for batch recognition in the model and API"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model and build an app around it"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+
+        cls.model = FaceRecognitionModel(make_test_config(BATCH_WORKERS=2, MAX_BATCH_SIZE=4))
+        assert cls.model.train(dataset_dir)['success']
+
+        app = Flask(__name__)
+        app.register_blueprint(api_bp)
+        app.face_model = cls.model
+        app.people_manager = PeopleManager()
+        cls.client = app.test_client()
+
+        cls.encoded = [
+            (SAMPLE_DIR / name).read_bytes() for name in ('thanh.jpg', 'thanh1.jpg')
+        ]
+        cls.frames = [cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) for data in cls.encoded]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_batch_matches_single_frame(self):
+        """Test batch results equal per-frame recognize_faces results, in order"""
+        expected = [self.model.recognize_faces(frame) for frame in self.frames]
+
+        self.assertEqual(self.model.recognize_faces_batch(self.frames), expected)
+        self.assertEqual(
+            self.model.recognize_encoded_batch([np.frombuffer(data, np.uint8) for data in self.encoded]),
+            expected
+        )
+
+    def test_invalid_image_in_batch(self):
+        """Test undecodable images yield None without affecting the others"""
+        buffers = [np.frombuffer(b'not an image', np.uint8), np.frombuffer(self.encoded[0], np.uint8)]
+        results = self.model.recognize_encoded_batch(buffers)
+
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1], self.model.recognize_faces(self.frames[0]))
+
+    def test_packed_body(self):
+        """Test the length-prefixed binary body"""
+        body = b''.join(BATCH_LENGTH_PREFIX.pack(len(data)) + data for data in self.encoded)
+        response = self.client.post(
+            '/recognize_batch', data=body, content_type='application/octet-stream'
+        )
+        result = response.get_json()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['count'], 2)
+        self.assertTrue(all(item['success'] for item in result['results']))
+
+        truncated = self.client.post(
+            '/recognize_batch', data=body[:-10], content_type='application/octet-stream'
+        )
+        self.assertEqual(truncated.status_code, 400)
+
+    def test_multipart_body(self):
+        """Test multipart uploads and the batch size limit"""
+        response = self.client.post('/recognize_batch', data={
+            'images': [(io.BytesIO(data), f'{index}.jpg') for index, data in enumerate(self.encoded)]
+        })
+        result = response.get_json()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['count'], 2)
+
+        too_many = self.client.post('/recognize_batch', data={
+            'images': [(io.BytesIO(self.encoded[0]), f'{index}.jpg') for index in range(5)]
+        })
+        self.assertEqual(too_many.status_code, 413)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the face ROI cache
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig
+from src.utils.face_cache import FaceROICache, content_digest
+
+
+class TestFaceROICache(unittest.TestCase):
+    """Test cases for FaceROICache"""
+
+    def setUp(self):
+        """Set up a temporary cache file"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, 'face_rois.bin')
+        self.config = FaceRecognitionConfig()
+        self.roi = np.random.default_rng(0).integers(0, 255, (100, 100), dtype=np.uint8)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_roundtrip_across_reopen(self):
+        """Test entries survive a flush and reopen"""
+        cache = FaceROICache(self.cache_file, config=self.config)
+        digest = content_digest(b'image-a')
+        cache.put(digest, self.roi, (1, 2, 3, 4))
+        cache.flush()
+
+        reopened = FaceROICache(self.cache_file, config=self.config)
+        found, roi, box = reopened.get(digest)
+
+        self.assertTrue(found)
+        np.testing.assert_array_equal(roi, self.roi)
+        self.assertEqual(box, (1, 2, 3, 4))
+        self.assertEqual(reopened.get_stats()['hits'], 1)
+
+    def test_no_face_results_are_cached(self):
+        """Test images without a face are remembered as misses of the detector"""
+        cache = FaceROICache(self.cache_file, config=self.config)
+        digest = content_digest(b'no-face')
+        cache.put(digest, None)
+        cache.flush()
+
+        self.assertEqual(cache.get(digest), (False, None, None))
+        self.assertIsNone(cache.get(content_digest(b'unknown')))
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+    def test_config_change_resets_cache(self):
+        """Test a different ROI size invalidates existing entries"""
+        cache = FaceROICache(self.cache_file, config=self.config)
+        cache.put(content_digest(b'image-a'), self.roi)
+        cache.flush()
+
+        self.config.MIN_FACE_SIZE = (80, 80)
+        reopened = FaceROICache(self.cache_file, config=self.config)
+        self.assertEqual(len(reopened), 0)
+
+    def test_compact_keeps_live_entries(self):
+        """Test compaction drops entries for removed images"""
+        cache = FaceROICache(self.cache_file, config=self.config)
+        live, stale = content_digest(b'live'), content_digest(b'stale')
+        cache.put(live, self.roi)
+        cache.put(stale, self.roi)
+        cache.compact([live])
+
+        self.assertEqual(len(cache), 1)
+        self.assertIsNotNone(cache.get(live))
+        self.assertIsNone(cache.get(stale))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import os
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 class TestFaceRecognitionModel(unittest.TestCase):
     """Test cases for FaceRecognitionModel"""
@@ -38,6 +39,44 @@ class TestImageProcessor(unittest.TestCase):
     def test_processor_initialization(self):
         """Test processor initialization"""
         self.assertIsNotNone(self.processor)
+    
+    def test_downscaled_detection(self):
+        """Test boxes found on a downscaled frame map back to full resolution"""
+        import cv2
+        from config.settings import DATA_DIR
+        
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + self.processor.config.FACE_CASCADE_FILE)
+        gray = cv2.imread(str(DATA_DIR / 'thanh' / 'thanh.jpg'), cv2.IMREAD_GRAYSCALE)
+        gray = cv2.resize(gray, None, fx=2, fy=2)
+        
+        self.processor.config.DETECTION_MAX_SIDE = 0
+        (fx, fy, fw, fh), = self.processor.detect_faces(cascade, gray, (60, 60))
+        self.processor.config.DETECTION_MAX_SIDE = 640
+        (x, y, w, h), = self.processor.detect_faces(cascade, gray, (60, 60))
+        
+        # Same face, within a few percent of its size
+        for full, scaled, size in ((fx, x, fw), (fy, y, fh), (fw, w, fw), (fh, h, fh)):
+            self.assertLess(abs(full - scaled), 0.1 * size)
+    
+    def test_downscaling_keeps_min_size_above_detection_window(self):
+        """Test downscaling is limited so the minimum face size stays detectable, with a warning"""
+        import cv2
+        from config.settings import DATA_DIR
+        
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + self.processor.config.FACE_CASCADE_FILE)
+        gray = cv2.imread(str(DATA_DIR / 'thanh' / 'thanh.jpg'), cv2.IMREAD_GRAYSCALE)
+        gray = cv2.resize(gray, None, fx=2, fy=2)
+        
+        self.processor.config.DETECTION_MAX_SIDE = 0
+        full = self.processor.detect_faces(cascade, gray, (30, 30))
+        # 30px faces at this scale would be ~3px, far below the 24px window
+        self.processor.config.DETECTION_MAX_SIDE = 100
+        with self.assertLogs(level='WARNING') as logs:
+            scaled = self.processor.detect_faces(cascade, gray, (30, 30))
+            self.processor.detect_faces(cascade, gray, (30, 30))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('24x24 detection window', logs.output[0])
+        self.assertEqual(len(scaled), len(full))
 
 class TestPeopleManager(unittest.TestCase):
     """Test cases for PeopleManager"""
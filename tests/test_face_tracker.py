@@ -0,0 +1,134 @@
+"""
+Unit tests for the face tracker
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.face_tracker import FaceTracker, box_iou
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+def shifted(location, dy=0, dx=0):
+    top, right, bottom, left = location
+    return (top + dy, right + dx, bottom + dy, left + dx)
+
+
+class TestFaceTracker(unittest.TestCase):
+    """Test cases for FaceTracker"""
+
+    def setUp(self):
+        self.config = FaceRecognitionConfig()
+        self.config.TRACKER_REPREDICT_INTERVAL = 5
+        self.tracker = FaceTracker(self.config)
+        self.face = (100, 200, 200, 100)
+
+    def _predicted_frames(self, frames):
+        """Feed frames of locations, returning the indexes of frames that needed a prediction"""
+        predicted = []
+        for index, locations in enumerate(frames):
+            for track, needs_prediction in self.tracker.update(locations):
+                if needs_prediction:
+                    self.tracker.record_prediction(track, 'Alice')
+                    predicted.append(index)
+        return predicted
+
+    def test_box_iou(self):
+        """Test IoU of identical, disjoint and half-overlapping boxes"""
+        self.assertEqual(box_iou(self.face, self.face), 1.0)
+        self.assertEqual(box_iou(self.face, shifted(self.face, dx=500)), 0.0)
+        self.assertAlmostEqual(box_iou(self.face, shifted(self.face, dx=50)), 1 / 3)
+
+    def test_steady_face_is_predicted_periodically(self):
+        """Test a face that stays in view is only re-predicted every N frames"""
+        frames = [[shifted(self.face, dx=i % 3)] for i in range(11)]
+
+        self.assertEqual(self._predicted_frames(frames), [0, 5, 10])
+        self.assertEqual(len(self.tracker.tracks), 1)
+
+    def test_new_and_moved_faces_are_predicted(self):
+        """Test new faces and big jumps trigger a prediction"""
+        other = shifted(self.face, dx=400)
+        frames = [
+            [self.face],
+            [self.face, other],  # new person enters
+            [self.face, shifted(other, dx=45)],  # large move, same track
+            [self.face, shifted(other, dx=47)],
+        ]
+
+        self.assertEqual(self._predicted_frames(frames), [0, 1, 2])
+        self.assertEqual(len(self.tracker.tracks), 2)
+
+    def test_retrained_model_forces_prediction(self):
+        """Test tracks predicted with an older model version are re-predicted"""
+        self.tracker.record_prediction(self.tracker.update([self.face], model_version=1)[0][0], 'Alice', 1)
+
+        (_, needs_prediction), = self.tracker.update([self.face], model_version=1)
+        self.assertFalse(needs_prediction)
+        (_, needs_prediction), = self.tracker.update([self.face], model_version=2)
+        self.assertTrue(needs_prediction)
+
+    def test_retrained_model_drops_votes(self):
+        """Test identities voted by an older model version do not outvote the new model"""
+        (track, _), = self.tracker.update([self.face], model_version=1)
+        for _ in range(3):
+            self.tracker.record_prediction(track, 'Alice', 1)
+
+        (track, needs_prediction), = self.tracker.update([self.face], model_version=2)
+        self.assertTrue(needs_prediction)
+        self.assertEqual(track.name, 'Unknown')
+        self.tracker.record_prediction(track, 'Bob', 2)
+        self.assertEqual(track.name, 'Bob')
+
+    def test_identity_vote_and_lost_tracks(self):
+        """Test a single odd prediction does not flip the identity and lost tracks expire"""
+        (track, _), = self.tracker.update([self.face])
+        for name in ('Alice', 'Alice', 'Bob'):
+            self.tracker.record_prediction(track, name)
+        self.assertEqual(track.name, 'Alice')
+
+        for _ in range(self.config.TRACKER_MAX_MISSES + 1):
+            self.tracker.update([])
+        self.assertEqual(self.tracker.tracks, [])
+
+
+class TestTrackedRecognition(unittest.TestCase):
+    """Test cases for FaceRecognitionModel.recognize_faces_tracked"""
+
+    def test_predicts_once_for_a_steady_face(self):
+        """Test consecutive frames of one person cost one predict call"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        os.makedirs(os.path.join(tmp_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(tmp_dir, 'thanh', 'thanh.jpg'))
+
+        config = make_test_config()
+        model = FaceRecognitionModel(config)
+        self.assertTrue(model.train(tmp_dir)['success'])
+
+        frame = cv2.imread(str(SAMPLE_DIR / 'thanh.jpg'))
+        expected = model.recognize_faces(frame)
+        tracker = FaceTracker(config)
+        for dx in range(5):
+            # Small camera jitter
+            moved = cv2.warpAffine(frame, np.float32([[1, 0, dx], [0, 1, 0]]), frame.shape[1::-1])
+            locations, names = model.recognize_faces_tracked(moved, tracker)
+            self.assertEqual(names, expected[1])
+
+        self.assertEqual(tracker.predictions, len(expected[0]))
+        self.assertEqual(tracker.frames, 5)
+
+if __name__ == '__main__':
+    unittest.main()
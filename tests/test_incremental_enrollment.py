@@ -0,0 +1,86 @@
+"""
+Unit tests for incremental enrollment
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import cv2
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestIncrementalEnrollment(unittest.TestCase):
+    """Test cases for FaceRecognitionModel.enroll_new_images"""
+
+    def setUp(self):
+        """Set up a small dataset with one person"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_dir = os.path.join(self.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(self.dataset_dir, 'alice'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(self.dataset_dir, 'alice', 'a1.jpg'))
+
+        self.model = FaceRecognitionModel(make_test_config(
+            PERSIST_MODEL=True,
+            USE_FACE_CACHE=True,
+            USE_AUGMENTATION=True,
+            MODEL_SNAPSHOT_DIR=os.path.join(self.tmp_dir, 'model'),
+            FACE_CACHE_FILE=os.path.join(self.tmp_dir, 'face_rois.bin')
+        ))
+        self.assertTrue(self.model.train(self.dataset_dir)['success'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_new_images_are_enrolled_incrementally(self):
+        """Test added images go through update() with new labels for new people"""
+        shutil.copy(SAMPLE_DIR / 'thanh1.jpg', os.path.join(self.dataset_dir, 'alice', 'a2.jpg'))
+        os.makedirs(os.path.join(self.dataset_dir, 'bob'))
+        flipped = cv2.flip(cv2.imread(str(SAMPLE_DIR / 'thanh1.jpg')), 1)
+        cv2.imwrite(os.path.join(self.dataset_dir, 'bob', 'b1.jpg'), flipped)
+
+        histograms_before = len(self.model.face_recognizer.getHistograms())
+        result = self.model.enroll_new_images(self.dataset_dir)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['mode'], 'incremental')
+        self.assertEqual(result['added_files'], ['alice/a2.jpg', 'bob/b1.jpg'])
+        self.assertEqual(self.model.known_face_names, ['Alice', 'Bob'])
+        self.assertEqual(
+            len(self.model.face_recognizer.getHistograms()),
+            histograms_before + 2 * (self.model.config.AUGMENTATION_FACTOR + 1)
+        )
+        self.assertEqual(
+            self.model.training_stats['quality_assessment']['Alice']['original_images'], 2
+        )
+
+    def test_unchanged_dataset_adds_nothing(self):
+        """Test reloading an unchanged dataset is a no-op"""
+        result = self.model.enroll_new_images(self.dataset_dir)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['mode'], 'incremental')
+        self.assertEqual(result['added_files'], [])
+
+    def test_removed_images_trigger_full_retrain(self):
+        """Test a removed image falls back to a full retrain"""
+        shutil.copy(SAMPLE_DIR / 'thanh1.jpg', os.path.join(self.dataset_dir, 'alice', 'a2.jpg'))
+        os.remove(os.path.join(self.dataset_dir, 'alice', 'a1.jpg'))
+
+        result = self.model.enroll_new_images(self.dataset_dir)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['mode'], 'full')
+        self.assertEqual(result['added_files'], ['alice/a2.jpg'])
+
+if __name__ == '__main__':
+    unittest.main()
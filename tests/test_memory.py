@@ -0,0 +1,139 @@
+"""
+Unit tests for memory accounting
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.admin import register_admin_routes
+from src.api.metrics import register_metrics_routes
+from src.api.routes import api_bp
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils import memory as memory_module
+from src.utils.memory import REQUEST_BUFFERS, gallery_memory, is_memory_mapped, peak_rss
+from src.utils.metrics import TRAINING_MEMORY
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+TOKEN = 'test-admin-token'
+
+
+class TestMemory(unittest.TestCase):
+    """Test cases for the memory report of training and /debug/memory"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model with tracemalloc running"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+
+        cls.model = FaceRecognitionModel(make_test_config(USE_AUGMENTATION=True, AUGMENTATION_FACTOR=3))
+        tracemalloc.start()
+        try:
+            cls.result = cls.model.train(dataset_dir)
+        finally:
+            tracemalloc.stop()
+        cls.frame = (SAMPLE_DIR / 'thanh.jpg').read_bytes()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def make_client(self, token=TOKEN):
+        app = Flask(__name__)
+        app.config.update(ADMIN_TOKEN=token, PROFILE_DIR=os.path.join(self.tmp_dir, 'profiles'))
+        app.register_blueprint(api_bp)
+        app.face_model = self.model
+        app.people_manager = PeopleManager()
+        register_metrics_routes(app)
+        register_admin_routes(app)
+        return app.test_client()
+
+    def test_gallery_memory(self):
+        """Test gallery bytes of the OpenCV LBPH model and of memory-mapped arrays"""
+        recognizer = self.model.face_recognizer
+        bins = recognizer.getGridX() * recognizer.getGridY() * 2 ** recognizer.getNeighbors()
+        self.assertEqual(gallery_memory(recognizer),
+                         {'private_bytes': self.model.gallery_size * bins * 4, 'mapped_bytes': 0})
+
+        path = os.path.join(self.tmp_dir, 'gallery.bin')
+        mapped = np.memmap(path, dtype=np.float32, mode='w+', shape=(4, 8))
+        self.assertTrue(is_memory_mapped(mapped[1:]))
+        self.assertFalse(is_memory_mapped(np.array(mapped)))
+
+    def test_peak_rss_units(self):
+        """Test the peak RSS is read in each platform's unit"""
+        rss = 100 * 1024 * 1024
+        process = mock.Mock()
+        process.memory_info.return_value = mock.Mock(spec=['rss'], rss=rss)
+        usage = mock.Mock(ru_maxrss=200 * 1024)
+        fake_resource = mock.Mock(RUSAGE_SELF=0, getrusage=mock.Mock(return_value=usage))
+
+        with mock.patch.object(memory_module, 'resource', fake_resource):
+            with mock.patch.object(memory_module.sys, 'platform', 'linux'):
+                self.assertEqual(peak_rss(process), 200 * 1024 * 1024)
+            with mock.patch.object(memory_module.sys, 'platform', 'darwin'):
+                # 200 KiB in bytes is below the current RSS, which is the floor
+                self.assertEqual(peak_rss(process), rss)
+
+        with mock.patch.object(memory_module, 'resource', None):
+            self.assertEqual(peak_rss(process), rss)
+            process.memory_info.return_value = mock.Mock(rss=rss, peak_wset=3 * rss)
+            self.assertEqual(peak_rss(process), 3 * rss)
+
+    def test_training_report(self):
+        """Test a training run reports its memory by component and as metrics"""
+        self.assertTrue(self.result['success'])
+        memory = self.result['stats']['memory']
+
+        face_bytes = int(np.prod(self.model.config.FACE_SIZE_NORMALIZED))
+        self.assertEqual(memory['face_images_bytes'], 4 * face_bytes)
+        self.assertEqual(memory['augmented_images_bytes'], 3 * face_bytes)
+        self.assertEqual(memory['gallery_bytes'], self.model.memory_usage()['gallery'])
+        self.assertGreaterEqual(memory['peak_rss_bytes'], memory['rss_before_bytes'])
+        self.assertGreater(memory['tracemalloc_peak_bytes'], 0)
+        self.assertTrue(memory['top_allocators'])
+        self.assertTrue(all(':' in entry['location'] for entry in memory['top_allocators']))
+        self.assertEqual(TRAINING_MEMORY.get('gallery'), memory['gallery_bytes'])
+
+    def test_debug_memory(self):
+        """Test /debug/memory is admin-only and tracks request bodies"""
+        # Registered without a token too, but never served
+        self.assertEqual(self.make_client(token=None).get('/debug/memory').status_code, 403)
+        client = self.make_client()
+        self.assertEqual(client.get('/debug/memory').status_code, 403)
+
+        client.post('/recognize', data=self.frame, content_type='image/jpeg')
+        report = client.get('/debug/memory', headers={'X-Admin-Token': TOKEN}).get_json()
+        self.assertTrue(report['success'])
+        self.assertGreater(report['process']['rss_bytes'], 0)
+        self.assertGreater(report['components']['gallery'], 0)
+        self.assertEqual(report['request_buffers']['inflight_bytes'], 0)
+        self.assertGreaterEqual(report['request_buffers']['largest_bytes'], len(self.frame))
+        self.assertEqual(report['last_training']['gallery_bytes'], report['components']['gallery'])
+        # tracemalloc is not running now
+        self.assertIsNone(report['top_allocators'])
+
+        scrape = client.get('/metrics').get_data(as_text=True)
+        self.assertIn(f'face_recognition_memory_bytes{{component="gallery"}} {report["components"]["gallery"]}',
+                      scrape)
+        self.assertIn('process_resident_memory_bytes ', scrape)
+        self.assertEqual(REQUEST_BUFFERS.inflight_bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for the Prometheus metrics
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.metrics import register_metrics_routes
+from src.api.routes import api_bp
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.metrics import Counter, Histogram, REGISTRY
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestMetricTypes(unittest.TestCase):
+    """Test cases for the metric primitives"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts include smaller observations and +Inf counts all"""
+        histogram = Histogram('test_seconds', 'Test', ['stage'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, 'a')
+
+        lines = histogram.render()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="1"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_sum{stage="a"} 3.65', lines)
+        self.assertIn('test_seconds_count{stage="a"} 4', lines)
+
+    def test_counter_labels(self):
+        """Test counters are kept per label values, escaped and checked"""
+        counter = Counter('test_events', 'Test', ['kind'])
+        counter.inc('a"b')
+        counter.inc('a"b', amount=2)
+        self.assertIn('test_events_total{kind="a\\"b"} 3', counter.render())
+
+        with self.assertRaises(ValueError):
+            counter.inc()
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test cases for /metrics"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model and build an app around it"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+
+        config = make_test_config(PREDICTION_CACHE_SIZE=0)
+        REGISTRY.clear()
+        cls.model = FaceRecognitionModel(config)
+        assert cls.model.train(dataset_dir)['success']
+
+        app = Flask(__name__)
+        app.register_blueprint(api_bp)
+        register_metrics_routes(app)
+        app.face_model = cls.model
+        app.people_manager = PeopleManager()
+        cls.client = app.test_client()
+        cls.frame = (SAMPLE_DIR / 'thanh.jpg').read_bytes()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_recognize_is_measured(self):
+        """Test a recognition request shows up in request, stage, face and model metrics"""
+        result = self.client.post('/recognize', data=self.frame, content_type='image/jpeg').get_json()
+        self.assertTrue(result['success'])
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        lines = response.get_data(as_text=True).splitlines()
+
+        self.assertIn('face_recognition_requests_total{endpoint="/recognize",method="POST",status="200"} 1', lines)
+        self.assertIn('face_recognition_request_duration_seconds_count{endpoint="/recognize",method="POST"} 1',
+                      lines)
+        for stage in ('decode', 'detect', 'predict', 'people_lookup', 'serialize'):
+            self.assertIn(f'face_recognition_stage_duration_seconds_count{{stage="{stage}"}} 1', lines)
+        self.assertIn('face_recognition_faces_total{result="recognized"} 1', lines)
+        self.assertIn('face_recognition_training_duration_seconds_count{mode="full"} 1', lines)
+        self.assertIn('face_recognition_gallery_faces 1', lines)
+        self.assertIn('face_recognition_known_people 1', lines)
+        self.assertIn(f'face_recognition_model_version {self.model.model_version}', lines)
+
+    def test_unmatched_paths_share_a_label(self):
+        """Test unknown paths do not create a label value per path"""
+        self.client.get('/no/such/path')
+        self.client.get('/another/missing/path')
+
+        text = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('face_recognition_requests_total{endpoint="unmatched",method="GET",status="404"} 2', text)
+        self.assertNotIn('/no/such/path', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
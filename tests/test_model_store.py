@@ -0,0 +1,156 @@
+"""
+Unit tests for model snapshot persistence
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig
+from src.models.gallery_file import GALLERY_FORMAT_VERSION
+from src.models.model_store import ModelStore
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+from src.utils.file_lock import locked_file
+
+
+def _write_image(path, seed):
+    """Write a small random image to disk"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 255, (60, 60, 3), dtype=np.uint8)
+    cv2.imwrite(path, image)
+
+
+class TestModelStore(unittest.TestCase):
+    """Test cases for ModelStore"""
+
+    def setUp(self):
+        """Set up a temporary dataset and snapshot directory"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_dir = os.path.join(self.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(self.dataset_dir, 'alice'))
+        _write_image(os.path.join(self.dataset_dir, 'alice', 'a1.jpg'), 1)
+        self.config = FaceRecognitionConfig()
+        self.store = ModelStore(os.path.join(self.tmp_dir, 'model'), config=self.config)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _trained_recognizer(self):
+        rng = np.random.default_rng(0)
+        faces = [rng.integers(0, 255, (100, 100), dtype=np.uint8) for _ in range(4)]
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.train(faces, np.array([0, 0, 1, 1]))
+        return recognizer, faces
+
+    def test_fingerprint_is_stable(self):
+        """Test fingerprint does not change without dataset changes"""
+        self.assertEqual(
+            self.store.compute_fingerprint(self.dataset_dir),
+            self.store.compute_fingerprint(self.dataset_dir)
+        )
+
+    def test_fingerprint_changes_with_dataset_and_config(self):
+        """Test fingerprint reacts to new files and training config"""
+        original = self.store.compute_fingerprint(self.dataset_dir)
+
+        _write_image(os.path.join(self.dataset_dir, 'alice', 'a2.jpg'), 2)
+        with_new_file = self.store.compute_fingerprint(self.dataset_dir)
+        self.assertNotEqual(original, with_new_file)
+
+        self.config.AUGMENTATION_FACTOR = 5
+        self.assertNotEqual(with_new_file, self.store.compute_fingerprint(self.dataset_dir))
+
+    def test_save_and_load_roundtrip(self):
+        """Test a saved snapshot restores labels, stats and predictions"""
+        recognizer, faces = self._trained_recognizer()
+        fingerprint = self.store.compute_fingerprint(self.dataset_dir)
+        self.assertTrue(self.store.save(
+            fingerprint, recognizer, ['Alice', 'Bob'], {'total_faces': 4}
+        ))
+
+        restored = cv2.face.LBPHFaceRecognizer_create()
+        manifest = self.store.load(fingerprint, restored)
+
+        self.assertIsNotNone(manifest)
+        self.assertEqual(manifest['known_face_names'], ['Alice', 'Bob'])
+        self.assertEqual(manifest['training_stats'], {'total_faces': 4})
+        self.assertEqual(restored.predict(faces[2]), recognizer.predict(faces[2]))
+
+    def test_load_rejects_mismatched_fingerprint(self):
+        """Test snapshots of a different dataset state are ignored"""
+        recognizer, _ = self._trained_recognizer()
+        self.store.save('a' * 64, recognizer, ['Alice', 'Bob'], {})
+
+        restored = cv2.face.LBPHFaceRecognizer_create()
+        self.assertIsNone(self.store.load('b' * 64, restored))
+
+    def test_load_rejects_other_backend_and_config(self):
+        """Test snapshots trained with another backend or training config are ignored"""
+        recognizer, _ = self._trained_recognizer()
+        self.store.save('a' * 64, recognizer, ['Alice', 'Bob'], {})
+        self.assertIsNotNone(self.store.load(None, cv2.face.LBPHFaceRecognizer_create()))
+
+        backend = self.config.RECOGNIZER_BACKEND
+        self.config.RECOGNIZER_BACKEND = 'numpy_lbph'
+        self.assertIsNone(self.store.load(None, cv2.face.LBPHFaceRecognizer_create()))
+        self.config.RECOGNIZER_BACKEND = backend
+
+        self.config.MIN_FACE_SIZE = (10, 10)
+        self.assertIsNone(self.store.load(None, cv2.face.LBPHFaceRecognizer_create()))
+
+    def test_recognizer_file_extension(self):
+        """Test OpenCV snapshots are saved as YAML and NumPy galleries under their own extension"""
+        recognizer, faces = self._trained_recognizer()
+        self.store.save('a' * 64, recognizer, ['Alice', 'Bob'], {})
+        self.assertEqual(sorted(os.listdir(self.store.snapshot_dir)),
+                         ['manifest.json', 'manifest.json.lock', f"recognizer-{'a' * 16}.yml"])
+
+        self.config.RECOGNIZER_BACKEND = 'numpy_lbph'
+        gallery = NumpyLBPHRecognizer()
+        gallery.train(faces, np.array([0, 0, 1, 1]))
+        self.store.save('b' * 64, gallery, ['Alice', 'Bob'], {})
+        # The previous snapshot's file is removed
+        self.assertEqual(sorted(os.listdir(self.store.snapshot_dir)),
+                         ['manifest.json', 'manifest.json.lock', f"recognizer-{'b' * 16}.gallery"])
+        self.assertIsNotNone(self.store.load('b' * 64, NumpyLBPHRecognizer()))
+
+    def test_save_waits_for_snapshot_lock(self):
+        """Test a snapshot is published and old files removed only while no other worker holds the lock"""
+        recognizer, _ = self._trained_recognizer()
+        self.store.save('a' * 64, recognizer, ['Alice', 'Bob'], {})
+        other_worker = ModelStore(self.store.snapshot_dir, config=self.config)
+
+        with locked_file(self.store.lock_path):
+            saver = threading.Thread(target=self.store.save, args=('b' * 64, recognizer, ['Alice', 'Bob'], {}))
+            saver.start()
+            saver.join(0.5)
+            # Still blocked: the other worker's snapshot is intact
+            self.assertTrue(saver.is_alive())
+            self.assertTrue(os.path.exists(os.path.join(self.store.snapshot_dir, f"recognizer-{'a' * 16}.yml")))
+        saver.join(10)
+
+        self.assertIsNotNone(other_worker.load('b' * 64, cv2.face.LBPHFaceRecognizer_create()))
+        self.assertFalse(os.path.exists(os.path.join(self.store.snapshot_dir, f"recognizer-{'a' * 16}.yml")))
+
+    def test_load_rejects_old_gallery_format(self):
+        """Test NumPy gallery snapshots are only loaded in the gallery format they were saved in"""
+        self.config.RECOGNIZER_BACKEND = 'numpy_lbph'
+        recognizer = NumpyLBPHRecognizer()
+        recognizer.train(self._trained_recognizer()[1], np.array([0, 0, 1, 1]))
+        self.store.save('a' * 64, recognizer, ['Alice', 'Bob'], {})
+        self.assertIsNotNone(self.store.load(None, NumpyLBPHRecognizer()))
+
+        with patch('src.models.model_store.GALLERY_FORMAT_VERSION', GALLERY_FORMAT_VERSION + 1):
+            self.assertIsNone(self.store.load(None, NumpyLBPHRecognizer()))
+
+if __name__ == '__main__':
+    unittest.main()
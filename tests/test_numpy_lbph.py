@@ -0,0 +1,151 @@
+"""
+Unit tests for the NumPy LBPH recognizer
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestNumpyLBPHRecognizer(unittest.TestCase):
+    """Test cases for NumpyLBPHRecognizer against OpenCV's LBPH"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        noise = [rng.integers(0, 256, (100, 100), dtype=np.uint8) for _ in range(6)]
+        self.faces = noise + [cv2.GaussianBlur(image, (7, 7), 0) for image in noise]
+        self.labels = np.arange(len(self.faces)) % 4
+        self.probes = [
+            np.clip(face.astype(int) + rng.integers(-20, 21, face.shape), 0, 255).astype(np.uint8)
+            for face in self.faces
+        ]
+
+        self.opencv = cv2.face.LBPHFaceRecognizer_create()
+        self.opencv.train(self.faces, self.labels)
+        self.recognizer = NumpyLBPHRecognizer()
+        self.recognizer.train(self.faces, self.labels)
+
+    def test_histograms_match_opencv(self):
+        """Test the gallery histograms are the ones OpenCV computes"""
+        for ours, theirs in zip(self.recognizer.getHistograms(), self.opencv.getHistograms()):
+            np.testing.assert_allclose(ours, theirs.reshape(1, -1), atol=1e-6)
+
+    def test_predictions_match_opencv(self):
+        """Test batched predictions give OpenCV's labels and distances"""
+        labels, distances = self.recognizer.predict_batch(self.probes)
+
+        for probe, label, distance in zip(self.probes, labels, distances):
+            expected_label, expected_distance = self.opencv.predict(probe)
+            self.assertEqual(label, expected_label)
+            self.assertAlmostEqual(distance, expected_distance, places=3)
+        self.assertEqual(self.recognizer.predict(self.probes[0]), (labels[0], distances[0]))
+
+    def test_update_and_persistence(self):
+        """Test incremental updates and write/read keep predictions unchanged"""
+        recognizer = NumpyLBPHRecognizer()
+        recognizer.train(self.faces[:5], self.labels[:5])
+        recognizer.update(self.faces[5:], self.labels[5:])
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        path = os.path.join(tmp_dir, 'recognizer.gallery')
+        recognizer.write(path)
+        restored = NumpyLBPHRecognizer()
+        restored.read(path)
+
+        expected = self.recognizer.predict_batch(self.probes)
+        for result in (recognizer.predict_batch(self.probes), restored.predict_batch(self.probes)):
+            np.testing.assert_array_equal(result[0], expected[0])
+            np.testing.assert_allclose(result[1], expected[1])
+
+    def test_gallery_index(self):
+        """Test the indexed search re-ranks a shortlist and finds the same faces"""
+        # Codes as long as the gallery keep every distance, so the shortlist holds the nearest faces
+        recognizer = NumpyLBPHRecognizer(index_min_size=1, index_dim=len(self.faces), index_shortlist=3)
+        recognizer.train(self.faces, self.labels)
+        self.assertTrue(recognizer.index_active)
+        self.assertEqual(recognizer.get_index_stats()['shortlist'], 3)
+
+        labels, distances = recognizer.predict_batch(self.probes)
+        expected = self.recognizer.predict_batch(self.probes)
+        np.testing.assert_array_equal(labels, expected[0])
+        np.testing.assert_allclose(distances, expected[1])
+
+        # A shortlist as long as the gallery is just the full scan
+        recognizer.index_shortlist = len(self.faces)
+        recognizer.update([], [])
+        self.assertFalse(recognizer.index_active)
+
+    def test_untrained_predict_raises(self):
+        """Test predicting without a gallery fails loudly"""
+        with self.assertRaises(ValueError):
+            NumpyLBPHRecognizer().predict(self.faces[0])
+
+
+class TestNumpyLBPHBackend(unittest.TestCase):
+    """Test cases for FaceRecognitionModel with RECOGNIZER_BACKEND = numpy_lbph"""
+
+    def test_backend_recognizes_like_opencv(self):
+        """Test both backends trained on several people agree on every held-out probe"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        people = sorted(path for path in DATA_DIR.iterdir() if len(list(path.glob('*.jpg'))) >= 6)[:4]
+        self.assertGreaterEqual(len(people), 3)
+        dataset_dir = os.path.join(tmp_dir, 'dataset')
+        probe_paths = []
+        for person in people:
+            # Four training images and two probes per person, shrunk from 12 MP to keep the test fast
+            os.makedirs(os.path.join(dataset_dir, person.name))
+            for index, image in enumerate(sorted(person.glob('*.jpg'))[:6]):
+                if index < 4:
+                    path = os.path.join(dataset_dir, person.name, f'{index}.jpg')
+                else:
+                    path = os.path.join(tmp_dir, f'{person.name}-{index}.jpg')
+                    probe_paths.append(path)
+                frame = cv2.imdecode(np.fromfile(str(image), dtype=np.uint8), cv2.IMREAD_COLOR)
+                scale = 800 / max(frame.shape[:2])
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                cv2.imencode('.jpg', frame)[1].tofile(path)
+
+        models = {}
+        for backend in ('lbph', 'numpy_lbph'):
+            model = FaceRecognitionModel(make_test_config(PREDICTION_CACHE_SIZE=0, RECOGNIZER_BACKEND=backend))
+            self.assertTrue(model.train(dataset_dir)['success'])
+            self.assertEqual(model.get_model_info()['recognizer']['backend'], backend)
+            models[backend] = model
+
+        self.assertEqual(models['numpy_lbph'].known_face_names, models['lbph'].known_face_names)
+        self.assertEqual(models['numpy_lbph'].gallery_size, models['lbph'].gallery_size)
+        self.assertGreaterEqual(len(models['lbph'].known_face_names), 3)
+
+        probes = [models['lbph'].extract_face_from_image(str(path)) for path in probe_paths]
+        probes = [probe for probe in probes if probe is not None]
+        self.assertGreaterEqual(len(probes), 2 * len(people) - 2)
+        for probe in probes:
+            label, distance = models['lbph'].face_recognizer.predict(probe)
+            numpy_label, numpy_distance = models['numpy_lbph'].face_recognizer.predict(probe)
+            self.assertEqual(numpy_label, label)
+            self.assertAlmostEqual(numpy_distance, distance, delta=1e-3 * distance)
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected"""
+        with self.assertRaises(ValueError):
+            FaceRecognitionModel(make_test_config(RECOGNIZER_BACKEND='nope'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Unit tests for parallel dataset loading
+"""
+import unittest
+import sys
+import os
+import multiprocessing
+import shutil
+import subprocess
+import textwrap
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR, PROJECT_ROOT
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.parallel_loader import resolve_worker_count
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestParallelLoader(unittest.TestCase):
+    """Test cases for the process pool dataset loader"""
+
+    def setUp(self):
+        """Set up a small two-person dataset"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_dir = os.path.join(self.tmp_dir, 'dataset')
+        images = [('bob', 'thanh1.jpg'), ('bob', 'thanh.jpg'), ('alice', 'thanh.jpg'), ('alice', 'thanh1.jpg')]
+        for person, filename in images:
+            os.makedirs(os.path.join(self.dataset_dir, person), exist_ok=True)
+            shutil.copy(SAMPLE_DIR / filename, os.path.join(self.dataset_dir, person, filename))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _load(self, workers):
+        model = FaceRecognitionModel(make_test_config(TRAINING_WORKERS=workers))
+        return model, model.load_dataset(self.dataset_dir)
+
+    def test_resolve_worker_count(self):
+        """Test 0 means one worker per core"""
+        self.assertEqual(resolve_worker_count(0), os.cpu_count() or 1)
+        self.assertEqual(resolve_worker_count(3), 3)
+
+    def test_parallel_matches_serial(self):
+        """Test the pool produces the same faces, labels and counts in the same order"""
+        serial_model, (serial_faces, serial_labels, serial_counts) = self._load(1)
+        parallel_model, (parallel_faces, parallel_labels, parallel_counts) = self._load(2)
+
+        self.assertEqual(serial_model.known_face_names, ['Alice', 'Bob'])
+        self.assertEqual(parallel_model.known_face_names, serial_model.known_face_names)
+        self.assertEqual(parallel_labels, serial_labels)
+        self.assertEqual(parallel_counts, serial_counts)
+        for serial_face, parallel_face in zip(serial_faces, parallel_faces):
+            np.testing.assert_array_equal(serial_face, parallel_face)
+
+    def test_small_batch_is_extracted_serially(self):
+        """Test fewer than two images per worker to extract never start the pool"""
+        with patch('src.utils.parallel_loader.ProcessPoolExecutor', side_effect=AssertionError) as pool:
+            # Four images for three workers
+            serial_model, (serial_faces, serial_labels, _) = self._load(1)
+            _, (faces, labels, _) = self._load(3)
+            self.assertEqual(labels, serial_labels)
+
+            # Enough images for two workers, but all except a new one are cached
+            config = serial_model.config
+            config.USE_FACE_CACHE = True
+            config.FACE_CACHE_FILE = os.path.join(self.tmp_dir, 'faces.bin')
+            FaceRecognitionModel(config).load_dataset(self.dataset_dir)
+            new_image = sorted(SAMPLE_DIR.glob('z*.jpg'))[0]
+            shutil.copy(new_image, os.path.join(self.dataset_dir, 'bob', new_image.name))
+            config.TRAINING_WORKERS = 2
+            cached_faces, _, _ = FaceRecognitionModel(config).load_dataset(self.dataset_dir)
+        pool.assert_not_called()
+        self.assertEqual(len(cached_faces), len(serial_faces) + 1)
+        for serial_face, face in zip(serial_faces, faces):
+            np.testing.assert_array_equal(serial_face, face)
+
+    def test_failed_pool_falls_back_to_serial(self):
+        """Test images are extracted serially when the pool cannot start workers"""
+        serial_model, (serial_faces, serial_labels, _) = self._load(1)
+        with patch('src.utils.parallel_loader.ProcessPoolExecutor.submit',
+                   side_effect=ChildProcessError(10, 'No child processes')):
+            with self.assertLogs('src.utils.parallel_loader', 'WARNING'):
+                _, (faces, labels, _) = self._load(2)
+        self.assertEqual(labels, serial_labels)
+        self.assertEqual(len(faces), len(serial_faces))
+        for serial_face, face in zip(serial_faces, faces):
+            np.testing.assert_array_equal(serial_face, face)
+
+    @unittest.skipUnless('forkserver' in multiprocessing.get_all_start_methods(), 'needs the forkserver start method')
+    def test_workers_do_not_rerun_unguarded_script(self):
+        """Test a script that trains at import time, without a __main__ guard, runs once"""
+        runs_file = os.path.join(self.tmp_dir, 'runs.txt')
+        script = os.path.join(self.tmp_dir, 'train_unguarded.py')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(textwrap.dedent(f'''
+                import os, sys
+                sys.path.insert(0, {str(PROJECT_ROOT)!r})
+                with open({runs_file!r}, 'a') as runs:
+                    runs.write(f'{{os.getpid()}}\\n')
+
+                from tests.conftest import make_test_config
+                from src.models.face_recognition_model import FaceRecognitionModel
+
+                model = FaceRecognitionModel(make_test_config(TRAINING_WORKERS=2))
+                faces, labels, counts = model.load_dataset({self.dataset_dir!r})
+                print(len(faces))
+            '''))
+
+        result = subprocess.run([sys.executable, script], capture_output=True, text=True, timeout=300)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ['4'])
+        self.assertNotIn('bootstrapping phase', result.stderr)
+        with open(runs_file, encoding='utf-8') as f:
+            self.assertEqual(len(f.read().split()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Unit tests for the perceptual-hash prediction cache
+"""
+import unittest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from src.utils.prediction_cache import PredictionCache, perceptual_hash
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPredictionCache(unittest.TestCase):
+    """Test cases for PredictionCache"""
+
+    def setUp(self):
+        gray = cv2.imread(str(SAMPLE_DIR / 'thanh.jpg'), cv2.IMREAD_GRAYSCALE)
+        self.roi = cv2.resize(gray[300:650, 480:830], (100, 100))
+        self.other_roi = cv2.resize(gray[0:350, 0:350], (100, 100))
+        self.clock = FakeClock()
+        self.cache = PredictionCache(max_size=2, ttl=5.0, max_distance=4, clock=self.clock)
+
+    def test_hash_tolerates_small_changes(self):
+        """Test noise and brightness keep the hash close while other content does not"""
+        rng = np.random.default_rng(0)
+        noisy = np.clip(self.roi.astype(np.int16) + rng.integers(-3, 4, self.roi.shape) + 5, 0, 255).astype(np.uint8)
+
+        self.assertLessEqual(hamming(perceptual_hash(self.roi), perceptual_hash(noisy)), 4)
+        self.assertGreater(hamming(perceptual_hash(self.roi), perceptual_hash(self.other_roi)), 10)
+
+    def test_hit_within_distance(self):
+        """Test exact and near hashes hit, far hashes miss"""
+        self.cache.put(0b1111, 1, label=3, confidence=42.0)
+
+        self.assertEqual(self.cache.get(0b1111, 1), (3, 42.0))
+        self.assertEqual(self.cache.get(0b0111, 1), (3, 42.0))
+        self.assertIsNone(self.cache.get(0b1111 << 20, 1))
+        self.assertEqual(self.cache.get_stats()['hit_rate'], round(2 / 3, 3))
+
+    def test_ttl_lru_and_retrain(self):
+        """Test entries expire, the least recently used is evicted, and retraining invalidates"""
+        a, b, c = 0xFFFF, 0xFFFF << 16, 0xFFFF << 32
+        self.cache.put(a, 1, 0, 10.0)
+        self.cache.put(b, 1, 1, 20.0)
+        self.cache.get(a, 1)
+        self.cache.put(c, 1, 2, 30.0)
+        self.assertIsNone(self.cache.get(b, 1))
+        self.assertEqual(self.cache.get_stats()['evictions'], 1)
+
+        self.clock.now = 6.0
+        self.assertIsNone(self.cache.get(a, 1))
+        self.assertEqual(self.cache.get_stats()['expired'], 1)
+
+        self.cache.put(a, 1, 0, 10.0)
+        self.assertIsNone(self.cache.get(a, 2))
+        self.assertEqual(len(self.cache), 0)
+
+        # A prediction from the replaced model is not stored
+        self.cache.put(a, 1, 0, 10.0)
+        self.assertEqual(len(self.cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for serving a model trained before fork (gunicorn preload_app)
+"""
+import unittest
+import sys
+import os
+import runpy
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import cv2
+import logging
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR, PROJECT_ROOT
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestPreloadFork(unittest.TestCase):
+    """Test cases for FaceRecognitionModel.reinit_after_fork and gunicorn.conf.py"""
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "needs os.fork")
+    def test_forked_child_recognizes_with_inherited_model(self):
+        """Test a child process serves the parent's model without training"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        os.makedirs(os.path.join(tmp_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(tmp_dir, 'thanh', 'thanh.jpg'))
+
+        model = FaceRecognitionModel(make_test_config(BATCH_WORKERS=2))
+        self.assertTrue(model.train(tmp_dir)['success'])
+        frame = cv2.imread(str(SAMPLE_DIR / 'thanh1.jpg'))
+        # Start the batch thread pool, whose threads the child does not inherit
+        expected = model.recognize_faces_batch([frame, frame])
+
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                model.reinit_after_fork()
+                ok = model.model_version == 1 and model.recognize_faces_batch([frame, frame]) == expected
+            finally:
+                os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertEqual(expected[0][1], ['Thanh'])
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "needs os.fork")
+    def test_forked_child_starts_extraction_pool(self):
+        """Test a child forked after the parent used the extraction pool can start its own"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        os.makedirs(os.path.join(tmp_dir, 'thanh'))
+        images = sorted(SAMPLE_DIR.glob('*.jpg'))
+        for image in images[:4]:
+            shutil.copy(image, os.path.join(tmp_dir, 'thanh', image.name))
+
+        # Four images for two workers: the parent trains on the pool (and starts the forkserver)
+        model = FaceRecognitionModel(make_test_config(TRAINING_WORKERS=2))
+        self.assertTrue(model.train(tmp_dir)['success'])
+
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                model.reinit_after_fork()
+                for image in images[4:]:
+                    shutil.copy(image, os.path.join(tmp_dir, 'thanh', image.name))
+                warnings = []
+                handler = logging.Handler(logging.WARNING)
+                handler.emit = warnings.append
+                logging.getLogger('src.utils.parallel_loader').addHandler(handler)
+                result = model.train(tmp_dir)
+                ok = result['success'] and result['stats']['total_faces'] > 4 and not warnings
+            finally:
+                os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+    def test_gunicorn_config_preloads_and_reinits(self):
+        """Test gunicorn.conf.py loads the app before fork and re-initializes the model after"""
+        settings = runpy.run_path(str(PROJECT_ROOT / 'gunicorn.conf.py'))
+        self.assertTrue(settings['preload_app'])
+        self.assertEqual(settings['wsgi_app'], 'src.app_factory:create_app()')
+
+        face_model = Mock(model_version=3)
+        server = SimpleNamespace(app=SimpleNamespace(wsgi=lambda: SimpleNamespace(face_model=face_model)))
+        settings['post_fork'](server, SimpleNamespace(pid=1234))
+        face_model.reinit_after_fork.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
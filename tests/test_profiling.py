@@ -0,0 +1,124 @@
+"""
+Unit tests for on-demand profiling
+"""
+import unittest
+import sys
+import os
+import pstats
+import shutil
+import tempfile
+
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.admin import register_admin_routes
+from src.api.routes import api_bp
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.training_jobs import TrainingJobManager
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+TOKEN = 'test-admin-token'
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the admin profiling endpoints"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(cls.dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(cls.dataset_dir, 'thanh', 'thanh.jpg'))
+
+        cls.model = FaceRecognitionModel(make_test_config())
+        assert cls.model.train(cls.dataset_dir)['success']
+        cls.frame = (SAMPLE_DIR / 'thanh.jpg').read_bytes()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def make_app(self, token=TOKEN):
+        app = Flask(__name__)
+        app.config.update(ADMIN_TOKEN=token, PROFILE_DIR=tempfile.mkdtemp(dir=self.tmp_dir))
+        app.register_blueprint(api_bp)
+        app.face_model = self.model
+        app.people_manager = PeopleManager()
+        app.training_jobs = TrainingJobManager(self.model, self.dataset_dir)
+        register_admin_routes(app)
+        return app, app.test_client()
+
+    def admin(self, client, method, path, **kwargs):
+        return client.open(path, method=method, headers={'Authorization': f'Bearer {TOKEN}'}, **kwargs)
+
+    def test_disabled_without_token(self):
+        """Test nothing is registered when no admin token is configured"""
+        app, client = self.make_app(token=None)
+        self.assertIsNone(app.profiler)
+        self.assertEqual(client.get('/admin/profiles').status_code, 404)
+
+    def test_token_required(self):
+        """Test admin endpoints reject missing or wrong tokens"""
+        app, client = self.make_app()
+        self.assertEqual(client.get('/admin/profiles').status_code, 403)
+        self.assertEqual(client.get('/admin/profiles', headers={'X-Admin-Token': 'wrong'}).status_code, 403)
+        self.assertEqual(client.get('/admin/profiles', headers={'X-Admin-Token': TOKEN}).status_code, 200)
+
+    def test_profile_next_requests(self):
+        """Test a cProfile capture covers the next N requests and can be downloaded"""
+        app, client = self.make_app()
+        armed = self.admin(client, 'POST', '/admin/profiles', json={'target': 'requests', 'requests': 2})
+        self.assertEqual(armed.status_code, 202)
+        self.assertEqual(self.admin(client, 'POST', '/admin/profiles', json={}).status_code, 400)
+
+        for expected_status in ('armed', 'running'):
+            # Polling the admin endpoints does not use up the capture
+            self.assertEqual(self.admin(client, 'GET', '/admin/profiles').get_json()['active']['status'],
+                             expected_status)
+            client.post('/recognize', data=self.frame, content_type='image/jpeg')
+
+        listing = self.admin(client, 'GET', '/admin/profiles').get_json()
+        self.assertIsNone(listing['active'])
+        self.assertEqual(listing['last']['profiled_requests'], 2)
+        filename = listing['last']['file']
+        self.assertEqual([profile['file'] for profile in listing['profiles']], [filename])
+
+        download = self.admin(client, 'GET', f'/admin/profiles/{filename}')
+        self.assertEqual(download.status_code, 200)
+        stats = pstats.Stats(os.path.join(app.profiler.output_dir, filename))
+        self.assertTrue(any(function == 'recognize_faces' for _, _, function in stats.stats))
+
+        self.assertEqual(self.admin(client, 'GET', '/admin/profiles/..%2Fsecret.pstats').status_code, 404)
+
+    def test_sampling_profile_of_training(self):
+        """Test a sampling capture of a training job writes collapsed stacks"""
+        app, client = self.make_app()
+        armed = self.admin(client, 'POST', '/admin/profiles',
+                           json={'target': 'training', 'mode': 'sampling', 'interval_ms': 1})
+        self.assertEqual(armed.status_code, 202)
+
+        # Requests are not profiled by a training capture
+        client.post('/recognize', data=self.frame, content_type='image/jpeg')
+        self.assertEqual(app.profiler.capture.status, 'armed')
+
+        job = app.training_jobs.submit(full=True)
+        self.assertTrue(job.wait(30))
+
+        capture = app.profiler.last_capture
+        self.assertEqual(capture.status, 'completed')
+        self.assertTrue(capture.filename.endswith('.collapsed'))
+        with open(os.path.join(app.profiler.output_dir, capture.filename), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any('train (face_recognition_model.py' in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
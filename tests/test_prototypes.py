@@ -0,0 +1,80 @@
+"""
+Unit tests for gallery prototype compaction
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import FaceRecognitionConfig, DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.prototypes import k_medoids, select_prototypes
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestPrototypes(unittest.TestCase):
+    """Test cases for k-medoids prototype selection"""
+
+    def test_k_medoids_picks_cluster_centers(self):
+        """Test each of two well separated groups gets its central point"""
+        points = np.array([0.0, 1.0, 2.0, 10.0, 11.0, 12.0])
+        distances = np.abs(points[:, None] - points[None, :])
+
+        np.testing.assert_array_equal(k_medoids(distances, 2), [1, 4])
+        np.testing.assert_array_equal(k_medoids(distances, 10), np.arange(6))
+
+    def test_select_prototypes_per_person(self):
+        """Test at most k samples of every label are kept"""
+        rng = np.random.default_rng(0)
+        faces = [rng.integers(0, 256, (100, 100), dtype=np.uint8) for _ in range(7)]
+        labels = [0, 0, 0, 0, 1, 1, 2]
+
+        keep = select_prototypes(faces, labels, 2)
+
+        self.assertEqual([labels[index] for index in keep], [0, 0, 1, 1, 2])
+
+
+class TestGalleryCompaction(unittest.TestCase):
+    """Test cases for GALLERY_PROTOTYPES in FaceRecognitionModel.train"""
+
+    def test_train_compacts_and_reports(self):
+        """Test training keeps one prototype per person and reports the held-out accuracy"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        os.makedirs(os.path.join(tmp_dir, 'thanh'))
+        for name in ('thanh.jpg', 'thanh1.jpg'):
+            shutil.copy(SAMPLE_DIR / name, os.path.join(tmp_dir, 'thanh', name))
+
+        # One held-out face decides alone, so accept any accuracy change
+        config = make_test_config(USE_AUGMENTATION=True, GALLERY_PROTOTYPES=1, GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS=1.0)
+        model = FaceRecognitionModel(config)
+        result = model.train(tmp_dir)
+
+        self.assertTrue(result['success'])
+        compaction = result['stats']['gallery_compaction']
+        self.assertTrue(compaction['applied'])
+        self.assertEqual(compaction['faces_before'], 2 * (config.AUGMENTATION_FACTOR + 1))
+        self.assertEqual(compaction['faces_after'], 1)
+        self.assertEqual(compaction['validation_faces'], 1)
+        self.assertIsNotNone(compaction['accuracy_delta'])
+        self.assertEqual(len(model.face_recognizer.getHistograms()), 1)
+        self.assertEqual(result['stats']['total_faces'], compaction['faces_before'])
+
+        # A single prototype loses the held-out face, which the default tolerance rejects
+        config.GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS = FaceRecognitionConfig.GALLERY_PROTOTYPES_MAX_ACCURACY_LOSS
+        compaction = model.train(tmp_dir)['stats']['gallery_compaction']
+        self.assertFalse(compaction['applied'])
+        self.assertLess(compaction['accuracy_delta'], 0)
+        self.assertEqual(len(model.face_recognizer.getHistograms()), compaction['faces_before'])
+
+
+if __name__ == '__main__':
+    unittest.main()
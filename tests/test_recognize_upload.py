@@ -0,0 +1,75 @@
+"""
+Unit tests for /recognize upload formats
+"""
+import unittest
+import sys
+import os
+import io
+import base64
+import shutil
+import tempfile
+
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.routes import api_bp
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestRecognizeUpload(unittest.TestCase):
+    """Test cases for posting frames to /recognize"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model and build an app around it"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+
+        model = FaceRecognitionModel(make_test_config())
+        assert model.train(dataset_dir)['success']
+
+        app = Flask(__name__)
+        app.register_blueprint(api_bp)
+        app.face_model = model
+        app.people_manager = PeopleManager()
+        cls.client = app.test_client()
+        cls.frame = (SAMPLE_DIR / 'thanh.jpg').read_bytes()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_formats_give_same_result(self):
+        """Test raw, multipart and base64 JSON uploads are recognized identically"""
+        data_url = 'data:image/jpeg;base64,' + base64.b64encode(self.frame).decode()
+        responses = [
+            self.client.post('/recognize', data=self.frame, content_type='image/jpeg'),
+            self.client.post('/recognize', data={'image': (io.BytesIO(self.frame), 'frame.jpg')}),
+            self.client.post('/recognize', json={'image': data_url}),
+        ]
+        results = [response.get_json() for response in responses]
+
+        self.assertTrue(results[0]['success'])
+        self.assertTrue(results[0]['faces'])
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+
+    def test_missing_or_invalid_image(self):
+        """Test empty and undecodable bodies are rejected"""
+        empty = self.client.post('/recognize', data=b'', content_type='image/jpeg').get_json()
+        self.assertEqual(empty['error'], 'No image data provided')
+
+        invalid = self.client.post('/recognize', data=b'not a jpeg', content_type='image/jpeg').get_json()
+        self.assertEqual(invalid['error'], 'Invalid image data')
+
+if __name__ == '__main__':
+    unittest.main()
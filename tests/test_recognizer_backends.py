@@ -0,0 +1,105 @@
+"""
+Unit tests for the recognizer backends
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.recognizers import (
+    RECOGNIZER_BACKENDS, KNNLBPHRecognizer, create_recognizer, distance_threshold, file_extension
+)
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+def make_config(backend='lbph'):
+    return make_test_config(RECOGNIZER_BACKEND=backend)
+
+
+class TestRecognizerBackends(unittest.TestCase):
+    """Test cases for every RECOGNIZER_BACKEND"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Faces of two people: the sample face and a mirrored, darker copy"""
+        model = FaceRecognitionModel(make_config())
+        face = model.extract_face_from_image(str(SAMPLE_DIR / 'thanh.jpg'))
+        other = (face[:, ::-1] * 0.6).astype(np.uint8)
+        rng = np.random.default_rng(0)
+
+        def noisy(image):
+            return np.clip(image.astype(int) + rng.integers(-8, 9, image.shape), 0, 255).astype(np.uint8)
+
+        cls.faces = [noisy(face) for _ in range(3)] + [noisy(other) for _ in range(3)]
+        cls.labels = np.array([0, 0, 0, 1, 1, 1])
+        cls.probes = [noisy(face), noisy(other)]
+
+    def test_every_backend_names_both_people(self):
+        """Test each backend trains, predicts and survives a write/read round trip"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        config = make_config()
+
+        for name in RECOGNIZER_BACKENDS:
+            with self.subTest(backend=name):
+                recognizer = create_recognizer(name, config)
+                recognizer.train(self.faces, self.labels)
+                predictions = [recognizer.predict(probe) for probe in self.probes]
+                self.assertEqual([label for label, _ in predictions], [0, 1])
+
+                path = os.path.join(tmp_dir, name + file_extension(recognizer))
+                recognizer.write(path)
+                restored = create_recognizer(name, config)
+                restored.read(path)
+                self.assertEqual(restored.predict(self.probes[1])[0], 1)
+                self.assertGreater(distance_threshold(config, name), 0)
+
+    def test_knn_majority_vote(self):
+        """Test the kNN label is the majority of the k nearest faces"""
+        recognizer = KNNLBPHRecognizer(n_neighbors=3)
+        # One face of person 1 that is an exact copy, two of person 0 that are close
+        recognizer.train([self.probes[0], self.faces[0], self.faces[1]], [1, 0, 0])
+
+        labels, distances = recognizer.predict_batch([self.probes[0]])
+        self.assertEqual(labels[0], 0)
+        self.assertGreater(distances[0], 0)
+
+        recognizer.n_neighbors = 1
+        self.assertEqual(recognizer.predict(self.probes[0]), (1, 0.0))
+
+
+class TestBackendSelection(unittest.TestCase):
+    """Test cases for FaceRecognitionModel with a non-default backend"""
+
+    def test_backend_without_update_retrains_on_enroll(self):
+        """Test enrollment falls back to a full retrain for Eigenfaces"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        os.makedirs(os.path.join(tmp_dir, 'alice'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(tmp_dir, 'alice', 'a1.jpg'))
+
+        model = FaceRecognitionModel(make_config('eigen'))
+        self.assertTrue(model.train(tmp_dir)['success'])
+        info = model.get_model_info()['recognizer']
+        self.assertEqual(info['backend'], 'eigen')
+        self.assertFalse(info['incremental_updates'])
+
+        shutil.copy(SAMPLE_DIR / 'thanh1.jpg', os.path.join(tmp_dir, 'alice', 'a2.jpg'))
+        result = model.enroll_new_images(tmp_dir)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['mode'], 'full')
+        self.assertEqual(result['added_files'], ['alice/a2.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
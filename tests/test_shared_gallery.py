@@ -0,0 +1,163 @@
+"""
+Unit tests for memory-mapped galleries shared between worker processes
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.models.gallery_file import map_gallery_file, write_gallery_file
+from src.models.numpy_lbph import NumpyLBPHRecognizer
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestGalleryFile(unittest.TestCase):
+    """Test cases for the gallery file format and NumpyLBPHRecognizer.read"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        rng = np.random.default_rng(0)
+        self.faces = [rng.integers(0, 256, (100, 100), dtype=np.uint8) for _ in range(8)]
+        self.labels = np.arange(8) % 3
+
+    def test_roundtrip_is_read_only(self):
+        """Test arrays come back equal, aligned and not writable"""
+        path = os.path.join(self.tmp_dir, 'arrays.bin')
+        arrays = {
+            'a': np.arange(7, dtype=np.int32),
+            'b': np.ones((3, 5), dtype=np.float32).T,
+            'empty': np.zeros((0, 4), dtype=np.float64)
+        }
+        write_gallery_file(path, arrays)
+
+        mapped = map_gallery_file(path)
+        self.assertEqual(set(mapped), set(arrays))
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(mapped[name], array)
+            self.assertEqual(mapped[name].dtype, array.dtype)
+            self.assertFalse(mapped[name].flags.writeable)
+            self.assertEqual(mapped[name].ctypes.data % 64, 0)
+
+    def test_read_maps_the_gallery(self):
+        """Test a read recognizer predicts from the mapped file, with and without the index"""
+        for index_min_size in (0, 1):
+            with self.subTest(index_min_size=index_min_size):
+                recognizer = NumpyLBPHRecognizer(index_min_size=index_min_size, index_dim=8, index_shortlist=4)
+                recognizer.train(self.faces, self.labels)
+                path = os.path.join(self.tmp_dir, f'gallery-{index_min_size}.bin')
+                recognizer.write(path)
+
+                restored = NumpyLBPHRecognizer(index_min_size=index_min_size, index_dim=8, index_shortlist=4)
+                restored.read(path)
+                self.assertEqual(restored.index_active, recognizer.index_active)
+                self.assertFalse(restored.getHistograms()[0].flags.writeable)
+                expected = recognizer.predict_batch(self.faces)
+                np.testing.assert_array_equal(restored.predict_batch(self.faces)[0], expected[0])
+                np.testing.assert_allclose(restored.predict_batch(self.faces)[1], expected[1])
+
+                # Updates copy the mapped gallery instead of writing to it
+                restored.update(self.faces[:1], [5])
+                self.assertEqual(restored.predict(self.faces[0]), (0, 0.0))
+
+    def test_read_rebuilds_for_new_index_settings(self):
+        """Test a gallery saved without the index is indexed when read with it enabled"""
+        recognizer = NumpyLBPHRecognizer()
+        recognizer.train(self.faces, self.labels)
+        path = os.path.join(self.tmp_dir, 'gallery.bin')
+        recognizer.write(path)
+
+        restored = NumpyLBPHRecognizer(index_min_size=1, index_dim=8, index_shortlist=4)
+        restored.read(path)
+        self.assertTrue(restored.index_active)
+
+
+class TestSharedModelSync(unittest.TestCase):
+    """Test cases for FaceRecognitionModel.sync_published_model"""
+
+    def make_model(self, snapshot_dir, **overrides):
+        return FaceRecognitionModel(make_test_config(**{
+            'PERSIST_MODEL': True,
+            'RECOGNIZER_BACKEND': 'numpy_lbph',
+            'MODEL_SNAPSHOT_DIR': snapshot_dir,
+            'SHARED_MODEL_SYNC_INTERVAL': 1e-6,
+            **overrides
+        }))
+
+    def test_workers_follow_the_trained_model(self):
+        """Test a second model maps the snapshot the first one saved, and follows retrains"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        dataset_dir = os.path.join(tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'alice'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'alice', 'a1.jpg'))
+        snapshot_dir = os.path.join(tmp_dir, 'model')
+
+        trainer = self.make_model(snapshot_dir)
+        follower = self.make_model(snapshot_dir)
+        self.assertFalse(follower.sync_published_model())
+
+        self.assertTrue(trainer.train(dataset_dir)['success'])
+        # The trainer serves from the file it saved, without a new model version
+        self.assertFalse(trainer.face_recognizer.getHistograms()[0].flags.writeable)
+        self.assertEqual(trainer.model_version, 1)
+        self.assertFalse(trainer.sync_published_model())
+
+        self.assertTrue(follower.sync_published_model())
+        self.assertTrue(follower.is_trained)
+        self.assertEqual(follower.known_face_names, ['Alice'])
+        self.assertFalse(follower.face_recognizer.getHistograms()[0].flags.writeable)
+        self.assertFalse(follower.sync_published_model())
+
+        os.makedirs(os.path.join(dataset_dir, 'bob'))
+        shutil.copy(SAMPLE_DIR / 'thanh1.jpg', os.path.join(dataset_dir, 'bob', 'b1.jpg'))
+        self.assertEqual(trainer.enroll_new_images(dataset_dir)['mode'], 'incremental')
+
+        follower.recognize_faces(np.zeros((50, 50, 3), dtype=np.uint8))
+        self.assertEqual(follower.known_face_names, ['Alice', 'Bob'])
+        self.assertEqual(len(follower.face_recognizer.getHistograms()), 2)
+
+    def test_sync_ignores_other_settings(self):
+        """Test workers configured with another backend or training config keep their model"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        dataset_dir = os.path.join(tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'alice'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'alice', 'a1.jpg'))
+        snapshot_dir = os.path.join(tmp_dir, 'model')
+
+        self.assertTrue(self.make_model(snapshot_dir).train(dataset_dir)['success'])
+        for overrides in ({'RECOGNIZER_BACKEND': 'knn_lbph'}, {'FACE_SIZE_NORMALIZED': (64, 64)}):
+            with self.subTest(**overrides):
+                follower = self.make_model(snapshot_dir, **overrides)
+                self.assertFalse(follower.sync_published_model())
+                self.assertFalse(follower.is_trained)
+
+    def test_sync_disabled(self):
+        """Test SHARED_MODEL_SYNC_INTERVAL = 0 never switches models"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        dataset_dir = os.path.join(tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'alice'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'alice', 'a1.jpg'))
+        snapshot_dir = os.path.join(tmp_dir, 'model')
+
+        self.assertTrue(self.make_model(snapshot_dir).train(dataset_dir)['success'])
+        follower = self.make_model(snapshot_dir)
+        follower.config.SHARED_MODEL_SYNC_INTERVAL = 0
+        self.assertFalse(follower.sync_published_model())
+        self.assertFalse(follower.is_trained)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Unit tests for streaming recognition sessions
+"""
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.sessions import RecognitionSession, SessionRegistry
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class Disconnected(Exception):
+    pass
+
+
+class FakeSocket:
+    """Delivers messages in bursts: everything in a burst arrives while the server is busy"""
+
+    def __init__(self, bursts):
+        self.bursts = list(bursts)
+        self.buffer = []
+        self.sent = []
+
+    def receive(self, timeout):
+        if not self.buffer and timeout is None:
+            if not self.bursts:
+                raise Disconnected()
+            self.buffer = list(self.bursts.pop(0))
+        return self.buffer.pop(0) if self.buffer else None
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+class TestRecognitionSession(unittest.TestCase):
+    """Test cases for RecognitionSession"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+
+        cls.model = FaceRecognitionModel(make_test_config())
+        assert cls.model.train(dataset_dir)['success']
+
+        cls.people_manager = PeopleManager()
+        cls.frames = [(SAMPLE_DIR / name).read_bytes() for name in ('thanh.jpg', 'thanh1.jpg')]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def _run(self, bursts):
+        session = RecognitionSession(self.model, self.people_manager)
+        socket = FakeSocket(bursts)
+        with self.assertRaises(Disconnected):
+            session.run(socket.receive, socket.send)
+        return session, socket.sent
+
+    def test_latest_frame_wins(self):
+        """Test frames queued while busy are dropped in favour of the newest"""
+        session, sent = self._run([[self.frames[1], self.frames[1], self.frames[0]]])
+
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0]['frame'], 3)
+        self.assertEqual(sent[0]['dropped_frames'], 2)
+        self.assertEqual(session.frames_processed, 1)
+
+        frame = cv2.imdecode(np.frombuffer(self.frames[0], np.uint8), cv2.IMREAD_COLOR)
+        expected = self.model.recognize_faces(frame)
+        self.assertEqual([face['name'] for face in sent[0]['faces']], expected[1])
+
+    def test_unchanged_frame_reuses_result(self):
+        """Test an identical follow-up frame is answered from session state"""
+        session, sent = self._run([[self.frames[0]], [self.frames[0]], [b'not an image']])
+
+        self.assertEqual(session.frames_processed, 1)
+        self.assertEqual(session.frames_reused, 1)
+        self.assertEqual(sent[1]['faces'], sent[0]['faces'])
+        self.assertEqual(sent[1]['frame'], 2)
+        self.assertEqual(sent[2], {'success': False, 'error': 'Invalid image data'})
+
+    def test_unchanged_frame_after_retrain_is_recognized_again(self):
+        """Test a result is not reused once a new model has been published"""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        os.makedirs(os.path.join(tmp_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(tmp_dir, 'thanh', 'thanh.jpg'))
+        model = FaceRecognitionModel(make_test_config())
+        self.assertTrue(model.train(tmp_dir)['success'])
+        session = RecognitionSession(model, self.people_manager)
+
+        first = session.process(self.frames[0])
+        self.assertEqual([face['name'] for face in first['faces']], ['Thanh'])
+
+        # Retrain on a dataset where the same face belongs to someone else
+        os.rename(os.path.join(tmp_dir, 'thanh'), os.path.join(tmp_dir, 'minh'))
+        self.assertTrue(model.train(tmp_dir)['success'])
+        second = session.process(self.frames[0])
+        self.assertEqual(session.frames_processed, 2)
+        self.assertEqual(session.frames_reused, 0)
+        self.assertEqual([face['name'] for face in second['faces']], ['Minh'])
+
+        session.process(self.frames[0])
+        self.assertEqual(session.frames_reused, 1)
+
+    def test_registry(self):
+        """Test sessions are tracked while open"""
+        registry = SessionRegistry()
+        session = registry.open(self.model, self.people_manager, '127.0.0.1')
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.get_stats()[0]['session_id'], session.id)
+
+        registry.close(session)
+        self.assertEqual(len(registry), 0)
+
+if __name__ == '__main__':
+    unittest.main()
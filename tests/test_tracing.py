@@ -0,0 +1,114 @@
+"""
+Unit tests for per-request tracing
+"""
+import unittest
+import sys
+import os
+import io
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.api.routes import api_bp
+from src.api.tracing import register_tracing
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.utils.people_manager import PeopleManager
+from src.utils.trace_report import read_traces, slowest, stage_summary
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for request IDs, Server-Timing and the trace file"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train a small model"""
+        cls.tmp_dir = tempfile.mkdtemp()
+        dataset_dir = os.path.join(cls.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(dataset_dir, 'thanh'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(dataset_dir, 'thanh', 'thanh.jpg'))
+
+        cls.model = FaceRecognitionModel(make_test_config(PREDICTION_CACHE_SIZE=0, BATCH_WORKERS=2))
+        assert cls.model.train(dataset_dir)['success']
+        cls.frame = (SAMPLE_DIR / 'thanh.jpg').read_bytes()
+        height, width = cv2.imdecode(np.frombuffer(cls.frame, np.uint8), cv2.IMREAD_COLOR).shape[:2]
+        cls.frame_size = (width, height)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def make_client(self, sample_rate, trace_file):
+        app = Flask(__name__)
+        app.config.update(TRACE_SAMPLE_RATE=sample_rate, TRACE_FILE=trace_file, TRACE_BATCH_SIZE=2)
+        app.register_blueprint(api_bp)
+        register_tracing(app)
+        app.face_model = self.model
+        app.people_manager = PeopleManager()
+        return app, app.test_client()
+
+    def test_traced_request(self):
+        """Test a sampled request reports its stages in Server-Timing and the trace file"""
+        trace_file = os.path.join(self.tmp_dir, 'traces.jsonl')
+        app, client = self.make_client(1.0, trace_file)
+
+        upload = client.post('/upload_test', data={'file': (io.BytesIO(self.frame), 'frame.jpg')},
+                             headers={'X-Request-ID': 'slow-upload-1'})
+        self.assertTrue(upload.get_json()['success'])
+        self.assertEqual(upload.headers['X-Request-ID'], 'slow-upload-1')
+        timing = upload.headers['Server-Timing']
+        for name in ('decode', 'reencode', 'grayscale', 'detect', 'predict', 'people_lookup', 'serialize', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+
+        # The second trace completes a batch of two, so both are written
+        self.assertFalse(os.path.exists(trace_file))
+        client.post('/recognize', data=self.frame, content_type='image/jpeg')
+        traces = list(read_traces(trace_file))
+
+        self.assertEqual([trace['name'] for trace in traces], ['/upload_test', '/recognize'])
+        self.assertEqual(traces[0]['request_id'], 'slow-upload-1')
+        self.assertEqual(traces[0]['status'], 200)
+        detect = next(span for span in traces[0]['spans'] if span['name'] == 'detect')
+        self.assertEqual((detect['width'], detect['height']), self.frame_size)
+        self.assertEqual(slowest(traces, 1, stage='reencode')[0]['name'], '/upload_test')
+        self.assertIn('predict', [row['stage'] for row in stage_summary(traces)])
+
+    def test_batch_spans_from_worker_threads(self):
+        """Test stages run on the batch thread pool are part of the request's trace"""
+        trace_file = os.path.join(self.tmp_dir, 'batch_traces.jsonl')
+        app, client = self.make_client(1.0, trace_file)
+
+        files = [(io.BytesIO(self.frame), f'frame{index}.jpg') for index in range(3)]
+        response = client.post('/recognize_batch', data={'images': files})
+        self.assertEqual(response.get_json()['count'], 3)
+        self.assertIn('detect;dur=', response.headers['Server-Timing'])
+        self.assertIn('desc="x3"', response.headers['Server-Timing'])
+
+        app.trace_writer.flush()
+        spans = next(read_traces(trace_file))['spans']
+        self.assertEqual(sum(span['name'] == 'detect' for span in spans), 3)
+
+    def test_unsampled_request(self):
+        """Test requests that are not sampled only get a request ID"""
+        trace_file = os.path.join(self.tmp_dir, 'unsampled.jsonl')
+        app, client = self.make_client(0.0, trace_file)
+
+        response = client.post('/recognize', data=self.frame, content_type='image/jpeg',
+                               headers={'X-Request-ID': 'not a token <script>'})
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertRegex(response.headers['X-Request-ID'], r'^[0-9a-f]{32}$')
+        self.assertIsNone(app.trace_writer)
+        self.assertFalse(os.path.exists(trace_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,251 @@
+"""
+Unit tests for background training jobs
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+import cv2
+from flask import Flask
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.settings import DATA_DIR
+from conftest import make_test_config
+from src.models.face_recognition_model import FaceRecognitionModel
+from src.api.routes import api_bp
+from src.models.training_jobs import TrainingJob, TrainingJobManager
+from src.utils import file_lock
+from src.utils.people_manager import PeopleManager
+
+SAMPLE_DIR = DATA_DIR / 'thanh'
+
+
+class BlockingModel:
+    """Stand-in model whose training blocks until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+        self.known_face_names = ['Alice']
+        self.model_version = 0
+
+    def _run(self, mode, progress_callback):
+        self.calls.append(mode)
+        progress_callback(1, 4)
+        self.started.set()
+        self.release.wait(5)
+        self.model_version += 1
+        return {'success': True, 'mode': mode, 'added_files': []}
+
+    def train(self, dataset_path, progress_callback=None):
+        return self._run('full', progress_callback)
+
+    def enroll_new_images(self, dataset_path, progress_callback=None):
+        return self._run('incremental', progress_callback)
+
+
+class TestTrainingJobManager(unittest.TestCase):
+    """Test cases for TrainingJobManager"""
+
+    def test_overlapping_requests_coalesce(self):
+        """Test reloads during a running job share one follow-up job"""
+        model = BlockingModel()
+        manager = TrainingJobManager(model, 'dataset')
+
+        first = manager.submit()
+        self.assertTrue(model.started.wait(5))
+        self.assertEqual(first.status, TrainingJob.RUNNING)
+        self.assertEqual(first.to_dict()['progress'], 0.25)
+
+        second = manager.submit()
+        third = manager.submit(full=True)
+        self.assertIs(second, third)
+        self.assertEqual(second.status, TrainingJob.QUEUED)
+
+        model.release.set()
+        self.assertTrue(third.wait(5))
+
+        self.assertEqual(first.status, TrainingJob.COMPLETED)
+        self.assertEqual(third.status, TrainingJob.COMPLETED)
+        self.assertEqual(third.result['mode'], 'full')
+        self.assertEqual(model.calls, ['incremental', 'full'])
+        self.assertEqual([job.id for job in manager.list_jobs()], [third.id, first.id])
+
+    def test_failed_training_is_reported(self):
+        """Test an unsuccessful training result marks the job failed"""
+        model = BlockingModel()
+        model.enroll_new_images = lambda *args: {'success': False, 'error': 'No training data found'}
+        manager = TrainingJobManager(model, 'dataset')
+
+        job = manager.submit()
+        self.assertTrue(job.wait(5))
+
+        self.assertEqual(job.status, TrainingJob.FAILED)
+        self.assertEqual(manager.get(job.id).to_dict()['error'], 'No training data found')
+
+
+class TestSharedJobStore(unittest.TestCase):
+    """Test cases for training jobs shared by several worker processes"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_file = os.path.join(self.tmp_dir, 'model', 'training_jobs.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_app(self):
+        """An app like one gunicorn worker, with its own model and the shared store"""
+        app = Flask(__name__)
+        app.register_blueprint(api_bp)
+        app.face_model = BlockingModel()
+        app.people_manager = PeopleManager()
+        app.training_jobs = TrainingJobManager(app.face_model, 'dataset', self.store_file)
+        return app
+
+    def test_jobs_visible_and_coalesced_across_apps(self):
+        """Test a job started by one app can be polled on another, and reloads coalesce across apps"""
+        first_app, second_app = self.make_app(), self.make_app()
+        first_client, second_client = first_app.test_client(), second_app.test_client()
+
+        started = first_client.post('/reload_faces', json={})
+        self.assertEqual(started.status_code, 202)
+        job_id = started.get_json()['job']['job_id']
+        self.assertTrue(first_app.face_model.started.wait(5))
+
+        status = second_client.get(f'/training_jobs/{job_id}')
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.get_json()['job']['status'], 'running')
+
+        # Both reloads attach to one queued job, which waits for the running one
+        queued = second_client.post('/reload_faces', json={}).get_json()['job']
+        coalesced = first_client.post('/reload_faces', json={'full': True}).get_json()['job']
+        self.assertEqual(coalesced['job_id'], queued['job_id'])
+        self.assertEqual(coalesced['status'], 'queued')
+        self.assertFalse(second_app.face_model.started.wait(0.2 + 2 * 0.5))
+
+        first_app.face_model.release.set()
+        second_app.face_model.release.set()
+        self.assertTrue(first_app.training_jobs.get(queued['job_id']).wait(10))
+
+        listed = first_client.get('/training_jobs').get_json()['jobs']
+        self.assertEqual([job['job_id'] for job in listed], [queued['job_id'], job_id])
+        self.assertEqual([job['status'] for job in listed], ['completed', 'completed'])
+        self.assertEqual(listed[0]['mode'], 'full')
+        self.assertEqual(first_app.face_model.calls, ['incremental'])
+        self.assertEqual(second_app.face_model.calls, ['full'])
+
+    def test_job_of_exited_worker_is_failed(self):
+        """Test a job left running by a process that exited does not block new jobs"""
+        manager = TrainingJobManager(BlockingModel(), 'dataset', self.store_file)
+        with manager._store.transaction() as records:
+            orphan = TrainingJob()
+            orphan.owner = f"{orphan.owner.split(':')[0]}:999999999:0.00"
+            orphan.status = TrainingJob.RUNNING
+            records[orphan.id] = orphan.to_record()
+
+        manager.face_model.release.set()
+        job = manager.submit()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.status, TrainingJob.COMPLETED)
+        self.assertEqual(manager.get(orphan.id).status, TrainingJob.FAILED)
+
+    def test_store_locks_with_msvcrt_without_fcntl(self):
+        """Test the store locks through msvcrt, retrying while busy, where fcntl is missing (Windows)"""
+        calls = []
+
+        def locking(fd, mode, nbytes):
+            calls.append(mode)
+            if len(calls) == 1:
+                raise OSError('locked by another process')
+
+        fake_msvcrt = mock.Mock(LK_NBLCK='nblck', LK_UNLCK='unlck', locking=locking)
+        with mock.patch.object(file_lock, 'fcntl', None), \
+                mock.patch.object(file_lock, 'msvcrt', fake_msvcrt), \
+                mock.patch.object(file_lock, 'WINDOWS_RETRY_INTERVAL', 0):
+            manager = TrainingJobManager(BlockingModel(), 'dataset', self.store_file)
+            job = TrainingJob()
+            with manager._store.transaction() as records:
+                records[job.id] = job.to_record()
+
+        self.assertEqual(calls, ['nblck', 'nblck', 'unlck'])
+        self.assertIn(job.id, manager._store.read())
+
+
+class TestAtomicModelSwap(unittest.TestCase):
+    """Test cases for publishing trained models"""
+
+    def setUp(self):
+        """Set up a small dataset with one person"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_dir = os.path.join(self.tmp_dir, 'dataset')
+        os.makedirs(os.path.join(self.dataset_dir, 'alice'))
+        shutil.copy(SAMPLE_DIR / 'thanh.jpg', os.path.join(self.dataset_dir, 'alice', 'a1.jpg'))
+
+        self.model = FaceRecognitionModel(make_test_config())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_retrain_swaps_in_new_recognizer(self):
+        """Test a retrain publishes a new recognizer and leaves the old one intact"""
+        progress = []
+        self.assertTrue(self.model.train(self.dataset_dir, lambda done, total: progress.append((done, total)))['success'])
+        self.assertEqual(progress, [(0, 1), (1, 1)])
+
+        old_recognizer = self.model.face_recognizer
+        old_version = self.model.model_version
+        old_histograms = len(old_recognizer.getHistograms())
+
+        shutil.copy(SAMPLE_DIR / 'thanh1.jpg', os.path.join(self.dataset_dir, 'alice', 'a2.jpg'))
+        self.assertTrue(self.model.train(self.dataset_dir)['success'])
+
+        self.assertIsNot(self.model.face_recognizer, old_recognizer)
+        self.assertGreater(self.model.model_version, old_version)
+        self.assertEqual(len(old_recognizer.getHistograms()), old_histograms)
+        self.assertEqual(len(self.model.face_recognizer.getHistograms()), 2)
+
+        # Recognition still works against the swapped-in model
+        frame = cv2.imread(str(SAMPLE_DIR / 'thanh.jpg'))
+        locations, names = self.model.recognize_faces(frame)
+        self.assertEqual(len(locations), len(names))
+
+    def test_failed_retrain_keeps_serving_previous_model(self):
+        """Test a retrain that fails midway does not leave a half-built model behind"""
+        self.assertTrue(self.model.train(self.dataset_dir)['success'])
+        recognizer = self.model.face_recognizer
+
+        with mock.patch('cv2.face.LBPHFaceRecognizer_create') as create:
+            create.return_value.train.side_effect = cv2.error('boom')
+            result = self.model.train(self.dataset_dir)
+
+        self.assertFalse(result['success'])
+        self.assertIs(self.model.face_recognizer, recognizer)
+        self.assertTrue(self.model.is_trained)
+
+    def test_empty_dataset_keeps_serving_previous_model(self):
+        """Test a full retrain on a dataset without faces fails the job and keeps the live model"""
+        self.assertTrue(self.model.train(self.dataset_dir)['success'])
+        recognizer = self.model.face_recognizer
+        version = self.model.model_version
+        os.remove(os.path.join(self.dataset_dir, 'alice', 'a1.jpg'))
+
+        manager = TrainingJobManager(self.model, self.dataset_dir)
+        job = manager.submit(full=True)
+        self.assertTrue(job.wait(30))
+
+        self.assertEqual(job.status, TrainingJob.FAILED)
+        self.assertEqual(job.error, 'No training data found')
+        self.assertIs(self.model.face_recognizer, recognizer)
+        self.assertEqual(self.model.model_version, version)
+        self.assertTrue(self.model.is_trained)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,11 @@
+"""
+WSGI entry point
+
+    uwsgi --http :5000 --module wsgi:app
+
+Importing this module creates the app; run ``app.py`` for the development
+server. gunicorn builds the app through ``gunicorn.conf.py`` instead.
+"""
+from src.app_factory import create_app
+
+app = create_app()